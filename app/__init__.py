@@ -1,8 +1,10 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from config import Config
+from app.services.db_routing import RoutingSession
 
-db = SQLAlchemy()
+# RoutingSession sends @read_only views to the replica bind when configured
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 def create_app():
     app = Flask(__name__)
@@ -10,6 +12,31 @@ def create_app():
     db.init_app(app)
     
     with app.app_context():
+        # Pool metrics for /admin/api/db-pool; SELECT cap for the read-only views
+        from app.services.db_routing import instrument_pools, statement_timeout
+        instrument_pools(db.engines)
+        for engine in db.engines.values():
+            statement_timeout(engine, app.config['DB_STATEMENT_TIMEOUT_MS'])
+
+        # Request/SQL timings for /admin/perf (no-op unless PROFILING_ENABLED)
+        from app.services.profiling import profiler
+        profiler.init_app(app, db.engines)
+
+        # In-memory services subscribe to the write events on import
+        from app.services import availability, guest_search, guest_stats, kpi, pricing, ref_cache, revenue, room_feed  # noqa: F401
+
+        # ETags / rendered-page cache for the read-only pages, invalidated by the write events
+        from app.services.response_cache import response_cache
+        response_cache.init_app(app)
+
+        # App-level audit entries, batched into AuditLog by a background worker
+        from app.services.audit import audit_trail
+        audit_trail.init_app(app)
+
+        # Turnover / repair task dispatcher (batched assignment writes)
+        from app.services.housekeeping import housekeeping
+        housekeeping.init_app(app)
+
         from app.routes.auth_routes import auth_bp
         app.register_blueprint(auth_bp)
         
@@ -25,5 +52,41 @@ def create_app():
         from app.routes.report_routes import report_bp
         app.register_blueprint(report_bp)
 
+        from app.routes.revenue_api import revenue_api_bp
+        app.register_blueprint(revenue_api_bp)
+
+        from app.routes.booking_api import booking_api_bp
+        app.register_blueprint(booking_api_bp)
+
+        from app.routes.pricing_api import pricing_api_bp
+        app.register_blueprint(pricing_api_bp)
+
+        from app.routes.housekeeping_routes import housekeeping_bp
+        app.register_blueprint(housekeeping_bp)
+
+        # Live room grid deltas (shared through Redis when configured)
+        from app.services.room_feed import room_feed
+        room_feed.init_app(app)
+
+        # ASGI serving (asgi.py): async variants take over the read-heavy pages
+        from app.services.async_db import async_db
+        async_db.init_app(app)
+
+        # flask CLI commands (exports, ...)
+        from app.cli import register_commands
+        register_commands(app)
+
+        # Background refresh of the materialized analytics snapshot
+        from app.services.report_cache import report_snapshot
+        from app.services.scheduler import start_periodic
+        start_periodic(app, 'reports', app.config['REPORTS_REFRESH_SECONDS'], report_snapshot.refresh)
+        # Shift changes: hand unfinished tasks to the staff coming on
+        start_periodic(app, 'housekeeping', app.config['HOUSEKEEPING_DISPATCH_SECONDS'], housekeeping.tick)
+
+        # Closed bookings and old audit entries move to the archive tables (hot set stays small)
+        if app.config['ARCHIVE_ENABLED']:
+            from app.services.archive import history_archive
+            start_periodic(app, 'archive', app.config['ARCHIVE_INTERVAL_SECONDS'], history_archive.run)
+
         # THIS IS THE MISSING LINE CAUSING THE CRASH
         return app
\ No newline at end of file
@@ -0,0 +1,98 @@
+# app/cli.py
+import sys
+import time
+
+import click
+
+
+def register_commands(app):
+    """
+    Attaches the maintenance commands to `flask <command>`.
+    """
+
+    @app.cli.command('export-invoices')
+    @click.option('--from', 'date_from', required=True, help='First check-out date (YYYY-MM-DD).')
+    @click.option('--to', 'date_to', required=True, help='Last check-out date (YYYY-MM-DD).')
+    @click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl', 'html']), default='csv')
+    @click.option('--status', default='completed', help='Booking status to export.')
+    @click.option('--output', '-o', type=click.Path(dir_okay=False), help='File to write (default: stdout).')
+    def export_invoices_command(date_from, date_to, fmt, status, output):
+        """Stream every invoice in a check-out date range (month-end export)."""
+        from app.services.invoice_export import export_invoices, write_export
+
+        started = time.monotonic()
+        if output:
+            written = write_export(output, date_from, date_to, fmt, status)
+            click.echo(f"Wrote {written:,} bytes to {output} in {time.monotonic() - started:.1f}s", err=True)
+        else:
+            for piece in export_invoices(date_from, date_to, fmt, status):
+                sys.stdout.write(piece)
+
+    @app.cli.command('import-data')
+    @click.argument('kind', type=click.Choice(['guests', 'phones', 'bookings']))
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), help='Default: from the file extension.')
+    @click.option('--batch-size', default=1000, show_default=True, help='Rows per INSERT batch / transaction.')
+    @click.option('--dry-run', is_flag=True, help='Validate only, write nothing.')
+    @click.option('--safe', is_flag=True, help='Keep MySQL unique/foreign key checks on while inserting.')
+    @click.option('--errors', 'errors_path', type=click.Path(dir_okay=False),
+                  help='Write rejected rows here as JSONL (line, row, errors).')
+    def import_data_command(kind, path, fmt, batch_size, dry_run, safe, errors_path):
+        """Bulk-load Guests, GuestPhones or Bookings from CSV/JSONL (onboarding, PMS migration)."""
+        import json
+        from app.services.bulk_import import read_rows, run_import
+
+        errors_fh = open(errors_path, 'w', encoding='utf-8') if errors_path else None
+        shown = [0]
+        last_report = [time.monotonic()]
+
+        def on_reject(line_no, row, errors):
+            if errors_fh:
+                errors_fh.write(json.dumps({'line': line_no, 'row': row, 'errors': errors}, default=str) + '\n')
+            elif shown[0] < 20:
+                click.echo(f"line {line_no}: {'; '.join(errors)}", err=True)
+            shown[0] += 1
+
+        def on_progress(stats):
+            if time.monotonic() - last_report[0] >= 2:
+                last_report[0] = time.monotonic()
+                click.echo(f"{stats.read:,} read, {stats.inserted:,} inserted, {stats.rejected:,} rejected "
+                           f"({stats.rate:,.0f} rows/s)", err=True)
+
+        try:
+            stats = run_import(kind, read_rows(path, fmt), batch_size=batch_size, dry_run=dry_run,
+                               fast=not safe, on_reject=on_reject, on_progress=on_progress)
+        finally:
+            if errors_fh:
+                errors_fh.close()
+
+        verb = 'validated' if dry_run else 'inserted'
+        click.echo(f"{kind}: {stats.read:,} read, {stats.inserted:,} {verb}, {stats.rejected:,} rejected "
+                   f"in {stats.elapsed:.1f}s ({stats.rate:,.0f} rows/s, {stats.batches} batches)", err=True)
+        if stats.rejected and not errors_fh and shown[0] > 20:
+            click.echo(f"... {shown[0] - 20:,} more rejections; use --errors to capture them all", err=True)
+
+    @app.cli.command('archive-history')
+    @click.option('--max-batches', type=int, help='Stop after this many batches (default: until caught up).')
+    def archive_history_command(max_batches):
+        """Move closed bookings (with their children) and old audit entries to the archive tables."""
+        from app.services.archive import history_archive
+
+        started = time.monotonic()
+        moved = history_archive.run(max_batches=max_batches)
+        if moved is None:
+            click.echo("An archive run is already in progress", err=True)
+            return
+        summary = ', '.join(f"{count:,} {name.replace('_', ' ')}" for name, count in moved.items())
+        click.echo(f"Archived {summary} in {time.monotonic() - started:.1f}s", err=True)
+
+    @app.cli.command('reference-changed')
+    @click.argument('table', required=False, type=click.Choice(['RoomTypes', 'Rooms', 'Services']))
+    def reference_changed_command(table):
+        """Drop the cached reference data after editing RoomTypes / Rooms / Services in MySQL."""
+        from app.services.events import publish
+
+        publish('reference_changed', table=table)
+        if app.config.get('REF_CACHE_BACKEND') != 'redis':
+            click.echo("Memory backend: running workers pick the change up within "
+                       f"{app.config['REF_CACHE_TTL_SECONDS']}s", err=True)
@@ -31,8 +31,10 @@ class Booking(db.Model):
     booking_status = db.Column(db.Enum('active', 'completed', 'cancelled'), default='active')
     
     # Relationships
-    payments = db.relationship('Payment', backref='booking', lazy=True)
-    feedback = db.relationship('Feedback', backref='booking', uselist=False)
+    # selectin: one extra "WHERE booking_id IN (...)" query for a whole list of bookings
+    # joined: feedback is at most one row, so it rides along in the booking SELECT
+    payments = db.relationship('Payment', backref='booking', lazy='selectin')
+    feedback = db.relationship('Feedback', backref='booking', uselist=False, lazy='joined')
 
 class Payment(db.Model):
     __tablename__ = 'Payments'
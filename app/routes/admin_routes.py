@@ -1,71 +1,202 @@
 # app/routes/admin_routes.py
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+import asyncio
+from collections import namedtuple
+
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
 from sqlalchemy import text
 from app import db
+from app.services.pagination import keyset_page, page_size, serialize_row
+from app.services.events import publish
+from app.services.kpi import dashboard_kpis, reconcile_queries
+from app.services.db_routing import read_only, pool_status
+from app.services.profiling import profiler
+from app.services.ref_cache import ref_cache
+from app.services.async_db import async_db, async_view
+from app.services.audit import audit_trail
+from app.services.guest_stats import guest_stats
+from app.services.response_cache import cached_response, response_cache
 
 # Create the Blueprint
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
 # --- DASHBOARD ---
+RECENT_BOOKINGS_SQL = """
+    SELECT b.booking_id, g.full_name, b.check_in, b.booking_status, b.total_amount
+    FROM Bookings b
+    JOIN Guests g ON b.guest_id = g.guest_id
+    ORDER BY b.booking_id DESC
+    LIMIT 5
+"""
+
+def _render_dashboard(kpis, recent_bookings):
+    return render_template('admin/dashboard.html', 
+                           guest_count=kpis['guest_count'],
+                           total_revenue=kpis['total_revenue'],
+                           room_count=kpis['room_count'],
+                           room_total=kpis['room_total'],
+                           recent_bookings=recent_bookings)
+
 @admin_bp.route('/')
 @admin_bp.route('/dashboard')
+@read_only
 def dashboard():
-    # 1. Fetch Live Data
-    guest_count = db.session.execute(text("SELECT COUNT(*) FROM Guests")).scalar()
-    
-    # Calculate Total Revenue
-    revenue_sql = text("""
-        SELECT 
-        (SELECT IFNULL(SUM(total_amount), 0) FROM Bookings) + 
-        (SELECT IFNULL(SUM(total_order_cost), 0) FROM ServiceOrders)
-    """)
-    total_revenue = db.session.execute(revenue_sql).scalar()
-    
-    # Count Available Rooms
-    room_count = db.session.execute(text("SELECT COUNT(*) FROM Rooms WHERE status = 'available'")).scalar()
-
-    # Get Recent Bookings
-    recent_bookings = db.session.execute(text("""
-        SELECT b.booking_id, g.full_name, b.check_in, b.booking_status, b.total_amount
-        FROM Bookings b
-        JOIN Guests g ON b.guest_id = g.guest_id
-        ORDER BY b.booking_id DESC
-        LIMIT 5
-    """)).fetchall()
+    # 1. Headline KPIs: running aggregates kept current by the write events
+    # (seeded from the DB and reconciled periodically - see services/kpi.py)
+    kpis = dashboard_kpis.snapshot()
 
-    return render_template('admin/dashboard.html', 
-                           guest_count=guest_count,
-                           total_revenue=total_revenue,
-                           room_count=room_count,
-                           recent_bookings=recent_bookings)
+    # 2. Get Recent Bookings
+    recent_bookings = db.session.execute(text(RECENT_BOOKINGS_SQL)).fetchall()
+
+    return _render_dashboard(kpis, recent_bookings)
+
+@async_view('admin.dashboard')
+@read_only
+async def dashboard_async():
+    # Recent bookings and, when due, the KPI recount go out together
+    queries = {'recent_bookings': RECENT_BOOKINGS_SQL}
+    reconcile = dashboard_kpis.due()
+    if reconcile:
+        # history_sql() may inspect the schema (archive tables), so off the event loop
+        queries.update(await asyncio.to_thread(reconcile_queries))
+    results = await async_db.gather(queries)
+    if reconcile:
+        dashboard_kpis.apply(results)
+    return await asyncio.to_thread(_render_dashboard, dashboard_kpis.snapshot(), results['recent_bookings'])
+
+# --- PAGINATION HELPERS ---
+def _filter_args(args):
+    """
+    Query-string filters to carry over into the next page's URL.
+    """
+    return {k: v for k, v in args.items() if k != 'cursor' and v}
+
+def _page_json(rows, next_cursor, endpoint, extra=None):
+    """
+    Shared JSON envelope for the paginated listings.
+    """
+    items = []
+    for row in rows:
+        item = serialize_row(row)
+        if extra:
+            item.update(extra(row))
+        items.append(item)
+    next_url = None
+    if next_cursor:
+        next_url = url_for(endpoint, cursor=next_cursor, **_filter_args(request.args))
+    return {'items': items, 'next_cursor': next_cursor, 'next_url': next_url}
 
 # --- AUDIT LOGS ---
+AUDIT_ORDER = [('action_timestamp', 'action_timestamp'), ('log_id', 'log_id')]
+
+def _audit_filters(args):
+    """
+    Builds the WHERE clauses for the audit log filters (?table_name=&action_type=&date_from=&date_to=).
+    """
+    where, params = [], {}
+    if args.get('table_name'):
+        where.append("table_name = :table_name")
+        params['table_name'] = args['table_name']
+    if args.get('action_type'):
+        where.append("action_type = :action_type")
+        params['action_type'] = args['action_type']
+    if args.get('date_from'):
+        where.append("action_timestamp >= :date_from")
+        params['date_from'] = args['date_from']
+    if args.get('date_to'):
+        # Inclusive of the whole 'to' day
+        where.append("action_timestamp < DATE_ADD(:date_to, INTERVAL 1 DAY)")
+        params['date_to'] = args['date_to']
+    return where, params
+
+def _audit_page(args):
+    where, params = _audit_filters(args)
+    return keyset_page("SELECT log_id, table_name, action_type, details, action_timestamp FROM AuditLog",
+                       AUDIT_ORDER, cursor=args.get('cursor'), where=where, params=params,
+                       limit=page_size(args.get('limit')))
+
 @admin_bp.route('/audit-logs')
+@cached_response('audit')
 def audit_logs():
-    logs = db.session.execute(text("SELECT * FROM AuditLog ORDER BY action_timestamp DESC")).fetchall()
-    return render_template('admin/audit_logs.html', logs=logs)
+    try:
+        logs, next_cursor = _audit_page(request.args)
+    except ValueError:
+        flash('Invalid page cursor, showing the first page.', 'warning')
+        logs, next_cursor = _audit_page(_filter_args(request.args))
+    return render_template('admin/audit_logs.html', logs=logs, next_cursor=next_cursor,
+                           filters=_filter_args(request.args))
+
+@admin_bp.route('/api/audit-logs')
+@cached_response('audit')
+def audit_logs_api():
+    try:
+        logs, next_cursor = _audit_page(request.args)
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    return jsonify(_page_json(logs, next_cursor, 'admin.audit_logs_api'))
 
 # --- EMPLOYEES ---
+EMPLOYEE_ORDER = [("COALESCE(hire_date, '1000-01-01')", 'hired_sort'), ('emp_id', 'emp_id')]
+
+def _employee_page(args):
+    return keyset_page("""
+        SELECT emp_id, name, role, shift_time, salary, hire_date,
+               COALESCE(hire_date, '1000-01-01') AS hired_sort
+        FROM Employees
+    """, EMPLOYEE_ORDER, cursor=args.get('cursor'), limit=page_size(args.get('limit')))
+
 @admin_bp.route('/employees')
+@cached_response('employees')
 def employees():
-    sql = text("SELECT * FROM Employees ORDER BY hire_date DESC")
-    employees_data = db.session.execute(sql).fetchall()
-    return render_template('admin/employees.html', employees=employees_data)
+    try:
+        employees_data, next_cursor = _employee_page(request.args)
+    except ValueError:
+        flash('Invalid page cursor, showing the first page.', 'warning')
+        employees_data, next_cursor = _employee_page({})
+    return render_template('admin/employees.html', employees=employees_data, next_cursor=next_cursor)
+
+@admin_bp.route('/api/employees')
+@cached_response('employees')
+def employees_api():
+    try:
+        employees_data, next_cursor = _employee_page(request.args)
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    return jsonify(_page_json(employees_data, next_cursor, 'admin.employees_api'))
 
 # --- GUEST MANAGEMENT ---
+GUEST_ORDER = [('g.guest_id', 'guest_id')]
+
+GuestRow = namedtuple('GuestRow', 'guest_id full_name phone email nationality total_bookings')
+
+def _guest_page(args):
+    rows, next_cursor = keyset_page("""
+        SELECT g.guest_id, g.full_name, g.phone, g.email, g.nationality
+        FROM Guests g
+    """, GUEST_ORDER, cursor=args.get('cursor'), limit=page_size(args.get('limit')))
+    # Booking counts come from the guest stats store, not a COUNT(*) per row
+    counts = guest_stats.booking_counts([r.guest_id for r in rows])
+    return [GuestRow(*r, total_bookings=counts[r.guest_id]) for r in rows], next_cursor
+
 @admin_bp.route('/guests')
 def manage_guests():
     """
-    Renders the Guest Management Page.
+    Renders the Guest Management Page (one keyset page at a time).
     """
-    query = text("""
-        SELECT g.guest_id, g.full_name, g.phone, g.email, g.nationality,
-               (SELECT COUNT(*) FROM Bookings b WHERE b.guest_id = g.guest_id) as total_bookings
-        FROM Guests g
-        ORDER BY g.guest_id DESC
-    """)
-    guests = db.session.execute(query).fetchall()
-    return render_template('admin/guests.html', guests=guests)
+    try:
+        guests, next_cursor = _guest_page(request.args)
+    except ValueError:
+        flash('Invalid page cursor, showing the first page.', 'warning')
+        guests, next_cursor = _guest_page({})
+    return render_template('admin/guests.html', guests=guests, next_cursor=next_cursor)
+
+@admin_bp.route('/api/guests')
+def guests_api():
+    try:
+        guests, next_cursor = _guest_page(request.args)
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    return jsonify(_page_json(guests, next_cursor, 'admin.guests_api',
+                              extra=lambda g: {'delete_url': url_for('admin.delete_guest', guest_id=g.guest_id)}))
 
 @admin_bp.route('/guests/delete/<int:guest_id>', methods=['POST'])
 def delete_guest(guest_id):
@@ -77,6 +208,7 @@ def delete_guest(guest_id):
         # Execute Delete
         db.session.execute(text("DELETE FROM Guests WHERE guest_id = :gid"), {'gid': guest_id})
         db.session.commit()
+        publish('guest_deleted', guest_id=guest_id)
         
         flash('Guest record deleted successfully. The Audit Log has been updated via Trigger.', 'success')
     except Exception as e:
@@ -86,4 +218,33 @@ def delete_guest(guest_id):
         else:
             flash(f'Error deleting guest: {str(e)}', 'danger')
             
-    return redirect(url_for('admin.manage_guests'))
\ No newline at end of file
+    return redirect(url_for('admin.manage_guests'))
+
+# --- DATABASE POOL METRICS ---
+@admin_bp.route('/api/db-pool')
+def db_pool_metrics():
+    """
+    Connection pool gauges and counters per engine (primary / replica).
+    """
+    return jsonify(pool_status(db.engines))
+
+# --- PERFORMANCE PROFILE ---
+@admin_bp.route('/perf')
+def perf():
+    """
+    Rolling p50/p95/p99 per endpoint, SQL fingerprint and stored procedure,
+    plus recent N+1 suspects (needs PROFILING_ENABLED).
+    """
+    return render_template('admin/perf.html', report=profiler.report(), ref_cache=ref_cache.stats(),
+                           audit=audit_trail.stats(), response_cache=response_cache.stats())
+
+@admin_bp.route('/api/perf')
+def perf_api():
+    return jsonify(dict(profiler.report(), ref_cache=ref_cache.stats(), audit=audit_trail.stats(),
+                        response_cache=response_cache.stats()))
+
+@admin_bp.route('/perf/reset', methods=['POST'])
+def reset_perf():
+    profiler.reset()
+    flash('Performance counters reset.', 'info')
+    return redirect(url_for('admin.perf'))
@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session
 from sqlalchemy import text
 from app import db
+from app.services.audit import audit_trail
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -44,10 +45,12 @@ def login():
         if user:
             session['user_id'] = user['user_id']
             session['role'] = user['role']
+            audit_trail.record('Users', 'LOGIN', user_id=user['user_id'], username=username)
 
             flash('Login Successful!', 'success')
             return redirect(url_for('admin.dashboard'))
         else:
+            audit_trail.record('Users', 'LOGIN_FAIL', username=username)
             flash('Invalid username or password', 'danger')
 
     return render_template('auth/login.html')
@@ -58,6 +61,7 @@ def login():
 # -------------------------------------------------
 @auth_bp.route('/logout')
 def logout():
+    audit_trail.record('Users', 'LOGOUT')
     session.clear()
     flash('You have been logged out.', 'info')
     return redirect(url_for('auth.login'))
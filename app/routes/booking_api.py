@@ -0,0 +1,32 @@
+from flask import Blueprint, jsonify, request, current_app
+from app.services.reservations import reservation_engine
+
+booking_api_bp = Blueprint('booking_api', __name__, url_prefix='/api/bookings')
+
+@booking_api_bp.route('', methods=['POST'])
+def create_bookings():
+    """
+    Creates many bookings in one call (group arrivals, OTA sync).
+    Body: {"bookings": [{"guest_id", "room_id", "check_in", "check_out"}, ...]}
+    or the bare list. Totals are priced on the server; a client
+    total_amount is ignored. Each item gets its own result, in request order:
+    created (booking_id) / conflict (conflicting_booking_ids, reason) /
+    invalid (errors) / pending (still queued at the timeout).
+    """
+    payload = request.get_json(silent=True)
+    items = payload.get('bookings') if isinstance(payload, dict) else payload
+    if not isinstance(items, list) or not items or not all(isinstance(i, dict) for i in items):
+        return jsonify({'error': 'Expected a non-empty list of booking objects.'}), 400
+
+    max_items = current_app.config['BOOKING_API_MAX_ITEMS']
+    if len(items) > max_items:
+        return jsonify({'error': f'At most {max_items} bookings per request.'}), 413
+
+    results = reservation_engine.submit_many(items)
+    summary = {}
+    for result in results:
+        summary[result['status']] = summary.get(result['status'], 0) + 1
+
+    # 201 only if everything was written; otherwise the per-item results tell the story
+    status_code = 201 if summary.get('created') == len(results) else 200
+    return jsonify({'results': results, 'summary': summary}), status_code
@@ -1,109 +1,228 @@
 # app/routes/front_desk.py
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+import asyncio
+import os
+from datetime import date
+from flask import (Blueprint, render_template, request, redirect, url_for, flash, jsonify, abort,
+                   current_app, send_file, Response)
 from sqlalchemy import text
 from app import db
-# Import the new helper
-from app.services.db_utils import check_availability_proc
+from app.services.booking_loader import load_booking, load_bookings
+from app.services.availability import availability_index
+from app.services.events import publish
+from app.services import invoice_export
+from app.services.scheduler import run_once_in_background
+from app.services.db_routing import read_only
+from app.services.room_feed import room_feed
+from app.services.reservations import reservation_engine
+from app.services.ref_cache import ref_cache
+from app.services.async_db import async_db, async_view
+from app.services.housekeeping import housekeeping
+from app.services.response_cache import cached_response
 
 front_desk_bp = Blueprint('front_desk', __name__, url_prefix='/reception')
 
+# 1. VIEW Usage: RoomOccupancy (As defined in your SQL)
+# We join it with the Rooms table to show the grid
+ROOM_GRID_SQL = """
+    SELECT r.room_id, r.room_number, r.status, rt.name as type_name, rt.base_price,
+           COALESCE(v.total_bookings, 0) as historical_bookings
+    FROM Rooms r
+    JOIN RoomTypes rt ON r.type_id = rt.type_id
+    LEFT JOIN RoomOccupancy v ON r.room_number = v.room_number
+    ORDER BY r.room_number
+"""
+
 @front_desk_bp.route('/')
 @front_desk_bp.route('/room-grid')
+# The page embeds this process's feed sequence: a copy from another worker
+# (or from before a restart) would make the stream reset on every reload
+@cached_response('rooms', vary=lambda: room_feed.epoch)
+@read_only
 def room_grid():
-    # 1. VIEW Usage: RoomOccupancy (As defined in your SQL)
-    # We join it with the Rooms table to show the grid
-    query = text("""
-        SELECT r.room_id, r.room_number, r.status, rt.name as type_name, rt.base_price,
-               COALESCE(v.total_bookings, 0) as historical_bookings
-        FROM Rooms r
-        JOIN RoomTypes rt ON r.type_id = rt.type_id
-        LEFT JOIN RoomOccupancy v ON r.room_number = v.room_number
-        ORDER BY r.room_number
-    """)
-    rooms = db.session.execute(query).fetchall()
-    return render_template('reception/room_grid.html', rooms=rooms)
+    # Deltas after this sequence are streamed to the page (read before the
+    # snapshot so nothing falls in between)
+    feed_seq = room_feed.seq
+    rooms = db.session.execute(text(ROOM_GRID_SQL)).fetchall()
+    return render_template('reception/room_grid.html', rooms=rooms, feed_seq=feed_seq)
+
+@async_view('front_desk.room_grid')
+@cached_response('rooms', vary=lambda: room_feed.epoch)
+@read_only
+async def room_grid_async():
+    feed_seq = room_feed.seq
+    rooms = await async_db.fetch_all(ROOM_GRID_SQL)
+    return await asyncio.to_thread(render_template, 'reception/room_grid.html', rooms=rooms, feed_seq=feed_seq)
+
+@front_desk_bp.route('/room-grid/stream')
+def room_grid_stream():
+    """
+    Server-Sent Events: room status deltas for the open room grid.
+    EventSource reconnects send Last-Event-ID, so missed deltas are replayed.
+    Each stream holds a server thread: past ROOM_FEED_MAX_CLIENTS the page
+    gets a 503 (EventSource gives up) and keeps its periodic reload.
+    """
+    if room_feed.full:
+        return Response('Too many live room grids open', status=503, headers={'Retry-After': '60'})
+    since = request.headers.get('Last-Event-ID') or request.args.get('since')
+    try:
+        since = int(since) if since else None
+    except ValueError:
+        since = None
+    stream = room_feed.stream(since, heartbeat=current_app.config['ROOM_FEED_HEARTBEAT_SECONDS'])
+    return Response(stream, mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 @front_desk_bp.route('/book', methods=['GET', 'POST'])
 def create_booking():
     if request.method == 'POST':
-        guest_id = request.form.get('guest_id')
-        room_id = request.form.get('room_id')
-        check_in = request.form.get('check_in')
-        check_out = request.form.get('check_out')
-        total_price = request.form.get('total_price')
-
-        # TCL: START TRANSACTION
-        # Flask-SQLAlchemy handles 'START TRANSACTION' automatically when we use try/except
-        try:
-            # 1. Attempt to Insert (This will fire the 'PreventDoubleBooking' Trigger)
-            query = text("""
-                INSERT INTO Bookings (guest_id, room_id, check_in, check_out, total_amount)
-                VALUES (:g, :r, :cin, :cout, :amt)
-            """)
-            db.session.execute(query, {
-                'g': guest_id, 'r': room_id, 'cin': check_in, 'cout': check_out, 'amt': total_price
-            })
-            
-            # 2. Update Room Status
-            update_room = text("UPDATE Rooms SET status = 'booked' WHERE room_id = :rid")
-            db.session.execute(update_room, {'rid': room_id})
-            
-            # TCL: COMMIT
-            db.session.commit()
-            
+        # Goes through the reservation queue: pre-checked against the
+        # availability index, inserted (PreventDoubleBooking still guards it),
+        # room marked booked and committed; events are published on success.
+        # The total is priced from the nightly rates (parse_request); the
+        # page's estimate (total_price) is never trusted.
+        result = reservation_engine.submit(request.form.to_dict())
+
+        if result['status'] == 'created':
             flash('Booking Created Successfully!', 'success')
             return redirect(url_for('front_desk.room_grid'))
-            
-        except Exception as e:
-            # TCL: ROLLBACK
-            db.session.rollback()
-            
-            # Check if it's our specific Trigger error
-            error_msg = str(e)
-            if "Room is already booked" in error_msg:
-                flash('Error: This room is already booked for those dates! (Trigger Activated)', 'danger')
-            else:
-                flash(f'Database Error: {error_msg}', 'danger')
+        elif result['status'] == 'conflict':
+            flash(f"Error: {result['reason']}!", 'danger')
+        elif result['status'] == 'invalid':
+            flash(f"Invalid booking: {'; '.join(result['errors'])}", 'danger')
+        else:
+            flash(f"Database Error: {result.get('reason')}", 'danger')
 
     # Load Form Data
-    guests = db.session.execute(text("SELECT * FROM Guests")).fetchall()
+    # Guests are picked through the paged search (/api/guests/search), so the
+    # page never carries the guest table; only a guest already chosen (form
+    # shown again after an error) is looked up.
+    selected_guest = None
+    guest_id = request.form.get('guest_id', type=int)
+    if guest_id:
+        selected_guest = db.session.execute(text(
+            "SELECT guest_id, full_name, phone FROM Guests WHERE guest_id = :gid"
+        ), {'gid': guest_id}).first()
     
-    # Use the Stored Procedure for availability? 
-    # (Optional: In a real app, you'd filter the dropdown. For now, we list all rooms)
-    rooms = db.session.execute(text("SELECT r.room_id, r.room_number, rt.name, rt.base_price FROM Rooms r JOIN RoomTypes rt ON r.type_id = rt.type_id")).fetchall()
+    # Rooms + types rarely change: served from the reference cache
+    rooms = ref_cache.get('rooms')
+
+    # If the dates are already known (?check_in=&check_out=, or the posted
+    # form), only offer rooms that are free for the whole stay. Answered from
+    # the availability index; the page re-filters when the dates change.
+    check_in = request.values.get('check_in')
+    check_out = request.values.get('check_out')
+    if check_in and check_out:
+        try:
+            free = set(availability_index.free_rooms(check_in, check_out))
+            rooms = [r for r in rooms if r.room_id in free]
+        except ValueError:
+            flash('Invalid dates supplied for availability filter.', 'warning')
     
-    return render_template('reception/booking_form.html', guests=guests, rooms=rooms)
+    return render_template('reception/booking_form.html', rooms=rooms, selected_guest=selected_guest,
+                           check_in=check_in, check_out=check_out)
+
+
+@front_desk_bp.route('/availability')
+@read_only
+def availability():
+    """
+    JSON availability search served from the in-memory index.
+    ?check_in=&check_out=[&type_id=]  -> free room ids for the whole stay
+    ?from=&to=[&type_id=]             -> free gaps per room across a date range
+    """
+    type_id = request.args.get('type_id', type=int)
+    try:
+        if request.args.get('from') and request.args.get('to'):
+            calendar = availability_index.free_calendar(
+                request.args['from'], request.args['to'], type_id)
+            return jsonify({
+                str(room_id): [[s.isoformat(), e.isoformat()] for s, e in gaps]
+                for room_id, gaps in calendar.items()
+            })
+        rooms = availability_index.free_rooms(
+            request.args.get('check_in', ''), request.args.get('check_out', ''), type_id)
+    except ValueError:
+        return jsonify({'error': 'Dates must be in YYYY-MM-DD format.'}), 400
+    return jsonify({'rooms': rooms})
 
 
 @front_desk_bp.route('/invoice/<int:booking_id>')
 def invoice(booking_id):
-    # 1. Fetch Booking & Guest Info
-    booking_sql = text("""
-        SELECT b.booking_id, b.check_in, b.check_out, b.total_amount, 
-            g.full_name, g.phone, g.email
-        FROM Bookings b
-        JOIN Guests g ON b.guest_id = g.guest_id
-        WHERE b.booking_id = :bid
-    """)
-    booking = db.session.execute(booking_sql, {'bid': booking_id}).fetchone()
-
-    # 2. Fetch Services ordered by this booking
-    services_sql = text("""
-        SELECT s.service_name, so.quantity, so.total_order_cost 
-        FROM ServiceOrders so
-        JOIN Services s ON so.service_id = s.service_id
-        WHERE so.booking_id = :bid
-    """)
-    services = db.session.execute(services_sql, {'bid': booking_id}).fetchall()
-
-    # 3. Calculate Final Total
-    service_total = sum(s.total_order_cost for s in services)
-    final_total = booking.total_amount + service_total
+    # Booking, guest, services and totals in two queries (services/booking_loader.py)
+    booking = load_booking(booking_id)
+    if booking is None:
+        abort(404)
 
     return render_template('reception/invoice.html', 
                         booking=booking, 
-                        services=services, 
-                        final_total=final_total)
+                        services=booking.services, 
+                        final_total=booking.final_total)
+
+@front_desk_bp.route('/invoices/print')
+def print_invoices():
+    """
+    Night audit: every invoice for bookings checking out on ?date= (default today),
+    bulk-loaded with a constant number of queries and printed in one go.
+    """
+    audit_date = request.args.get('date') or date.today().isoformat()
+    booking_ids = db.session.execute(text("""
+        SELECT booking_id FROM Bookings
+        WHERE check_out = :d AND booking_status <> 'cancelled'
+        ORDER BY booking_id
+    """), {'d': audit_date}).scalars().all()
+    bookings = load_bookings(booking_ids)
+
+    return render_template('reception/invoice_batch.html',
+                           bookings=[bookings[bid] for bid in booking_ids if bid in bookings],
+                           audit_date=audit_date)
+
+def _export_dir():
+    return current_app.config.get('EXPORT_DIR') or os.path.join(current_app.instance_path, 'exports')
+
+@front_desk_bp.route('/invoices/export', methods=['POST'])
+def export_invoices():
+    """
+    Starts a background export of every completed booking's invoice with a
+    check-out in [from, to]. Returns 202 + a status URL; the file is written
+    in chunks by a background thread, not by the web worker.
+    """
+    date_from = request.values.get('from')
+    date_to = request.values.get('to')
+    fmt = request.values.get('format', 'csv')
+    try:
+        date.fromisoformat(date_from or '')
+        date.fromisoformat(date_to or '')
+    except ValueError:
+        return jsonify({'error': 'from and to must be YYYY-MM-DD dates.'}), 400
+    if fmt not in invoice_export.FORMATS:
+        return jsonify({'error': 'format must be csv, jsonl or html.'}), 400
+
+    job_id, path = invoice_export.new_job_path(_export_dir(), fmt)
+    open(path + '.part', 'w').close()   # visible as "running" straight away
+    run_once_in_background(current_app._get_current_object(), invoice_export.run_export_job,
+                           path, date_from, date_to, fmt)
+
+    status_url = url_for('front_desk.export_status', job_id=job_id)
+    if request.form:
+        return redirect(status_url, code=303)
+    return jsonify({'job_id': job_id, 'status': 'running', 'status_url': status_url}), 202
+
+@front_desk_bp.route('/invoices/export/<job_id>')
+def export_status(job_id):
+    """
+    Downloads a finished export, or reports running/failed.
+    """
+    status, path, fmt = invoice_export.find_job(_export_dir(), job_id)
+    if status == 'done':
+        mimetype, ext = invoice_export.FORMATS[fmt]
+        return send_file(path, mimetype=mimetype, as_attachment=True,
+                         download_name=f"invoices-{job_id}.{ext}")
+    if status == 'failed':
+        with open(path, encoding='utf-8') as fh:
+            return jsonify({'job_id': job_id, 'status': 'failed', 'error': fh.read()}), 500
+    if status == 'running':
+        return jsonify({'job_id': job_id, 'status': 'running'}), 202
+    abort(404)
 
 # --- BOOKING MANAGEMENT (Completes the remaining DB Concepts) ---
 
@@ -113,14 +232,10 @@ def booking_details(booking_id):
     Shows details for a specific booking.
     Allows adding services (Trigger Test) and Checking Out (Stored Proc Test).
     """
-    # 1. Fetch Basic Booking Info
-    booking = db.session.execute(text("""
-        SELECT b.*, g.full_name, r.room_number 
-        FROM Bookings b
-        JOIN Guests g ON b.guest_id = g.guest_id
-        JOIN Rooms r ON b.room_id = r.room_id
-        WHERE b.booking_id = :bid
-    """), {'bid': booking_id}).fetchone()
+    # 1. Fetch the booking aggregate (guest, room, ordered services) in two queries
+    booking = load_booking(booking_id)
+    if booking is None:
+        abort(404)
 
     # 2. Add Service Logic (trigger: BeforeServiceOrderInsert)
     if request.method == 'POST' and 'service_id' in request.form:
@@ -130,11 +245,18 @@ def booking_details(booking_id):
         try:
             # Note: We do NOT insert 'total_order_cost'. 
             # We let the MySQL TRIGGER calculate it automatically.
-            db.session.execute(text("""
+            result = db.session.execute(text("""
                 INSERT INTO ServiceOrders (booking_id, service_id, quantity)
                 VALUES (:bid, :sid, :qty)
             """), {'bid': booking_id, 'sid': service_id, 'qty': quantity})
+            order_id = result.lastrowid
             db.session.commit()
+
+            # Read back the trigger-calculated cost (PK lookup) for the running totals
+            cost = db.session.execute(text("SELECT total_order_cost FROM ServiceOrders WHERE order_id = :oid"),
+                                      {'oid': order_id}).scalar()
+            publish('service_ordered', order_id=order_id, booking_id=booking_id, service_id=int(service_id),
+                    quantity=int(quantity), total_order_cost=cost, check_in=booking.check_in)
             flash('Service added! The DB Trigger automatically calculated the cost.', 'success')
         except Exception as e:
             db.session.rollback()
@@ -142,18 +264,11 @@ def booking_details(booking_id):
         
         return redirect(url_for('front_desk.booking_details', booking_id=booking_id))
 
-    # 3. Fetch Services for this booking
-    # COVERS COMPLEX QUERY #11: GROUP_CONCAT isn't needed here for display, 
-    # but we list them normally. We will put GROUP_CONCAT in the reports.
-    ordered_services = db.session.execute(text("""
-        SELECT so.*, s.service_name 
-        FROM ServiceOrders so
-        JOIN Services s ON so.service_id = s.service_id
-        WHERE so.booking_id = :bid
-    """), {'bid': booking_id}).fetchall()
+    # 3. Services for this booking came with the aggregate
+    ordered_services = booking.services
 
     # 4. Fetch Available Services for dropdown
-    all_services = db.session.execute(text("SELECT * FROM Services")).fetchall()
+    all_services = ref_cache.get('services')
 
     return render_template('reception/booking_details.html', 
                            booking=booking, 
@@ -170,9 +285,53 @@ def checkout_guest(booking_id):
         # Procedure: UPDATE Bookings SET status='completed'; UPDATE Rooms SET status='available'
         from app.services.db_utils import complete_booking_proc
         complete_booking_proc(booking_id)
+
+        # The nights are free again from today and the room stays bookable;
+        # cleaning it is queued for housekeeping (services/housekeeping.py)
+        room_id = db.session.execute(text("SELECT room_id FROM Bookings WHERE booking_id = :bid"),
+                                     {'bid': booking_id}).scalar()
+        publish('booking_completed', booking_id=booking_id, room_id=room_id)
+        if room_id is not None:
+            housekeeping.turnover(booking_id, room_id)
+            publish('room_status_changed', room_id=room_id, status='available')
         
         flash('Guest Checked Out Successfully (Stored Procedure Executed)', 'success')
     except Exception as e:
         flash(f'Checkout Failed: {e}', 'danger')
         
+    return redirect(url_for('front_desk.room_grid'))
+
+@front_desk_bp.route('/cancel/<int:booking_id>', methods=['POST'])
+def cancel_booking(booking_id):
+    """
+    Cancels an active booking. The room is released only if this was the
+    stay in progress; a future booking leaves the current guest's room alone.
+    """
+    try:
+        room_id = db.session.execute(text("""
+            SELECT room_id FROM Bookings
+            WHERE booking_id = :bid AND booking_status = 'active'
+        """), {'bid': booking_id}).scalar()
+        if room_id is None:
+            flash('Only active bookings can be cancelled.', 'warning')
+            return redirect(url_for('front_desk.booking_details', booking_id=booking_id))
+
+        db.session.execute(text("UPDATE Bookings SET booking_status = 'cancelled' WHERE booking_id = :bid"),
+                           {'bid': booking_id})
+        released = db.session.execute(text("""
+            UPDATE Rooms SET status = 'available'
+            WHERE room_id = :rid AND status = 'booked'
+              AND EXISTS (SELECT 1 FROM Bookings
+                          WHERE booking_id = :bid AND check_in <= :today AND check_out > :today)
+        """), {'rid': room_id, 'bid': booking_id, 'today': date.today()}).rowcount > 0
+        db.session.commit()
+
+        publish('booking_cancelled', booking_id=booking_id, room_id=room_id)
+        if released:
+            publish('room_status_changed', room_id=room_id, status='available')
+        flash('Booking cancelled and room released.' if released else 'Booking cancelled.', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Cancellation Failed: {e}', 'danger')
+
     return redirect(url_for('front_desk.room_grid'))
\ No newline at end of file
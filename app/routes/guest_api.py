@@ -1,18 +1,63 @@
-from flask import Blueprint, jsonify, request
-from sqlalchemy import text
-from app import db
+from flask import Blueprint, jsonify, request, url_for
+from app.services.guest_search import search_guests, search_guests_page, asearch_guests, asearch_guests_page
+from app.services.db_routing import read_only
+from app.services.async_db import async_view
+from app.services.response_cache import cached_response
 
 guest_api_bp = Blueprint('guest_api', __name__, url_prefix='/api/guests')
 
+def _search_args():
+    query_str = request.args.get('q', '').strip()
+    # Result cap keeps the typeahead payload small; ranking puts exact / prefix hits first
+    limit = max(1, min(request.args.get('limit', 20, type=int), 50))
+    # Paged mode (guest picker): ?cursor= empty for the first page, then
+    # the X-Next-Cursor of the previous response - no OFFSET anywhere
+    paged = 'cursor' in request.args
+    return query_str, limit, paged, request.args.get('cursor') or None
+
+def _search_response(query_str, limit, results, next_cursor):
+    # Convert to JSON format
+    guests_list = [{'id': guest_id, 'text': f"{full_name} ({phone})"} for guest_id, full_name, phone in results]
+    response = jsonify(guests_list)
+    if next_cursor:
+        # Body stays the plain list existing clients expect; paging rides in headers
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = '<{}>; rel="next"'.format(
+            url_for('guest_api.search_guest', q=query_str, limit=limit, cursor=next_cursor))
+    return response
+
 @guest_api_bp.route('/search')
+@cached_response('guests')
+@read_only
 def search_guest():
-    query_str = request.args.get('q', '')
+    query_str, limit, paged, cursor = _search_args()
     if not query_str:
         return jsonify([])
-        
-    sql = text("SELECT guest_id, full_name, phone FROM Guests WHERE full_name LIKE :q OR phone LIKE :q")
-    results = db.session.execute(sql, {'q': f'%{query_str}%'}).fetchall()
-    
-    # Convert to JSON format
-    guests_list = [{'id': r.guest_id, 'text': f"{r.full_name} ({r.phone})"} for r in results]
-    return jsonify(guests_list)
\ No newline at end of file
+
+    next_cursor = None
+    if paged:
+        try:
+            results, next_cursor = search_guests_page(query_str, limit, cursor)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+    else:
+        results = search_guests(query_str, limit)
+    return _search_response(query_str, limit, results, next_cursor)
+
+@async_view('guest_api.search_guest')
+@cached_response('guests')
+@read_only
+async def search_guest_async():
+    query_str, limit, paged, cursor = _search_args()
+    if not query_str:
+        return jsonify([])
+
+    next_cursor = None
+    if paged:
+        try:
+            results, next_cursor = await asearch_guests_page(query_str, limit, cursor)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+    else:
+        results = await asearch_guests(query_str, limit)
+    return _search_response(query_str, limit, results, next_cursor)
@@ -0,0 +1,72 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from app.services.events import publish
+from app.services.housekeeping import housekeeping
+from app.services.ref_cache import ref_cache
+
+housekeeping_bp = Blueprint('housekeeping', __name__, url_prefix='/housekeeping')
+
+def _room_numbers():
+    return {r.room_id: r.room_number for r in ref_cache.get('rooms')}
+
+def _complete(task_id):
+    room_id, released = housekeeping.complete(task_id)
+    if released:
+        publish('room_status_changed', room_id=room_id, status='available')
+    return room_id, released
+
+@housekeeping_bp.route('/')
+def board():
+    """
+    Turnover / repair task lists per on-shift employee, in working order.
+    """
+    return render_template('reception/housekeeping.html', board=housekeeping.board(),
+                           rooms=_room_numbers(), room_list=ref_cache.get('rooms'))
+
+@housekeeping_bp.route('/tasks', methods=['POST'])
+def add_task():
+    room_id = request.form.get('room_id', type=int)
+    task_desc = (request.form.get('task_desc') or '').strip()
+    if room_id is None or not task_desc:
+        flash('Room and description are required.', 'warning')
+        return redirect(url_for('housekeeping.board'))
+    try:
+        _, held = housekeeping.add_task(room_id, task_desc)
+        if held:
+            publish('room_status_changed', room_id=room_id, status='maintenance')
+        flash('Maintenance task created.', 'success')
+    except Exception as e:
+        flash(f'Could not create task: {e}', 'danger')
+    return redirect(url_for('housekeeping.board'))
+
+@housekeeping_bp.route('/tasks/<int:task_id>/complete', methods=['POST'])
+def complete_task(task_id):
+    try:
+        _, released = _complete(task_id)
+        flash('Task completed, room is available again.' if released else 'Task completed.', 'success')
+    except LookupError as e:
+        flash(str(e.args[0]), 'warning')
+    except Exception as e:
+        flash(f'Could not complete task: {e}', 'danger')
+    return redirect(url_for('housekeeping.board'))
+
+@housekeeping_bp.route('/api/tasks')
+def tasks_api():
+    """
+    The board as JSON; ?emp_id= narrows it to one employee's list.
+    """
+    board = housekeeping.board()
+    emp_id = request.args.get('emp_id', type=int)
+    if emp_id is not None:
+        staff = next((s for s in board['staff'] if s['emp_id'] == emp_id), None)
+        if staff is None:
+            return jsonify({'error': 'Unknown employee'}), 404
+        return jsonify(staff)
+    return jsonify(board)
+
+@housekeeping_bp.route('/api/tasks/<int:task_id>/complete', methods=['POST'])
+def complete_task_api(task_id):
+    try:
+        room_id, released = _complete(task_id)
+    except LookupError as e:
+        return jsonify({'error': str(e.args[0])}), 404
+    return jsonify({'task_id': task_id, 'room_id': room_id, 'room_status': 'available' if released else None})
@@ -0,0 +1,54 @@
+from datetime import date
+from flask import Blueprint, jsonify, request
+from app.services.pricing import pricing_engine
+from app.services.db_routing import read_only
+
+pricing_api_bp = Blueprint('pricing_api', __name__, url_prefix='/api/pricing')
+
+# Quotes / forecasts longer than this are refused
+MAX_NIGHTS = 366 * 2
+
+def _span(start_key, end_key):
+    start, end = request.args.get(start_key), request.args.get(end_key)
+    if not start or not end:
+        raise ValueError(f'{start_key} and {end_key} are required (YYYY-MM-DD).')
+    start, end = date.fromisoformat(start), date.fromisoformat(end)
+    if end <= start or (end - start).days > MAX_NIGHTS:
+        raise ValueError('Invalid date range.')
+    return start, end
+
+@pricing_api_bp.route('/quote')
+@read_only
+def quote():
+    """
+    Server-side price for a stay: nightly rates and total.
+    ?check_in=&check_out=[&room_id=|&type_id=]  (no room/type: every room type)
+    """
+    try:
+        check_in, check_out = _span('check_in', 'check_out')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    room_id = request.args.get('room_id', type=int)
+    type_id = request.args.get('type_id', type=int)
+    try:
+        if room_id is not None:
+            return jsonify(pricing_engine.quote_room(room_id, check_in, check_out))
+        if type_id is not None:
+            return jsonify(pricing_engine.quote(type_id, check_in, check_out))
+    except LookupError as e:
+        return jsonify({'error': str(e.args[0])}), 404
+    return jsonify({'quotes': pricing_engine.quote_all(check_in, check_out)})
+
+@pricing_api_bp.route('/forecast')
+@read_only
+def forecast():
+    """
+    Occupancy on the books, forecast occupancy and nightly rate per room
+    type for each night in [from, to).
+    """
+    try:
+        start, end = _span('from', 'to')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(pricing_engine.forecast(start, end))
@@ -1,67 +1,50 @@
-from flask import Blueprint, render_template
-from sqlalchemy import text
-from app import db
+import asyncio
 
-report_bp = Blueprint('reports', __name__, url_prefix='/admin/reports')
-
-@report_bp.route('/')
-def analytics_dashboard():
-    # 1. VIEW Usage: RoomOccupancy (Existing)
-    occupancy_view = db.session.execute(text("SELECT * FROM RoomOccupancy")).fetchall()
-
-    # 2. VIEW Usage: ShiftOverlap (NEW - Matches your SQL file)
-    shift_buddies = db.session.execute(text("SELECT * FROM ShiftOverlap")).fetchall()
-
-    # 3. VIEW Usage: PackagePossibilities (NEW - Matches your SQL file)
-    # We fetch top 5 just to show the Cross Join works
-    packages = db.session.execute(text("SELECT * FROM PackagePossibilities LIMIT 5")).fetchall()
+from flask import Blueprint, render_template, redirect, url_for, flash
+from app.services.report_cache import report_snapshot
+from app.services.guest_stats import guest_stats
+from app.services.db_routing import read_only
+from app.services.async_db import async_view
+from app.services.response_cache import cached_response
 
-    # 4. Complex Query: VIP Guest Ranking (Using your GetGuestLevel Function)
-    vip_guests = db.session.execute(text("""
-        SELECT g.full_name,
-        (IFNULL(SUM(b.total_amount), 0) + IFNULL(SUM(so.total_order_cost), 0)) AS total_lifetime_spent,
-        GetGuestLevel((IFNULL(SUM(b.total_amount), 0) + IFNULL(SUM(so.total_order_cost), 0))) AS vip_status
-        FROM Guests g
-        LEFT JOIN Bookings b ON g.guest_id = b.guest_id
-        LEFT JOIN ServiceOrders so ON b.booking_id = so.booking_id
-        GROUP BY g.guest_id
-        ORDER BY total_lifetime_spent DESC LIMIT 5
-    """)).fetchall()
-
-    # 5. Complex Query: High Value Services
-    top_services = db.session.execute(text("""
-        SELECT s.service_name, SUM(so.total_order_cost) AS total_revenue
-        FROM Services s
-        JOIN ServiceOrders so ON s.service_id = so.service_id
-        GROUP BY s.service_name
-        HAVING total_revenue > 1000
-    """)).fetchall()
-    
-    # 6. Unused Room Types (Subquery)
-    unused_rooms = db.session.execute(text("""
-        SELECT name, base_price FROM RoomTypes 
-        WHERE type_id NOT IN (
-            SELECT DISTINCT r.type_id FROM Rooms r 
-            JOIN Bookings b ON r.room_id = b.room_id
-        )
-    """)).fetchall()
-
-    # 7. Group Concat (String Aggregation)
-    service_summary = db.session.execute(text("""
-        SELECT b.booking_id, g.full_name,
-        GROUP_CONCAT(s.service_name SEPARATOR ', ') AS services_ordered
-        FROM Bookings b
-        JOIN Guests g ON b.guest_id = g.guest_id
-        JOIN ServiceOrders so ON b.booking_id = so.booking_id
-        JOIN Services s ON so.service_id = s.service_id
-        GROUP BY b.booking_id
-    """)).fetchall()
+report_bp = Blueprint('reports', __name__, url_prefix='/admin/reports')
 
+def _render_reports(results, vip_guests):
     return render_template('admin/reports.html',
-                           occupancy=occupancy_view,
+                           occupancy=results['occupancy'],
                            vip_guests=vip_guests,
-                           top_services=top_services,
-                           shift_buddies=shift_buddies,
-                           unused_rooms=unused_rooms,
-                           service_summary=service_summary,
-                           packages=packages)
\ No newline at end of file
+                           top_services=results['top_services'],
+                           shift_buddies=results['shift_buddies'],
+                           unused_rooms=results['unused_rooms'],
+                           service_summary=results['service_summary'],
+                           packages=results['packages'],
+                           refreshed_at=report_snapshot.refreshed_at,
+                           refresh_seconds=report_snapshot.refresh_seconds)
+
+@report_bp.route('/')
+@cached_response('reports')
+@read_only
+def analytics_dashboard():
+    # The report queries (views, GROUP_CONCAT summary, ...) are materialized
+    # in the background; see services/report_cache.py. The VIP ranking is a
+    # slice of the maintained guest stats (services/guest_stats.py)
+    return _render_reports(report_snapshot.get(), guest_stats.top(5))
+
+@async_view('reports.analytics_dashboard')
+@cached_response('reports')
+@read_only
+async def analytics_dashboard_async():
+    # A missing snapshot is built with the six queries running in parallel
+    results = await report_snapshot.aget()
+    # May (re)load the stats or look up new tiers, so off the event loop
+    vip_guests = await asyncio.to_thread(guest_stats.top, 5)
+    return await asyncio.to_thread(_render_reports, results, vip_guests)
+
+@report_bp.route('/refresh', methods=['POST'])
+def refresh_reports():
+    """
+    Queues an immediate background rebuild of the report snapshot.
+    """
+    report_snapshot.refresh_async()
+    flash('Report refresh started. Reload in a few seconds to see the new figures.', 'info')
+    return redirect(url_for('reports.analytics_dashboard'))
\ No newline at end of file
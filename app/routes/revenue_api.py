@@ -0,0 +1,40 @@
+from datetime import date, timedelta
+from flask import Blueprint, jsonify, request
+from app.services.revenue import revenue_series, GRANULARITIES
+from app.services.db_routing import read_only
+
+revenue_api_bp = Blueprint('revenue_api', __name__, url_prefix='/api/revenue')
+
+# Guard against accidental century-long requests
+MAX_SPAN_DAYS = 366 * 20
+
+@revenue_api_bp.route('')
+@read_only
+def revenue_series_api():
+    """
+    Revenue time-series from the pre-aggregated daily buckets.
+    ?from=YYYY-MM-DD&to=YYYY-MM-DD&granularity=day|week|month
+    Defaults to the last 6 months by month.
+    """
+    granularity = request.args.get('granularity', 'month')
+    if granularity not in GRANULARITIES:
+        return jsonify({'error': 'granularity must be day, week or month'}), 400
+
+    try:
+        end = date.fromisoformat(request.args['to']) if request.args.get('to') else date.today()
+        start = date.fromisoformat(request.args['from']) if request.args.get('from') else end - timedelta(days=182)
+    except ValueError:
+        return jsonify({'error': 'Dates must be in YYYY-MM-DD format.'}), 400
+    if start > end or (end - start).days > MAX_SPAN_DAYS:
+        return jsonify({'error': 'Invalid date range.'}), 400
+
+    labels, values = revenue_series.series(start, end, granularity)
+    return jsonify({
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'granularity': granularity,
+        'labels': labels,
+        # Same definition as the dashboard total: room charges + service orders
+        'revenue': [b + s for b, s in zip(values['bookings'], values['services'])],
+        **values,
+    })
\ No newline at end of file
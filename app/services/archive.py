@@ -0,0 +1,236 @@
+# app/services/archive.py
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import bindparam, inspect, text
+from app import db
+from app.services.response_cache import response_cache
+
+# Hot table -> archive table with the same columns
+ARCHIVE_TABLES = {
+    'Bookings': 'BookingsArchive',
+    'ServiceOrders': 'ServiceOrdersArchive',
+    'Payments': 'PaymentsArchive',
+    'Feedback': 'FeedbackArchive',
+    'AuditLog': 'AuditLogArchive',
+}
+# The hot tables by themselves, for the same {Table} placeholders
+HOT_TABLES = {table: table for table in ARCHIVE_TABLES}
+
+# A booking's children, moved (and deleted, before the booking) in the same transaction
+BOOKING_CHILDREN = ('ServiceOrders', 'Payments', 'Feedback')
+
+CLOSED_BOOKINGS = text("""
+    SELECT booking_id FROM Bookings
+    WHERE booking_status IN ('completed', 'cancelled') AND check_out < :cutoff
+    ORDER BY booking_id
+    LIMIT :limit
+""")
+OLD_AUDIT_ENTRIES = text("""
+    SELECT log_id FROM AuditLog
+    WHERE action_timestamp < :cutoff
+    ORDER BY log_id
+    LIMIT :limit
+""")
+
+
+def _in(sql, name):
+    return text(sql).bindparams(bindparam(name, expanding=True))
+
+
+class HistoryArchive:
+    """
+    Hot/cold split for the tables that only grow: Bookings with their
+    ServiceOrders, Payments and Feedback, and AuditLog.
+
+    Bookings closed (completed or cancelled) for more than
+    ARCHIVE_BOOKINGS_AFTER_DAYS, together with their child rows, and audit
+    entries older than ARCHIVE_AUDIT_AFTER_DAYS are moved to the *Archive
+    tables (same columns, no foreign keys, no triggers). Each batch of
+    ARCHIVE_BATCH_SIZE is one INSERT ... SELECT plus DELETE per table in a
+    single transaction, with ARCHIVE_PAUSE_MS between batches so
+    front-desk writes are never stuck behind a long lock.
+
+    Operational queries keep reading the plain tables and only see the
+    hot rows. Reports and lifetime aggregates go through history_sql(),
+    which reads hot and archived rows as one table.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._running = threading.Lock()
+        self._available = None
+        self._columns = {}      # hot table -> column list, as in the database
+        self._checked_at = None
+        self.counters = {'runs': 0, 'bookings': 0, 'service_orders': 0, 'payments': 0,
+                         'feedback': 0, 'audit_entries': 0, 'batches': 0}
+        self.last_run = None
+
+    # -------------------------------------------------
+    # Archive tables
+    # -------------------------------------------------
+    def available(self):
+        """
+        True once the archive tables exist. Re-checked every few minutes so
+        a worker sees tables created by another one (or a column added).
+        """
+        if self._checked_at is None or time.monotonic() - self._checked_at > 300:
+            available = inspect(db.engine).has_table(ARCHIVE_TABLES['Bookings'])
+            columns = self._load_columns() if available else {}
+            with self._lock:
+                self._available, self._columns, self._checked_at = available, columns, time.monotonic()
+        return self._available
+
+    def _load_columns(self):
+        """
+        Every column of each hot table, read from the database rather than
+        the models so unmapped columns are moved too. Raises RuntimeError
+        when an archive table no longer has the same columns (a column
+        added to the hot table only): moving rows would lose data.
+        """
+        inspector = inspect(db.engine)
+        columns = {}
+        for hot, archive in ARCHIVE_TABLES.items():
+            names = [c['name'] for c in inspector.get_columns(hot)]
+            archived = {c['name'] for c in inspector.get_columns(archive)}
+            if set(names) != archived:
+                raise RuntimeError(f"{archive} columns differ from {hot}: "
+                                   f"missing {sorted(set(names) - archived)}, extra {sorted(archived - set(names))}")
+            columns[hot] = ', '.join(names)
+        return columns
+
+    def ensure_tables(self):
+        mysql = db.engine.dialect.name == 'mysql'
+        for hot, archive in ARCHIVE_TABLES.items():
+            if mysql:
+                # Copies the columns and indexes, not the foreign keys or triggers
+                db.session.execute(text(f"CREATE TABLE IF NOT EXISTS {archive} LIKE {hot}"))
+            else:
+                db.session.execute(text(f"CREATE TABLE IF NOT EXISTS {archive} AS SELECT * FROM {hot} WHERE 0"))
+        db.session.commit()
+        columns = self._load_columns()
+        with self._lock:
+            self._available, self._columns, self._checked_at = True, columns, time.monotonic()
+
+    def sources(self, where=None):
+        """
+        {Table: FROM-clause source} for history_sql(): the hot table alone,
+        or hot UNION ALL archive once archiving has started. A table's
+        predicate in `where` is applied inside each branch.
+        """
+        where = where or {}
+        available = self.available()
+        with self._lock:
+            columns = dict(self._columns)
+        sources = {}
+        for hot, archive in ARCHIVE_TABLES.items():
+            condition = f" WHERE {where[hot]}" if hot in where else ''
+            if not available:
+                sources[hot] = f"(SELECT * FROM {hot}{condition})" if condition else hot
+            else:
+                sources[hot] = (f"(SELECT {columns[hot]} FROM {hot}{condition} "
+                                f"UNION ALL SELECT {columns[hot]} FROM {archive}{condition})")
+        return sources
+
+    # -------------------------------------------------
+    # Moving rows
+    # -------------------------------------------------
+    def run(self, max_batches=None):
+        """
+        Archives everything past the cut-offs, batch by batch. Returns the
+        number of rows moved per table; concurrent runs collapse into one.
+        """
+        if not self._running.acquire(blocking=False):
+            return None
+        try:
+            config = current_app.config
+            batch_size = config['ARCHIVE_BATCH_SIZE']
+            pause = config['ARCHIVE_PAUSE_MS'] / 1000.0
+            today = date.today()
+            booking_cutoff = today - timedelta(days=config['ARCHIVE_BOOKINGS_AFTER_DAYS'])
+            audit_cutoff = datetime.combine(today - timedelta(days=config['ARCHIVE_AUDIT_AFTER_DAYS']),
+                                            datetime.min.time())
+            self.ensure_tables()
+
+            moved = dict.fromkeys(('bookings', 'service_orders', 'payments', 'feedback', 'audit_entries'), 0)
+            batches = 0
+            for step, cutoff in ((self._archive_bookings, booking_cutoff), (self._archive_audit, audit_cutoff)):
+                while max_batches is None or batches < max_batches:
+                    counts = step(cutoff, batch_size)
+                    if not counts:
+                        break
+                    batches += 1
+                    for key, count in counts.items():
+                        moved[key] += count
+                    time.sleep(pause)
+
+            with self._lock:
+                self.counters['runs'] += 1
+                self.counters['batches'] += batches
+                for key, count in moved.items():
+                    self.counters[key] += count
+                self.last_run = datetime.now()
+            if moved['audit_entries']:
+                response_cache.bump('audit')
+            return moved
+        finally:
+            self._running.release()
+
+    def _archive_bookings(self, cutoff, limit):
+        ids = db.session.execute(CLOSED_BOOKINGS, {'cutoff': cutoff, 'limit': limit}).scalars().all()
+        if not ids:
+            return None
+        counts = {}
+        try:
+            for table, key in zip(BOOKING_CHILDREN + ('Bookings',),
+                                  ('service_orders', 'payments', 'feedback', 'bookings')):
+                counts[key] = self._move(table, 'booking_id', ids)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return counts
+
+    def _archive_audit(self, cutoff, limit):
+        ids = db.session.execute(OLD_AUDIT_ENTRIES, {'cutoff': cutoff, 'limit': limit}).scalars().all()
+        if not ids:
+            return None
+        try:
+            counts = {'audit_entries': self._move('AuditLog', 'log_id', ids)}
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return counts
+
+    def _move(self, table, key, ids):
+        columns = self._columns[table]
+        db.session.execute(_in(f"""
+            INSERT INTO {ARCHIVE_TABLES[table]} ({columns})
+            SELECT {columns} FROM {table} WHERE {key} IN :ids
+        """, 'ids'), {'ids': ids})
+        return db.session.execute(_in(f"DELETE FROM {table} WHERE {key} IN :ids", 'ids'), {'ids': ids}).rowcount
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, last_run=self.last_run, available=self._available)
+
+
+history_archive = HistoryArchive()
+
+
+def history_sql(sql, **where):
+    """
+    The query layer for reports over the full history: {Bookings},
+    {ServiceOrders}, {Payments}, {Feedback} and {AuditLog} in `sql` read
+    the hot and the archived rows together. Give each one an alias
+    ("FROM {Bookings} b").
+
+    Filter a table through `where` (Bookings="check_out >= :d1", plain
+    column names) rather than in the outer WHERE: the predicate is then
+    repeated in both halves of the UNION, where the table's indexes serve
+    it, instead of being applied to the combined rows.
+    """
+    return sql.format(**history_archive.sources(where))
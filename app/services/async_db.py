@@ -0,0 +1,161 @@
+# app/services/async_db.py
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+from functools import wraps
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from app.services.db_routing import statement_timeout
+from app.services.profiling import profiler
+
+# Sync dialect -> asyncio driver for the same database
+ASYNC_DRIVERS = {'mysql': 'aiomysql', 'sqlite': 'aiosqlite'}
+
+# endpoint -> async view, registered with @async_view next to the sync view
+ASYNC_VIEWS = {}
+
+
+def async_url(url):
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}'")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def async_view(endpoint):
+    """
+    Marks an async def as the variant of `endpoint` served when ASYNC_VIEWS
+    is on. It takes over the endpoint (same URL, url_for, template).
+    """
+    def decorator(func):
+        ASYNC_VIEWS[endpoint] = func
+        return func
+    return decorator
+
+
+class AsyncDatabase:
+    """
+    Async engines (aiomysql) plus the event loop the async views run on.
+
+    One long-lived loop thread owns the pools, so connections are reused
+    across requests and a view can issue its independent queries at once
+    (gather). Flask's async_to_sync is pointed at this loop instead of a
+    fresh loop per request; the request/app context travels with the
+    coroutine. Engines are created lazily, on the loop thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.enabled = False
+        self._loop = None
+        self._urls = {}
+        self._options = {}
+        self._engines = {}
+        self._timeout_ms = 0
+
+    def init_app(self, app):
+        self.enabled = app.config.get('ASYNC_VIEWS', False)
+        if not self.enabled:
+            return
+        self._urls = {None: async_url(app.config['SQLALCHEMY_DATABASE_URI'])}
+        replica = app.config.get('SQLALCHEMY_BINDS', {}).get('replica')
+        if replica:
+            self._urls['replica'] = async_url(replica)
+        # Same pool profile / connect_args as the sync engines (aiomysql takes
+        # connect_timeout too), with its own pool size
+        self._options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+        self._timeout_ms = app.config.get('DB_STATEMENT_TIMEOUT_MS', 0)
+        if 'pool_size' in self._options:
+            self._options['pool_size'] = app.config.get('ASYNC_DB_POOL_SIZE', 20)
+
+        app.async_to_sync = self.async_to_sync
+        for endpoint, view in ASYNC_VIEWS.items():
+            if endpoint in app.view_functions:
+                app.view_functions[endpoint] = view
+
+    # -------------------------------------------------
+    # Loop
+    # -------------------------------------------------
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='async-db', daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def run(self, coro):
+        """
+        Runs a coroutine on the shared loop and blocks the calling thread
+        for its result. Context variables (Flask's request/app context) are
+        copied into the task.
+        """
+        loop = self._ensure_loop()
+        context = contextvars.copy_context()
+        future = concurrent.futures.Future()
+
+        def done(task):
+            if task.cancelled():
+                future.cancel()
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+            else:
+                future.set_result(task.result())
+
+        def start():
+            # create_task copies the current context - here, the caller's
+            task = context.run(loop.create_task, coro)
+            task.add_done_callback(done)
+
+        loop.call_soon_threadsafe(start)
+        return future.result()
+
+    def async_to_sync(self, func):
+        """
+        Replacement for Flask.async_to_sync (used by app.ensure_sync).
+        """
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return self.run(func(*args, **kwargs))
+        return wrapper
+
+    # -------------------------------------------------
+    # Queries (call from coroutines on the loop)
+    # -------------------------------------------------
+    def engine(self, replica=False):
+        key = 'replica' if replica and 'replica' in self._urls else None
+        engine = self._engines.get(key)
+        if engine is None:
+            # Imported here: only the async mode needs greenlet / aiomysql
+            from sqlalchemy.ext.asyncio import create_async_engine
+            engine = self._engines[key] = create_async_engine(self._urls[key], **self._options)
+            profiler.watch_engine(engine.sync_engine)
+            statement_timeout(engine.sync_engine, self._timeout_ms)
+        return engine
+
+    async def fetch_all(self, sql, params=None, replica=True):
+        """
+        One statement on its own pooled connection. Reads go to the replica
+        when one is configured, as with @read_only.
+        """
+        async with self.engine(replica).connect() as conn:
+            result = await conn.execute(text(sql), params or {})
+            return result.fetchall()
+
+    async def gather(self, queries, replica=True):
+        """
+        {name: sql or (sql, params)} -> {name: rows}, all issued concurrently,
+        so the wait is roughly the slowest query rather than the sum.
+        """
+        names = list(queries)
+        statements = [(q, None) if isinstance(q, str) else q for q in queries.values()]
+        rows = await asyncio.gather(*(self.fetch_all(sql, params, replica=replica)
+                                      for sql, params in statements))
+        return dict(zip(names, rows))
+
+
+async_db = AsyncDatabase()
@@ -0,0 +1,375 @@
+# app/services/audit.py
+import atexit
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from flask import current_app, has_request_context, request, session
+from sqlalchemy import exc, text
+from app import db
+from app.services.events import subscribe
+from app.services.response_cache import response_cache
+
+try:
+    import fcntl
+except ImportError:   # Windows: no cross-process locking, run a single worker
+    fcntl = None
+
+INSERT_AUDIT = text("""
+    INSERT INTO AuditLog (table_name, action_type, details, action_timestamp)
+    VALUES (:table_name, :action_type, :details, :action_timestamp)
+""")
+
+
+def _actor():
+    """
+    Who/where for an entry recorded during a request.
+    """
+    if not has_request_context():
+        return {}
+    return {'user_id': session.get('user_id'), 'ip': request.remote_addr, 'endpoint': request.endpoint}
+
+
+class AuditTrail:
+    """
+    App-level audit entries (logins, bookings, checkouts, service orders,
+    ...) written to AuditLog off the request path.
+
+    record() only appends to an in-memory buffer. A worker thread inserts
+    it in batches of AUDIT_BATCH_SIZE (one executemany, one commit) every
+    AUDIT_FLUSH_MS, or as soon as a batch is full. The buffer is bounded by
+    AUDIT_BUFFER_SIZE: when it is full (database slow or down) entries are
+    appended to a JSONL spill file instead of blocking the request, and a
+    batch that fails to insert is spilled too. The spill file is replayed
+    into AuditLog once inserts succeed again.
+
+    All workers share the spill file. Appends and the hand-over to the
+    .replay file take a file lock, only one process replays at a time, and
+    replay progress is kept next to the file (.pos), so a replay resumed by
+    another process doesn't insert the same rows twice. A chunk that is
+    rejected is retried row by row; rows the database refuses for good
+    (too long, constraint) go to the .rejected file instead of blocking
+    the backlog behind them.
+
+    With BACKGROUND_JOBS off (CLI, scripts) every entry is written inline.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._buffer = []
+        self._wake = threading.Event()
+        self._worker = None
+        self._engine = None
+        self._logger = None
+        self._background = False
+        self.batch_size = 200
+        self.flush_interval = 0.5
+        self.buffer_size = 10000
+        self.spill_path = None
+        self.counters = {'recorded': 0, 'written': 0, 'batches': 0, 'failed_batches': 0,
+                         'spilled': 0, 'replayed': 0, 'rejected': 0, 'dropped': 0}
+        self.last_error = None
+
+    def init_app(self, app):
+        self._engine = db.engine
+        self._logger = app.logger
+        self.batch_size = app.config['AUDIT_BATCH_SIZE']
+        self.flush_interval = app.config['AUDIT_FLUSH_MS'] / 1000.0
+        self.buffer_size = app.config['AUDIT_BUFFER_SIZE']
+        self.spill_path = app.config.get('AUDIT_SPILL_PATH') or os.path.join(app.instance_path, 'audit-spill.jsonl')
+        self._background = app.config.get('BACKGROUND_JOBS', True)
+        if self._background and self._worker is None:
+            self._worker = threading.Thread(target=self._run, name='audit', daemon=True)
+            self._worker.start()
+            # Best effort: don't lose the last buffer on a clean shutdown
+            atexit.register(self.flush)
+
+    # -------------------------------------------------
+    # Public API
+    # -------------------------------------------------
+    def record(self, table_name, action_type, **details):
+        """
+        Queues one entry. `details` is stored as JSON, with the current
+        user, client IP and endpoint added when called during a request.
+        Never blocks on the database.
+        """
+        for key, value in _actor().items():
+            if details.get(key) is None:
+                details[key] = value
+        entry = {'table_name': table_name, 'action_type': action_type,
+                 'details': json.dumps(details, default=str, sort_keys=True),
+                 'action_timestamp': datetime.now()}
+
+        if not self._background:
+            with self._lock:
+                self.counters['recorded'] += 1
+            self._write_or_spill([entry])
+            return
+
+        full = False
+        with self._lock:
+            self.counters['recorded'] += 1
+            if len(self._buffer) < self.buffer_size:
+                self._buffer.append(entry)
+                full = len(self._buffer) >= self.batch_size
+                entry = None
+        if entry is not None:
+            # Backpressure: the buffer is full, so go to disk rather than wait
+            self._spill([entry])
+        elif full:
+            self._wake.set()
+
+    def flush(self):
+        """
+        Writes everything buffered, then any spilled backlog. Called by the
+        worker; safe from any thread.
+        """
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = self._buffer[:self.batch_size]
+                    del self._buffer[:self.batch_size]
+                if not batch:
+                    break
+                if not self._write_or_spill(batch):
+                    # Database unavailable: leave the rest for the next tick
+                    return
+            self._replay()
+
+    def stats(self):
+        with self._lock:
+            report = dict(self.counters, buffered=len(self._buffer), last_error=self.last_error)
+        backlog = 0
+        for path in (self.spill_path, f'{self.spill_path}.replay'):
+            if path and os.path.exists(path):
+                backlog += os.path.getsize(path)
+        report['spill_backlog_bytes'] = backlog
+        return report
+
+    # -------------------------------------------------
+    # Worker
+    # -------------------------------------------------
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                self._logger.exception('Audit flush failed')
+
+    def _insert(self, batch):
+        with self._engine.begin() as conn:
+            conn.execute(INSERT_AUDIT, batch)
+
+    def _write_or_spill(self, batch):
+        try:
+            self._insert(batch)
+        except Exception as e:
+            with self._lock:
+                self.counters['failed_batches'] += 1
+                self.last_error = str(e).splitlines()[0][:200]
+            self._logger.warning('Audit batch of %d failed, spilling to disk: %s', len(batch), self.last_error)
+            self._spill(batch)
+            return False
+        with self._lock:
+            self.counters['written'] += len(batch)
+            self.counters['batches'] += 1
+        response_cache.bump('audit')
+        return True
+
+    # -------------------------------------------------
+    # Spill file
+    # -------------------------------------------------
+    @contextmanager
+    def _file_lock(self, suffix, blocking=True):
+        """
+        Cross-process lock on <spill>.<suffix>; yields False when
+        non-blocking and another process holds it.
+        """
+        if fcntl is None:
+            yield True
+            return
+        with open(f'{self.spill_path}.{suffix}', 'a') as fh:
+            try:
+                fcntl.flock(fh, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _spill(self, entries, path=None):
+        lines = ''.join(json.dumps(dict(e, action_timestamp=e['action_timestamp'].isoformat())) + '\n'
+                        for e in entries)
+        try:
+            os.makedirs(os.path.dirname(self.spill_path), exist_ok=True)
+            with self._spill_lock, self._file_lock('lock'):
+                with open(path or self.spill_path, 'a', encoding='utf-8') as fh:
+                    fh.write(lines)
+        except OSError:
+            self._logger.exception('Audit spill failed, %d entries lost', len(entries))
+            with self._lock:
+                self.counters['dropped'] += len(entries)
+            return
+        if path is None:
+            with self._lock:
+                self.counters['spilled'] += len(entries)
+
+    def _replay(self):
+        """
+        Moves the spill file aside (new spills start a fresh one) and
+        inserts it batch by batch. Progress is kept in the .pos file, so a
+        failure part-way resumes - in this or another process - without
+        duplicating the batches already in.
+        """
+        replay_path = f'{self.spill_path}.replay'
+        pos_path = f'{replay_path}.pos'
+        if not os.path.exists(replay_path) and not os.path.exists(self.spill_path):
+            return
+        with self._file_lock('replay.lock', blocking=False) as owner:
+            if not owner:
+                return   # another worker is on it
+            with self._spill_lock, self._file_lock('lock'):
+                if not os.path.exists(replay_path):
+                    if not os.path.exists(self.spill_path):
+                        return
+                    os.replace(self.spill_path, replay_path)
+                    _write_pos(pos_path, 0)
+            replayed = _read_pos(pos_path)
+
+            with open(replay_path, encoding='utf-8') as fh:
+                chunk = []   # (line number, entry)
+                for number, line in enumerate(fh):
+                    if number < replayed:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                        entry['action_timestamp'] = datetime.fromisoformat(entry['action_timestamp'])
+                        chunk.append((number, entry))
+                    except (ValueError, KeyError, TypeError):
+                        # Torn last line from a crash mid-write
+                        with self._lock:
+                            self.counters['dropped'] += 1
+                    if len(chunk) >= self.batch_size:
+                        if not self._replay_chunk(chunk, pos_path):
+                            return
+                        chunk = []
+                if chunk and not self._replay_chunk(chunk, pos_path):
+                    return
+            os.remove(replay_path)
+            os.remove(pos_path)
+
+    def _replay_chunk(self, chunk, pos_path):
+        """
+        Inserts a chunk of the backlog and records the progress. False when
+        the database is unavailable (try again later).
+        """
+        try:
+            self._insert([entry for _, entry in chunk])
+        except Exception as e:
+            self._note_error(e)
+            return self._replay_rows(chunk, pos_path)
+        _write_pos(pos_path, chunk[-1][0] + 1)
+        self._count_replayed(len(chunk))
+        return True
+
+    def _replay_rows(self, chunk, pos_path):
+        """
+        A chunk the database rejected, row by row: rows it refuses for good
+        are set aside in the .rejected file so they can't hold up the rest.
+        """
+        for number, entry in chunk:
+            try:
+                self._insert([entry])
+                self._count_replayed(1)
+            except (exc.DataError, exc.IntegrityError) as e:
+                self._note_error(e)
+                self._spill([entry], path=f'{self.spill_path}.rejected')
+                with self._lock:
+                    self.counters['rejected'] += 1
+            except Exception as e:
+                # Not this row: the database itself is unavailable
+                self._note_error(e)
+                return False
+            _write_pos(pos_path, number + 1)
+        return True
+
+    def _note_error(self, error):
+        with self._lock:
+            self.last_error = str(error).splitlines()[0][:200]
+
+    def _count_replayed(self, count):
+        if count:
+            with self._lock:
+                self.counters['replayed'] += count
+            response_cache.bump('audit')
+
+
+def _read_pos(path):
+    try:
+        with open(path, encoding='utf-8') as fh:
+            return int(fh.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def _write_pos(path, value):
+    with open(path, 'w', encoding='utf-8') as fh:
+        fh.write(str(value))
+
+
+audit_trail = AuditTrail()
+
+
+# -------------------------------------------------
+# Write events -> audit entries
+# -------------------------------------------------
+@subscribe('booking_created')
+def _on_booking_created(booking_id, guest_id, room_id, check_in, check_out, total_amount=None, user_id=None, **_):
+    audit_trail.record('Bookings', 'INSERT', booking_id=booking_id, guest_id=guest_id, room_id=room_id,
+                       check_in=check_in, check_out=check_out, total_amount=total_amount, user_id=user_id)
+
+
+@subscribe('booking_completed')
+def _on_booking_completed(booking_id, room_id=None, **_):
+    audit_trail.record('Bookings', 'CHECKOUT', booking_id=booking_id, room_id=room_id)
+
+
+@subscribe('booking_cancelled')
+def _on_booking_cancelled(booking_id, room_id=None, **_):
+    audit_trail.record('Bookings', 'CANCEL', booking_id=booking_id, room_id=room_id)
+
+
+@subscribe('service_ordered')
+def _on_service_ordered(order_id, booking_id, service_id, quantity=None, total_order_cost=None, **_):
+    audit_trail.record('ServiceOrders', 'INSERT', order_id=order_id, booking_id=booking_id,
+                       service_id=service_id, quantity=quantity, total_order_cost=total_order_cost)
+
+
+@subscribe('payment_recorded')
+def _on_payment_recorded(payment_id, booking_id, amount_paid=None, **_):
+    audit_trail.record('Payments', 'INSERT', payment_id=payment_id, booking_id=booking_id, amount_paid=amount_paid)
+
+
+@subscribe('guest_created')
+def _on_guest_created(guest_id, full_name=None, **_):
+    audit_trail.record('Guests', 'INSERT', guest_id=guest_id, full_name=full_name)
+
+
+@subscribe('guest_deleted')
+def _on_guest_deleted(guest_id, **_):
+    # The LogGuestDeletion trigger already writes this one unless it was dropped
+    if current_app.config.get('AUDIT_GUEST_DELETIONS'):
+        audit_trail.record('Guests', 'DELETE', guest_id=guest_id)
+
+
+@subscribe('room_status_changed')
+def _on_room_status_changed(room_id, status, **_):
+    audit_trail.record('Rooms', 'UPDATE', room_id=room_id, status=status)
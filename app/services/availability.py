@@ -0,0 +1,238 @@
+# app/services/availability.py
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import date
+
+from flask import current_app
+from sqlalchemy import text
+from app import db
+from app.services.events import subscribe
+
+
+def _to_date(value):
+    """
+    Accepts a date or an ISO 'YYYY-MM-DD' string (as posted by the forms).
+    """
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+class AvailabilityIndex:
+    """
+    In-memory copy of which rooms are taken on which nights.
+
+    Each room keeps a sorted list of [check_in, check_out) intervals for its
+    active bookings (dates stored as ordinals), so an overlap test is a single
+    bisect instead of a CheckAvailability round-trip to MySQL.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._rooms = {}       # room_id -> {'room_number', 'type_id', 'status'}
+        self._intervals = {}   # room_id -> sorted [(start, end, booking_id)]
+        self._bookings = {}    # booking_id -> (room_id, start, end)
+        self._loaded_at = None
+
+    # -------------------------------------------------
+    # Loading
+    # -------------------------------------------------
+    def load(self):
+        """
+        Rebuilds the whole index from Rooms + active Bookings (2 queries).
+        """
+        rooms = db.session.execute(text(
+            "SELECT room_id, room_number, type_id, status FROM Rooms"
+        )).fetchall()
+        bookings = db.session.execute(text("""
+            SELECT booking_id, room_id, check_in, check_out
+            FROM Bookings
+            WHERE booking_status = 'active'
+        """)).fetchall()
+
+        room_map = {r.room_id: {'room_number': r.room_number,
+                                'type_id': r.type_id,
+                                'status': r.status} for r in rooms}
+        intervals = {room_id: [] for room_id in room_map}
+        booking_map = {}
+        for b in bookings:
+            start, end = _to_date(b.check_in).toordinal(), _to_date(b.check_out).toordinal()
+            intervals.setdefault(b.room_id, []).append((start, end, b.booking_id))
+            booking_map[b.booking_id] = (b.room_id, start, end)
+        for room_intervals in intervals.values():
+            room_intervals.sort()
+
+        with self._lock:
+            self._rooms = room_map
+            self._intervals = intervals
+            self._bookings = booking_map
+            self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self):
+        """
+        Loads on first use and reloads once the configured max age has passed,
+        so changes made by other workers (or directly in MySQL) are picked up.
+        """
+        max_age = current_app.config.get('AVAILABILITY_REFRESH_SECONDS', 300)
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > max_age:
+            self.load()
+
+    def invalidate(self):
+        """
+        Forces a full reload on the next query.
+        """
+        with self._lock:
+            self._loaded_at = None
+
+    # -------------------------------------------------
+    # Incremental updates (called after a successful COMMIT)
+    # -------------------------------------------------
+    def add_booking(self, booking_id, room_id, check_in, check_out):
+        start, end = _to_date(check_in).toordinal(), _to_date(check_out).toordinal()
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._remove(booking_id)
+            insort(self._intervals.setdefault(int(room_id), []), (start, end, booking_id))
+            self._bookings[booking_id] = (int(room_id), start, end)
+
+    def release_booking(self, booking_id):
+        """
+        Frees the nights held by a booking (checkout or cancellation).
+        """
+        with self._lock:
+            self._remove(booking_id)
+
+    def set_room_status(self, room_id, status):
+        with self._lock:
+            room = self._rooms.get(int(room_id))
+            if room is not None:
+                room['status'] = status
+
+    def _remove(self, booking_id):
+        entry = self._bookings.pop(booking_id, None)
+        if entry is None:
+            return
+        room_id, start, end = entry
+        room_intervals = self._intervals.get(room_id, [])
+        pos = bisect_left(room_intervals, (start, end, booking_id))
+        if pos < len(room_intervals) and room_intervals[pos][2] == booking_id:
+            room_intervals.pop(pos)
+
+    # -------------------------------------------------
+    # Queries
+    # -------------------------------------------------
+    def _is_free(self, room_id, start, end):
+        room_intervals = self._intervals.get(room_id, ())
+        # Stays on one room never overlap (PreventDoubleBooking), so sorted by
+        # start they are also sorted by end: only the last stay starting
+        # before `end` can reach into [start, end).
+        pos = bisect_left(room_intervals, (end,))
+        return pos == 0 or room_intervals[pos - 1][1] <= start
+
+    def is_free(self, room_id, check_in, check_out):
+        self.ensure_loaded()
+        start, end = _to_date(check_in).toordinal(), _to_date(check_out).toordinal()
+        with self._lock:
+            return self._is_free(int(room_id), start, end)
+
+    def conflicts(self, room_id, check_in, check_out):
+        """
+        Pre-check for a new stay: returns (room_status, [booking_ids that
+        overlap [check_in, check_out)]), or (None, []) for an unknown room.
+        """
+        self.ensure_loaded()
+        start, end = _to_date(check_in).toordinal(), _to_date(check_out).toordinal()
+        with self._lock:
+            room = self._rooms.get(int(room_id))
+            if room is None:
+                return None, []
+            room_intervals = self._intervals.get(int(room_id), ())
+            pos = bisect_left(room_intervals, (end,))
+            overlapping = []
+            # Walk back from the last stay starting before `end` while stays still reach past `start`
+            while pos > 0 and room_intervals[pos - 1][1] > start:
+                overlapping.append(room_intervals[pos - 1][2])
+                pos -= 1
+            return room['status'], overlapping
+
+    def next_arrivals(self, room_ids, on_or_after=None):
+        """
+        {room_id: check-in date of the first stay starting on or after the
+        given day (default today), or None when nothing is booked}.
+        """
+        self.ensure_loaded()
+        day = _to_date(on_or_after or date.today()).toordinal()
+        arrivals = {}
+        with self._lock:
+            for room_id in room_ids:
+                room_intervals = self._intervals.get(int(room_id), ())
+                pos = bisect_left(room_intervals, (day,))
+                arrivals[room_id] = date.fromordinal(room_intervals[pos][0]) if pos < len(room_intervals) else None
+        return arrivals
+
+    def free_rooms(self, check_in, check_out, type_id=None):
+        """
+        Returns the room_ids of the given type (or any type) that are free
+        for every night in [check_in, check_out) and not under maintenance.
+        """
+        self.ensure_loaded()
+        start, end = _to_date(check_in).toordinal(), _to_date(check_out).toordinal()
+        if end <= start:
+            return []
+        with self._lock:
+            return sorted(
+                room_id for room_id, room in self._rooms.items()
+                if room['status'] != 'maintenance'
+                and (type_id is None or room['type_id'] == int(type_id))
+                and self._is_free(room_id, start, end)
+            )
+
+    def free_calendar(self, range_start, range_end, type_id=None):
+        """
+        Lists, for every room, the free gaps inside [range_start, range_end)
+        in one pass: {room_id: [(gap_start, gap_end), ...]}.
+        """
+        self.ensure_loaded()
+        lo, hi = _to_date(range_start).toordinal(), _to_date(range_end).toordinal()
+        calendar = {}
+        with self._lock:
+            for room_id, room in self._rooms.items():
+                if room['status'] == 'maintenance':
+                    continue
+                if type_id is not None and room['type_id'] != int(type_id):
+                    continue
+                gaps = []
+                cursor = lo
+                for start, end, _ in self._intervals.get(room_id, ()):
+                    if end <= cursor:
+                        continue
+                    if start >= hi:
+                        break
+                    if start > cursor:
+                        gaps.append((date.fromordinal(cursor), date.fromordinal(start)))
+                    cursor = max(cursor, end)
+                if cursor < hi:
+                    gaps.append((date.fromordinal(cursor), date.fromordinal(hi)))
+                calendar[room_id] = gaps
+        return calendar
+
+
+availability_index = AvailabilityIndex()
+
+
+@subscribe('booking_created')
+def _on_booking_created(booking_id, room_id, check_in, check_out, **_):
+    availability_index.add_booking(booking_id, room_id, check_in, check_out)
+
+
+@subscribe('booking_completed')
+@subscribe('booking_cancelled')
+def _on_booking_closed(booking_id, **_):
+    availability_index.release_booking(booking_id)
+
+
+@subscribe('room_status_changed')
+def _on_room_status_changed(room_id, status, **_):
+    availability_index.set_room_status(room_id, status)
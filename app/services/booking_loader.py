@@ -0,0 +1,109 @@
+# app/services/booking_loader.py
+from types import SimpleNamespace
+
+from sqlalchemy import text, bindparam
+from app import db
+from app.services.archive import ARCHIVE_TABLES, HOT_TABLES, history_archive
+
+# Keeps each IN (...) list to a sane size for MySQL's packet / plan limits
+CHUNK_SIZE = 1000
+
+# 1. Booking + guest + room, with the money totals computed by MySQL
+BOOKINGS_TEMPLATE = """
+    SELECT b.booking_id, b.guest_id, b.room_id, b.check_in, b.check_out,
+           b.total_amount, b.booking_status,
+           g.full_name, g.phone, g.email,
+           r.room_number, rt.name AS type_name,
+           (SELECT IFNULL(SUM(so.total_order_cost), 0) FROM {ServiceOrders} so
+             WHERE so.booking_id = b.booking_id) AS service_total,
+           (SELECT IFNULL(SUM(p.amount_paid), 0) FROM {Payments} p
+             WHERE p.booking_id = b.booking_id) AS paid_total
+    FROM {Bookings} b
+    JOIN Guests g ON b.guest_id = g.guest_id
+    JOIN Rooms r ON b.room_id = r.room_id
+    LEFT JOIN RoomTypes rt ON r.type_id = rt.type_id
+    WHERE b.booking_id IN :ids
+    ORDER BY b.booking_id
+"""
+
+# 2. Every child row in one round-trip, tagged by kind
+CHILDREN_TEMPLATE = """
+    SELECT 'service' AS kind, so.booking_id, so.order_id AS id, s.service_name AS label,
+           so.quantity AS qty, so.total_order_cost AS amount, NULL AS happened_at
+    FROM {ServiceOrders} so
+    JOIN Services s ON so.service_id = s.service_id
+    WHERE so.booking_id IN :ids
+    UNION ALL
+    SELECT 'payment', p.booking_id, p.payment_id, p.payment_method,
+           NULL, p.amount_paid, p.payment_date
+    FROM {Payments} p
+    WHERE p.booking_id IN :ids
+    UNION ALL
+    SELECT 'feedback', f.booking_id, f.feedback_id, f.comment,
+           f.rating, NULL, NULL
+    FROM {Feedback} f
+    WHERE f.booking_id IN :ids
+    ORDER BY booking_id, kind, id
+"""
+
+
+def _statements(tables):
+    return tuple(text(template.format(**tables)).bindparams(bindparam('ids', expanding=True))
+                 for template in (BOOKINGS_TEMPLATE, CHILDREN_TEMPLATE))
+
+
+# The hot tables, and the archive tables for bookings moved out of them
+BOOKINGS_SQL, CHILDREN_SQL = _statements(HOT_TABLES)
+ARCHIVED_BOOKINGS_SQL, ARCHIVED_CHILDREN_SQL = _statements(ARCHIVE_TABLES)
+
+
+def _chunks(ids):
+    ids = list(dict.fromkeys(int(i) for i in ids))
+    for i in range(0, len(ids), CHUNK_SIZE):
+        yield ids[i:i + CHUNK_SIZE]
+
+
+def load_bookings(booking_ids):
+    """
+    Bulk-loads bookings with guest, room, service orders, payments and
+    feedback: two queries per CHUNK_SIZE ids, however many bookings.
+    Returns {booking_id: aggregate}; missing ids are simply absent.
+
+    Each aggregate exposes the booking/guest/room columns as attributes plus
+    .services, .payments, .feedback, .service_total, .paid_total, .final_total.
+    """
+    aggregates = {}
+    for chunk in _chunks(booking_ids):
+        _load_chunk(aggregates, chunk, BOOKINGS_SQL, CHILDREN_SQL)
+        # Ids not in the hot tables may have been archived (old invoices)
+        missing = [i for i in chunk if i not in aggregates]
+        if missing and history_archive.available():
+            _load_chunk(aggregates, missing, ARCHIVED_BOOKINGS_SQL, ARCHIVED_CHILDREN_SQL)
+    return aggregates
+
+
+def _load_chunk(aggregates, chunk, bookings_sql, children_sql):
+    for row in db.session.execute(bookings_sql, {'ids': chunk}):
+        agg = SimpleNamespace(**row._mapping, services=[], payments=[], feedback=None)
+        agg.final_total = agg.total_amount + agg.service_total
+        aggregates[agg.booking_id] = agg
+
+    for child in db.session.execute(children_sql, {'ids': chunk}):
+        agg = aggregates.get(child.booking_id)
+        if agg is None:
+            continue
+        if child.kind == 'service':
+            agg.services.append(SimpleNamespace(order_id=child.id, service_name=child.label,
+                                                quantity=child.qty, total_order_cost=child.amount))
+        elif child.kind == 'payment':
+            agg.payments.append(SimpleNamespace(payment_id=child.id, payment_method=child.label,
+                                                amount_paid=child.amount, payment_date=child.happened_at))
+        else:
+            agg.feedback = SimpleNamespace(feedback_id=child.id, comment=child.label, rating=child.qty)
+
+
+def load_booking(booking_id):
+    """
+    Single-booking convenience wrapper; returns None if it doesn't exist.
+    """
+    return load_bookings([booking_id]).get(booking_id)
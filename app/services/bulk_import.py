@@ -0,0 +1,365 @@
+# app/services/bulk_import.py
+import csv
+import json
+import time
+from bisect import bisect_left, insort
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import text
+from app import db
+
+BOOKING_STATUSES = ('active', 'completed', 'cancelled')
+
+
+# -------------------------------------------------
+# Readers (streaming: one row in memory at a time)
+# -------------------------------------------------
+def read_rows(path, fmt=None):
+    """
+    Yields (line_no, dict) from a CSV (header row) or JSONL file.
+    The format is taken from the extension unless given.
+    """
+    fmt = fmt or ('jsonl' if path.endswith(('.jsonl', '.ndjson', '.json')) else 'csv')
+    with open(path, encoding='utf-8', newline='') as fh:
+        if fmt == 'csv':
+            reader = csv.DictReader(fh)
+            for row in reader:
+                # line_num is the physical line the row ended on
+                yield reader.line_num, {k: (v.strip() if isinstance(v, str) else v) for k, v in row.items() if k}
+        else:
+            for line_no, line in enumerate(fh, 1):
+                if line.strip():
+                    try:
+                        yield line_no, json.loads(line)
+                    except ValueError as e:
+                        yield line_no, {'__error__': f"Invalid JSON: {e}"}
+
+
+def _text(row, key, max_len, errors, required=False):
+    value = row.get(key)
+    value = str(value).strip() if value not in (None, '') else None
+    if value is None:
+        if required:
+            errors.append(f"{key} is required")
+        return None
+    if len(value) > max_len:
+        errors.append(f"{key} longer than {max_len} characters")
+    return value
+
+
+def _int(row, key, errors):
+    try:
+        return int(row.get(key))
+    except (TypeError, ValueError):
+        errors.append(f"{key} must be an integer")
+        return None
+
+
+def _date(row, key, errors):
+    try:
+        return date.fromisoformat(str(row.get(key) or '')[:10])
+    except ValueError:
+        errors.append(f"{key} must be a YYYY-MM-DD date")
+        return None
+
+
+class ImportStats:
+    def __init__(self):
+        self.read = 0
+        self.inserted = 0
+        self.rejected = 0
+        self.batches = 0
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self):
+        return self.inserted / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self):
+        return {'read': self.read, 'inserted': self.inserted, 'rejected': self.rejected,
+                'batches': self.batches, 'seconds': round(self.elapsed, 2),
+                'rows_per_second': round(self.rate, 1)}
+
+
+class _Importer:
+    """
+    Base for one table's importer: validate every row in memory against
+    lookups loaded once up front, then insert the valid rows with multi-row
+    executemany() batches, one transaction per batch.
+    """
+    INSERT = None
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def load_lookups(self):
+        pass
+
+    def validate(self, row):
+        """
+        Returns (params, errors). Accepted rows must update the in-memory
+        state, so later rows in the same file are checked against them.
+        """
+        raise NotImplementedError
+
+    def _guest_ref(self, row, errors):
+        """
+        guest_id, or guest_phone resolved through the Guests.phone lookup
+        (old PMS exports rarely carry our ids).
+        """
+        if row.get('guest_id') not in (None, ''):
+            guest_id = _int(row, 'guest_id', errors)
+            if guest_id is not None and guest_id not in self.guest_ids:
+                errors.append(f"guest_id {guest_id} does not exist")
+            return guest_id
+        phone = str(row.get('guest_phone') or '').strip()
+        if not phone:
+            errors.append("guest_id or guest_phone is required")
+            return None
+        guest_id = self.phone_to_guest.get(phone)
+        if guest_id is None:
+            errors.append(f"No guest with phone {phone}")
+        return guest_id
+
+    def _load_guests(self):
+        self.phone_to_guest = {}
+        self.guest_ids = set()
+        for guest_id, phone in self.conn.execute(text("SELECT guest_id, phone FROM Guests")):
+            self.guest_ids.add(guest_id)
+            if phone:
+                self.phone_to_guest[phone] = guest_id
+
+
+class GuestImporter(_Importer):
+    """
+    Guests: full_name, phone, email, address, nationality [, guest_id].
+    Guests.phone is UNIQUE: checked against the table and the file itself.
+    """
+    INSERT = text("""
+        INSERT INTO Guests (guest_id, full_name, phone, email, address, nationality)
+        VALUES (:guest_id, :full_name, :phone, :email, :address, :nationality)
+    """)
+
+    def load_lookups(self):
+        self._load_guests()
+
+    def validate(self, row):
+        errors = []
+        guest_id = None
+        if row.get('guest_id') not in (None, ''):
+            guest_id = _int(row, 'guest_id', errors)
+            if guest_id in self.guest_ids:
+                errors.append(f"guest_id {guest_id} already exists")
+        params = {
+            'guest_id': guest_id,
+            'full_name': _text(row, 'full_name', 50, errors, required=True),
+            'phone': _text(row, 'phone', 20, errors),
+            'email': _text(row, 'email', 50, errors),
+            'address': _text(row, 'address', 105, errors),
+            'nationality': _text(row, 'nationality', 40, errors),
+        }
+        if params['phone'] and params['phone'] in self.phone_to_guest:
+            errors.append(f"phone {params['phone']} already belongs to another guest")
+        if errors:
+            return None, errors
+        if params['phone']:
+            # id unknown until insert; only uniqueness matters for later rows
+            self.phone_to_guest[params['phone']] = guest_id
+        if guest_id is not None:
+            self.guest_ids.add(guest_id)
+        return params, []
+
+
+class GuestPhoneImporter(_Importer):
+    """
+    GuestPhones: guest_id | guest_phone, phone_number, phone_type.
+    """
+    INSERT = text("""
+        INSERT INTO GuestPhones (guest_id, phone_number, phone_type)
+        VALUES (:guest_id, :phone_number, :phone_type)
+    """)
+
+    def load_lookups(self):
+        self._load_guests()
+
+    def validate(self, row):
+        errors = []
+        params = {
+            'guest_id': self._guest_ref(row, errors),
+            'phone_number': _text(row, 'phone_number', 20, errors, required=True),
+            'phone_type': _text(row, 'phone_type', 20, errors),
+        }
+        return (None, errors) if errors else (params, [])
+
+
+class BookingImporter(_Importer):
+    """
+    Bookings: guest_id | guest_phone, room_id | room_number, check_in,
+    check_out, total_amount [, booking_status].
+
+    Overlaps are checked the way PreventDoubleBooking does, against every
+    non-cancelled stay on the room - existing and earlier in the file -
+    using a sorted interval list per room.
+    """
+    INSERT = text("""
+        INSERT INTO Bookings (guest_id, room_id, check_in, check_out, total_amount, booking_status)
+        VALUES (:guest_id, :room_id, :check_in, :check_out, :total_amount, :booking_status)
+    """)
+
+    def load_lookups(self):
+        self._load_guests()
+        self.room_numbers = {}
+        for room_id, room_number in self.conn.execute(text("SELECT room_id, room_number FROM Rooms")):
+            self.room_numbers[str(room_number)] = room_id
+        self.room_ids = set(self.room_numbers.values())
+        self.stays = {}   # room_id -> sorted [(start, end)] ordinals
+        for room_id, check_in, check_out in self.conn.execute(text("""
+            SELECT room_id, check_in, check_out FROM Bookings WHERE booking_status <> 'cancelled'
+        """)):
+            start = date.fromisoformat(str(check_in)[:10]).toordinal()
+            end = date.fromisoformat(str(check_out)[:10]).toordinal()
+            self.stays.setdefault(room_id, []).append((start, end))
+        for intervals in self.stays.values():
+            intervals.sort()
+
+    def _overlaps(self, room_id, start, end):
+        # Stays on a room never overlap (trigger + this check), so sorted by
+        # start they are sorted by end too: only the last stay starting
+        # before `end` can reach into [start, end)
+        intervals = self.stays.get(room_id, ())
+        pos = bisect_left(intervals, (end,))
+        return pos > 0 and intervals[pos - 1][1] > start
+
+    def validate(self, row):
+        errors = []
+        guest_id = self._guest_ref(row, errors)
+
+        if row.get('room_id') not in (None, ''):
+            room_id = _int(row, 'room_id', errors)
+            if room_id is not None and room_id not in self.room_ids:
+                errors.append(f"room_id {room_id} does not exist")
+        else:
+            room_id = self.room_numbers.get(str(row.get('room_number') or '').strip())
+            if room_id is None:
+                errors.append(f"Unknown room_number {row.get('room_number')!r}")
+
+        check_in = _date(row, 'check_in', errors)
+        check_out = _date(row, 'check_out', errors)
+        if check_in and check_out and check_out <= check_in:
+            errors.append("check_out must be after check_in")
+
+        try:
+            total_amount = Decimal(str(row.get('total_amount')))
+            if not total_amount.is_finite() or total_amount < 0:
+                raise InvalidOperation
+        except (InvalidOperation, ValueError):
+            errors.append("total_amount must be a non-negative number")
+            total_amount = None
+
+        status = str(row.get('booking_status') or 'active').strip().lower()
+        if status not in BOOKING_STATUSES:
+            errors.append(f"booking_status must be one of {', '.join(BOOKING_STATUSES)}")
+
+        if not errors and status != 'cancelled':
+            start, end = check_in.toordinal(), check_out.toordinal()
+            if self._overlaps(room_id, start, end):
+                errors.append(f"Room {room_id} is already booked between {check_in} and {check_out}")
+            else:
+                insort(self.stays.setdefault(room_id, []), (start, end))
+        if errors:
+            return None, errors
+        return {'guest_id': guest_id, 'room_id': room_id, 'check_in': check_in, 'check_out': check_out,
+                'total_amount': str(total_amount), 'booking_status': status}, []
+
+
+IMPORTERS = {
+    'guests': GuestImporter,
+    'phones': GuestPhoneImporter,
+    'bookings': BookingImporter,
+}
+
+
+def run_import(kind, rows, batch_size=1000, dry_run=False, fast=True, on_reject=None, on_progress=None):
+    """
+    Validates and inserts `rows` ((line_no, dict) pairs) into the table for
+    `kind`. Runs on one dedicated connection with a transaction per batch,
+    so a failure loses at most the current batch, never the whole file.
+
+    fast: on MySQL, turns off unique_checks / foreign_key_checks for this
+    connection only - both are already verified in memory - and restores
+    them afterwards. Triggers cannot be disabled per session in MySQL, so
+    PreventDoubleBooking still runs for imported bookings.
+
+    on_reject(line_no, row, errors) and on_progress(stats) are optional callbacks.
+    """
+    stats = ImportStats()
+    with db.engine.connect() as conn:
+        importer = IMPORTERS[kind](conn)
+        importer.load_lookups()
+        conn.commit()
+
+        relaxed = fast and not dry_run and conn.dialect.name == 'mysql'
+        if relaxed:
+            conn.execute(text("SET SESSION unique_checks = 0, foreign_key_checks = 0"))
+        try:
+            batch = []
+            for line_no, row in rows:
+                stats.read += 1
+                if '__error__' in row:
+                    params, errors = None, [row['__error__']]
+                else:
+                    params, errors = importer.validate(row)
+                if errors:
+                    stats.rejected += 1
+                    if on_reject:
+                        on_reject(line_no, row, errors)
+                    continue
+                batch.append((line_no, row, params))
+                if len(batch) >= batch_size:
+                    _flush(conn, importer, batch, stats, dry_run, on_reject)
+                    batch = []
+                    if on_progress:
+                        on_progress(stats)
+            if batch:
+                _flush(conn, importer, batch, stats, dry_run, on_reject)
+        finally:
+            if relaxed:
+                conn.rollback()
+                conn.execute(text("SET SESSION unique_checks = 1, foreign_key_checks = 1"))
+                conn.commit()
+    if on_progress:
+        on_progress(stats)
+    return stats
+
+
+def _flush(conn, importer, batch, stats, dry_run, on_reject):
+    stats.batches += 1
+    if dry_run:
+        stats.inserted += len(batch)
+        return
+    try:
+        # One executemany: PyMySQL rewrites it into a multi-row INSERT ... VALUES
+        conn.execute(importer.INSERT, [params for _, _, params in batch])
+        conn.commit()
+        stats.inserted += len(batch)
+        return
+    except Exception:
+        conn.rollback()
+
+    # Something in the batch failed in MySQL (trigger, constraint we don't
+    # model): retry row by row so only the offending rows are rejected
+    for line_no, row, params in batch:
+        try:
+            conn.execute(importer.INSERT, params)
+            conn.commit()
+            stats.inserted += 1
+        except Exception as e:
+            conn.rollback()
+            stats.rejected += 1
+            if on_reject:
+                on_reject(line_no, row, [str(getattr(e, 'orig', e))])
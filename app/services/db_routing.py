@@ -0,0 +1,130 @@
+# app/services/db_routing.py
+import inspect
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import g, has_app_context, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+REPLICA_BIND = 'replica'
+
+
+class RoutingSession(Session):
+    """
+    db.session that sends reads to the 'replica' bind while the current app
+    context is marked read-only (see @read_only / use_replica()).
+    Anything else - and any flush - goes to the primary as before.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_app_context() and g.get('use_replica'):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_only(view):
+    """
+    Route decorator: this view only reads, so it may be served by the replica.
+    Falls back to the primary automatically when no replica is configured.
+    Its connections also get the DB_STATEMENT_TIMEOUT_MS cap.
+    """
+    if inspect.iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            with use_replica():
+                return await view(*args, **kwargs)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with use_replica():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def use_replica():
+    """
+    Same as @read_only for code outside a view (background refresh jobs).
+    """
+    previous = g.get('use_replica', False)
+    g.use_replica = True
+    try:
+        yield
+    finally:
+        g.use_replica = previous
+
+
+# -------------------------------------------------
+# Statement timeout
+# -------------------------------------------------
+def statement_timeout(engine, timeout_ms):
+    """
+    Caps SELECTs (MySQL max_execution_time) on the connections checked out
+    while a @read_only view runs. Everything else - invoice exports, report
+    refreshes, background jobs - gets them uncapped. The SET is only sent
+    when a pooled connection's current value differs.
+    """
+    if not timeout_ms or engine.dialect.name != 'mysql':
+        return
+
+    def checkout(dbapi_connection, record, proxy):
+        wanted = timeout_ms if has_request_context() and g.get('use_replica') else 0
+        if record.info.get('max_execution_time', 0) != wanted:
+            cursor = dbapi_connection.cursor()
+            try:
+                cursor.execute(f"SET SESSION max_execution_time = {int(wanted)}")
+            finally:
+                cursor.close()
+            record.info['max_execution_time'] = wanted
+
+    event.listen(engine, 'checkout', checkout)
+
+
+# -------------------------------------------------
+# Pool metrics
+# -------------------------------------------------
+_pool_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _bump(name, key):
+    with _stats_lock:
+        _pool_stats[name][key] += 1
+
+
+def instrument_pools(engines):
+    """
+    Counts connects / checkouts / invalidations ("server has gone away",
+    pre-ping failures) per engine via pool events.
+    """
+    for bind_key, engine in engines.items():
+        name = bind_key or 'primary'
+        if name in _pool_stats:
+            continue
+        _pool_stats[name] = {'connects': 0, 'checkouts': 0, 'invalidations': 0}
+        event.listen(engine, 'connect', lambda *a, n=name: _bump(n, 'connects'))
+        event.listen(engine, 'checkout', lambda *a, n=name: _bump(n, 'checkouts'))
+        event.listen(engine, 'invalidate', lambda *a, n=name: _bump(n, 'invalidations'))
+
+
+def pool_status(engines):
+    """
+    Live pool gauges (where the pool type supports them) plus the counters.
+    """
+    report = {}
+    for bind_key, engine in engines.items():
+        name = bind_key or 'primary'
+        pool = engine.pool
+        gauges = {'pool_class': type(pool).__name__}
+        for gauge in ('size', 'checkedin', 'checkedout', 'overflow'):
+            if hasattr(pool, gauge):
+                gauges[gauge] = getattr(pool, gauge)()
+        with _stats_lock:
+            gauges.update(_pool_stats.get(name, {}))
+        report[name] = gauges
+    return report
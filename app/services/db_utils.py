@@ -1,46 +1,176 @@
 # app/services/db_utils.py
+import re
+from collections import namedtuple
+
 from sqlalchemy import text
 from app import db
+from app.services.profiling import profiler
+
+# Column-name tuple -> namedtuple class, so every row of a result shape shares one type
+_row_types = {}
+# (procedure, argument count) -> "CALL ..." statement, or None to fall back to callproc()
+_call_statements = {}
+
+_IDENTIFIER = re.compile(r'^\w+$')
+
+
+def _row_type(description):
+    names = tuple(col[0] for col in description)
+    row_type = _row_types.get(names)
+    if row_type is None:
+        row_type = _row_types[names] = namedtuple('ProcedureRow', names, rename=True)
+    return row_type
 
-def call_procedure(proc_name, params=None):
+
+def _call_statement(raw_connection, proc_name, nargs):
     """
-    Calls a MySQL stored procedure securely.
+    Builds (once per procedure) a single-round-trip CALL for procedures
+    whose parameters are all IN. PyMySQL's callproc() sends one
+    "SET @_proc_n = ..." per argument before the CALL; that's only needed
+    for OUT/INOUT parameters. Parameter modes come from
+    information_schema and are cached.
     """
-    connection = db.session.connection()
+    key = (proc_name, nargs)
+    if key in _call_statements:
+        return _call_statements[key]
+
+    statement = None
     try:
-        # We use the raw DBAPI connection to call procedures properly
-        cursor = connection.connection.cursor()
-        
-        if params:
-            cursor.callproc(proc_name, params)
-        else:
-            cursor.callproc(proc_name)
-            
-        # If the procedure returns data (SELECT), fetch it
-        results = []
-        # Stored procedures can return multiple result sets
-        # We loop through them to find the data
-        # Note: Implementation depends on specific driver, this is standard for PyMySQL
-        results = cursor.fetchall()
-        
+        cursor = raw_connection.cursor()
+        cursor.execute("""
+            SELECT PARAMETER_MODE FROM information_schema.PARAMETERS
+            WHERE SPECIFIC_SCHEMA = DATABASE() AND SPECIFIC_NAME = %s
+              AND ROUTINE_TYPE = 'PROCEDURE' AND ORDINAL_POSITION > 0
+            ORDER BY ORDINAL_POSITION
+        """, (proc_name,))
+        modes = [row[0] for row in cursor.fetchall()]
         cursor.close()
-        # Commit to save any INSERT/UPDATE done by the proc
-        db.session.commit() 
-        return results
+    except Exception:
+        # No information_schema access: keep using callproc()
+        modes = None
 
-    except Exception as e:
-        # If the trigger raises an error (SIGNAL SQLSTATE), it is caught here
+    if modes is not None:
+        if len(modes) != nargs:
+            raise ValueError(f"{proc_name} expects {len(modes)} parameter(s), got {nargs}")
+        if all(mode == 'IN' for mode in modes):
+            statement = f"CALL `{proc_name}`({', '.join(['%s'] * nargs)})"
+    _call_statements[key] = statement
+    return statement
+
+
+def _start_call(raw_connection, cursor, proc_name, params):
+    if not _IDENTIFIER.match(proc_name):
+        raise ValueError(f"Invalid procedure name: {proc_name!r}")
+    params = list(params or [])
+    statement = _call_statement(raw_connection, proc_name, len(params))
+    if statement is not None:
+        cursor.execute(statement, params)
+    else:
+        cursor.callproc(proc_name, params)
+
+
+def execute_procedure(proc_name, params=None, read_only=False):
+    """
+    Calls a stored procedure and returns every result set it produced, as
+    a list of lists of named rows (row.room_id as well as row[0]).
+
+    read_only=True skips the COMMIT (CheckAvailability and other pure
+    SELECT procedures); otherwise writes done by the procedure are
+    committed. Any error rolls the session back and is re-raised, so
+    trigger SIGNALs still surface to the caller.
+    """
+    connection = db.session.connection()
+    raw = connection.connection
+    cursor = raw.cursor()
+    try:
+        # Not visible to the engine's statement events, so time it here
+        with profiler.procedure(proc_name):
+            _start_call(raw, cursor, proc_name, params)
+            result_sets = []
+            # One result set per SELECT in the procedure, then the final status
+            # packet (no description). nextset() walks them all.
+            while True:
+                if cursor.description:
+                    row_type = _row_type(cursor.description)
+                    result_sets.append([row_type(*row) for row in cursor.fetchall()])
+                if not cursor.nextset():
+                    break
+        cursor.close()
+        if not read_only:
+            db.session.commit()
+        return result_sets
+    except Exception:
+        cursor.close()
         db.session.rollback()
-        raise e
+        raise
+
+
+def stream_procedure(proc_name, params=None, chunk=1000):
+    """
+    Generator over a (read-only) procedure's output with an unbuffered
+    server-side cursor: yields (result_set_index, row) while MySQL sends
+    them, so large outputs are never held in memory at once.
+
+    The session's connection is busy until the generator is exhausted or
+    closed; don't run other queries on the session while iterating.
+    """
+    connection = db.session.connection()
+    raw = connection.connection
+    cursor_class = None
+    if connection.dialect.driver == 'pymysql':
+        from pymysql.cursors import SSCursor
+        cursor_class = SSCursor
+    cursor = raw.cursor(cursor_class) if cursor_class else raw.cursor()
+    try:
+        with profiler.procedure(proc_name):
+            _start_call(raw, cursor, proc_name, params)
+        index = 0
+        while True:
+            if cursor.description:
+                row_type = _row_type(cursor.description)
+                while True:
+                    rows = cursor.fetchmany(chunk)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield index, row_type(*row)
+                index += 1
+            if not cursor.nextset():
+                break
+    finally:
+        # Drain anything unread so the connection is usable again
+        try:
+            while cursor.nextset():
+                pass
+        except Exception:
+            pass
+        cursor.close()
+
+
+def call_procedure(proc_name, params=None, read_only=False):
+    """
+    Calls a MySQL stored procedure securely.
+    Returns the rows of its first result set (see execute_procedure for all of them).
+    """
+    result_sets = execute_procedure(proc_name, params, read_only=read_only)
+    return result_sets[0] if result_sets else []
 
 def check_availability_proc(check_in, check_out, room_type_id):
     """
     Calls the 'CheckAvailability' stored procedure from your SQL.
     """
-    return call_procedure('CheckAvailability', [check_in, check_out, room_type_id])
+    return call_procedure('CheckAvailability', [check_in, check_out, room_type_id], read_only=True)
+
+def iter_availability_proc(check_in, check_out, room_type_id):
+    """
+    Streaming variant of check_availability_proc() for property-wide
+    ranges: yields the free rooms one row at a time.
+    """
+    for _, row in stream_procedure('CheckAvailability', [check_in, check_out, room_type_id]):
+        yield row
 
 def complete_booking_proc(booking_id):
     """
     Calls the 'CompleteBooking' stored procedure.
     """
-    return call_procedure('CompleteBooking', [booking_id])
\ No newline at end of file
+    return call_procedure('CompleteBooking', [booking_id])
@@ -0,0 +1,39 @@
+# app/services/events.py
+from collections import defaultdict
+
+from flask import current_app
+
+# Write events published by the routes after a successful COMMIT:
+#   booking_created      booking_id, guest_id, room_id, check_in, check_out, total_amount, user_id
+#   booking_completed    booking_id, room_id            (checkout / CompleteBooking)
+#   booking_cancelled    booking_id, room_id
+#   service_ordered      order_id, booking_id, service_id, quantity, total_order_cost, check_in
+#   payment_recorded     payment_id, booking_id, amount_paid, payment_date
+#   guest_created        guest_id, full_name, phone
+#   guest_deleted        guest_id
+#   room_status_changed  room_id, status
+#   reference_changed    table                          (RoomTypes / Rooms / Services edited; flask reference-changed)
+_handlers = defaultdict(list)
+
+
+def subscribe(event):
+    """
+    Decorator: registers a handler(**payload) for an event name.
+    Handlers should ignore payload keys they don't use (**_).
+    """
+    def register(handler):
+        _handlers[event].append(handler)
+        return handler
+    return register
+
+
+def publish(event, **payload):
+    """
+    Calls every handler for `event`. The DB write has already been committed,
+    so a failing in-memory consumer is logged instead of failing the request.
+    """
+    for handler in _handlers.get(event, ()):
+        try:
+            handler(**payload)
+        except Exception:
+            current_app.logger.exception('Event handler %s failed for %s', handler.__qualname__, event)
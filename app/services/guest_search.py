@@ -0,0 +1,410 @@
+# app/services/guest_search.py
+import asyncio
+import heapq
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from flask import current_app
+from sqlalchemy import text
+from app import db
+from app.services.events import subscribe
+from app.services.pagination import encode_cursor, decode_cursor
+from app.services.async_db import async_db
+
+# Prefix ranges are scanned for at most this many entries per requested
+# result (e.g. a one-letter query); ranking only needs a good candidate
+# set, not every match, and this keeps the worst case bounded.
+CANDIDATES_PER_RESULT = 25
+
+# Rank buckets (lower is better)
+RANK_EXACT = 0
+RANK_NAME_PREFIX = 1
+RANK_PHONE_PREFIX = 2
+RANK_WORD_PREFIX = 3
+RANK_PHONE_SUFFIX = 4
+
+_WORD_RE = re.compile(r"[^\W_]+", re.UNICODE)
+_DIGIT_RE = re.compile(r"\D")
+
+
+def _words(value):
+    return _WORD_RE.findall((value or '').lower())
+
+
+def _digits(value):
+    return _DIGIT_RE.sub('', value or '')
+
+
+def _doc(full_name, phone, extra_phones=()):
+    full_name = full_name or ''
+    return (full_name, phone or '', list(extra_phones), ' '.join(_words(full_name)))
+
+
+class _PrefixIndex:
+    """
+    Sorted (key, guest_id) pairs kept as two parallel arrays, so a prefix
+    lookup is a bisect plus a short forward scan and memory stays compact.
+    """
+
+    def __init__(self):
+        self.keys = []
+        self.ids = array('i')
+
+    def bulk_load(self, pairs):
+        pairs.sort()
+        self.keys = [k for k, _ in pairs]
+        self.ids = array('i', (gid for _, gid in pairs))
+
+    def add(self, key, guest_id):
+        pos = bisect_left(self.keys, key)
+        self.keys.insert(pos, key)
+        self.ids.insert(pos, guest_id)
+
+    def remove(self, key, guest_id):
+        pos = bisect_left(self.keys, key)
+        while pos < len(self.keys) and self.keys[pos] == key:
+            if self.ids[pos] == guest_id:
+                del self.keys[pos]
+                del self.ids[pos]
+                return
+            pos += 1
+
+    def count(self, prefix):
+        """
+        Size of the prefix range, from two bisects (no scan).
+        """
+        return bisect_left(self.keys, prefix + '\U0010ffff') - bisect_left(self.keys, prefix)
+
+    def prefix(self, prefix, cap):
+        found = set()
+        pos = bisect_left(self.keys, prefix)
+        end = min(len(self.keys), pos + cap)
+        while pos < end and self.keys[pos].startswith(prefix):
+            found.add(self.ids[pos])
+            pos += 1
+        return found
+
+
+class GuestSearchIndex:
+    """
+    In-process typeahead index over Guests.full_name, Guests.phone and
+    GuestPhones.phone_number.
+
+    Names are indexed by word prefix ("ali" finds "Ali Khan" and "Sara Ali");
+    phones by prefix and by suffix (reversed digits), which covers what the
+    desk types in practice without a per-keystroke table scan.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._guests = {}   # guest_id -> (full_name, phone, [extra phones], normalized name)
+        self._names = _PrefixIndex()
+        self._phones = _PrefixIndex()
+        self._phones_rev = _PrefixIndex()
+        self._max_id = 0
+        self._max_phone_id = 0
+        self._loaded_at = None
+        self._synced_at = None
+
+    # -------------------------------------------------
+    # Loading
+    # -------------------------------------------------
+    def load(self):
+        """
+        Full rebuild from Guests + GuestPhones.
+        """
+        guests = db.session.execute(text("SELECT guest_id, full_name, phone FROM Guests")).fetchall()
+        extra = db.session.execute(text("SELECT phone_id, guest_id, phone_number FROM GuestPhones")).fetchall()
+
+        docs = {g.guest_id: _doc(g.full_name, g.phone) for g in guests}
+        for p in extra:
+            if p.guest_id in docs and p.phone_number:
+                docs[p.guest_id][2].append(p.phone_number)
+
+        names, phones, phones_rev = [], [], []
+        for guest_id, (full_name, phone, more, _) in docs.items():
+            for word in set(_words(full_name)):
+                names.append((word, guest_id))
+            for number in {_digits(n) for n in [phone] + more if _digits(n)}:
+                phones.append((number, guest_id))
+                phones_rev.append((number[::-1], guest_id))
+
+        name_index, phone_index, rev_index = _PrefixIndex(), _PrefixIndex(), _PrefixIndex()
+        name_index.bulk_load(names)
+        phone_index.bulk_load(phones)
+        rev_index.bulk_load(phones_rev)
+
+        with self._lock:
+            self._guests = docs
+            self._names, self._phones, self._phones_rev = name_index, phone_index, rev_index
+            self._max_id = max(docs, default=0)
+            self._max_phone_id = max((p.phone_id for p in extra), default=0)
+            self._loaded_at = self._synced_at = time.monotonic()
+
+    def sync_new(self):
+        """
+        Cheap catch-up: pulls guests and GuestPhones rows inserted since the
+        last load/sync (e.g. by another worker or an import) using the
+        guest_id and phone_id high-water marks.
+        """
+        rows = db.session.execute(text("""
+            SELECT guest_id, full_name, phone FROM Guests
+            WHERE guest_id > :last ORDER BY guest_id
+        """), {'last': self._max_id}).fetchall()
+        for g in rows:
+            self.add_guest(g.guest_id, g.full_name, g.phone)
+        # After the guests, so phones of a guest new in this sync find it
+        phones = db.session.execute(text("""
+            SELECT phone_id, guest_id, phone_number FROM GuestPhones
+            WHERE phone_id > :last ORDER BY phone_id
+        """), {'last': self._max_phone_id}).fetchall()
+        for p in phones:
+            if p.phone_number:
+                self.add_phone(p.guest_id, p.phone_number)
+        with self._lock:
+            if phones:
+                self._max_phone_id = max(self._max_phone_id, phones[-1].phone_id)
+            self._synced_at = time.monotonic()
+
+    def ensure_loaded(self):
+        config = current_app.config
+        now = time.monotonic()
+        if self._loaded_at is None or now - self._loaded_at > config.get('GUEST_SEARCH_REFRESH_SECONDS', 900):
+            self.load()
+        elif now - self._synced_at > config.get('GUEST_SEARCH_SYNC_SECONDS', 30):
+            self.sync_new()
+
+    # -------------------------------------------------
+    # Incremental updates (called after a successful COMMIT)
+    # -------------------------------------------------
+    def add_guest(self, guest_id, full_name, phone, extra_phones=()):
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._unindex(guest_id)
+            doc = _doc(full_name, phone, extra_phones)
+            self._guests[guest_id] = doc
+            self._index(guest_id, doc)
+            self._max_id = max(self._max_id, guest_id)
+
+    def add_phone(self, guest_id, phone_number):
+        with self._lock:
+            doc = self._guests.get(guest_id)
+            if doc is None:
+                return
+            self._unindex(guest_id)
+            doc[2].append(phone_number)
+            self._guests[guest_id] = doc
+            self._index(guest_id, doc)
+
+    def remove_guest(self, guest_id):
+        with self._lock:
+            self._unindex(guest_id)
+            self._guests.pop(guest_id, None)
+
+    def _index(self, guest_id, doc):
+        full_name, phone, more, _ = doc
+        for word in set(_words(full_name)):
+            self._names.add(word, guest_id)
+        for number in {_digits(n) for n in [phone] + more if _digits(n)}:
+            self._phones.add(number, guest_id)
+            self._phones_rev.add(number[::-1], guest_id)
+
+    def _unindex(self, guest_id):
+        doc = self._guests.get(guest_id)
+        if doc is None:
+            return
+        full_name, phone, more, _ = doc
+        for word in set(_words(full_name)):
+            self._names.remove(word, guest_id)
+        for number in {_digits(n) for n in [phone] + more if _digits(n)}:
+            self._phones.remove(number, guest_id)
+            self._phones_rev.remove(number[::-1], guest_id)
+
+    # -------------------------------------------------
+    # Query
+    # -------------------------------------------------
+    def search(self, query, limit=20):
+        """
+        Returns up to `limit` (guest_id, full_name, phone) tuples, best first.
+        """
+        return self.search_page(query, limit)[0]
+
+    def search_page(self, query, limit=20, after=None):
+        """
+        One page of search(): results strictly after the sort key `after`
+        (from the previous page), plus the key to continue from, or None
+        when there is nothing more. The candidate cap is per query, so deep
+        pages end where the cap does - narrowing the query beats scrolling.
+        """
+        self.ensure_loaded()
+        words = _words(query)
+        digits = _digits(query)
+        needle = ' '.join(words)
+        cap = max(limit * CANDIDATES_PER_RESULT, 100)
+        ranked = {}
+
+        with self._lock:
+            # 1. Name: every query word must prefix some word of the name.
+            # Seed from the narrowest prefix range, then check the other
+            # words against the candidate's own name (no capped intersections).
+            if words:
+                seed = min(words, key=self._names.count)
+                others = [w for w in words if w is not seed]
+                for gid in self._names.prefix(seed, cap):
+                    name = self._guests[gid][3]
+                    name_words = name.split(' ')
+                    if not all(any(nw.startswith(w) for nw in name_words) for w in others):
+                        continue
+                    if name == needle:
+                        rank = RANK_EXACT
+                    elif name.startswith(needle):
+                        rank = RANK_NAME_PREFIX
+                    else:
+                        rank = RANK_WORD_PREFIX
+                    ranked[gid] = rank
+
+            # 2. Phone: digits typed from the start or from the end
+            if len(digits) >= 3:
+                for gid in self._phones.prefix(digits, cap):
+                    ranked[gid] = min(ranked.get(gid, RANK_PHONE_PREFIX), RANK_PHONE_PREFIX)
+                for gid in self._phones_rev.prefix(digits[::-1], cap):
+                    ranked[gid] = min(ranked.get(gid, RANK_PHONE_SUFFIX), RANK_PHONE_SUFFIX)
+
+            # Total order (rank, name length, name, id) so a page boundary is exact
+            keys = ((ranked[gid], len(self._guests[gid][0] or ''), self._guests[gid][0] or '', gid)
+                    for gid in ranked)
+            if after is not None:
+                after = tuple(after)
+                keys = (k for k in keys if k > after)
+            best = heapq.nsmallest(limit + 1, keys)
+            more = len(best) > limit
+            best = best[:max(limit, 0)]
+            results = [(k[3], self._guests[k[3]][0], self._guests[k[3]][1]) for k in best]
+            # A limit below 1 leaves no last row to continue from
+            return results, (list(best[-1]) if more and best else None)
+
+
+def _fulltext_query(query, limit, after_id=None):
+    """
+    MySQL-backed alternative (GUEST_SEARCH_BACKEND = 'fulltext').
+    Requires: ALTER TABLE Guests ADD FULLTEXT INDEX ft_guest_name (full_name);
+    Phones use an index-friendly prefix LIKE instead of '%q%'.
+    Paged calls (after_id given, even None for page one) seek on guest_id.
+    Returns (sql, params), or None when the query has nothing searchable.
+    """
+    words = _words(query)
+    digits = _digits(query)
+    clauses, params = [], {'limit': limit}
+    if words:
+        clauses.append("MATCH(full_name) AGAINST (:terms IN BOOLEAN MODE)")
+        params['terms'] = ' '.join(f'+{w}*' for w in words)
+    if len(digits) >= 3:
+        clauses.append("phone LIKE :prefix")
+        params['prefix'] = f'{digits}%'
+    if not clauses:
+        return None
+    where = f"({' OR '.join(clauses)})"
+    order = ''
+    if after_id is not False:
+        order = 'ORDER BY guest_id'
+        if after_id is not None:
+            where += " AND guest_id > :after_id"
+            params['after_id'] = after_id
+    return f"""
+        SELECT guest_id, full_name, phone FROM Guests
+        WHERE {where}
+        {order}
+        LIMIT :limit
+    """, params
+
+
+def _fulltext_search(query, limit, after_id=None):
+    statement = _fulltext_query(query, limit, after_id)
+    if statement is None:
+        return []
+    rows = db.session.execute(text(statement[0]), statement[1]).fetchall()
+    return [(r.guest_id, r.full_name, r.phone) for r in rows]
+
+
+async def _afulltext_search(query, limit, after_id=None):
+    statement = _fulltext_query(query, limit, after_id)
+    if statement is None:
+        return []
+    rows = await async_db.fetch_all(*statement)
+    return [(r.guest_id, r.full_name, r.phone) for r in rows]
+
+
+def _fulltext_after(cursor):
+    after = decode_cursor(cursor, 1)
+    if after is not None and not isinstance(after[0], int):
+        raise ValueError('Invalid cursor')
+    return after[0] if after else None
+
+
+def _fulltext_page(rows, limit):
+    # One extra row tells us whether a next page exists
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return rows, (encode_cursor([rows[-1][0]]) if more else None)
+
+
+def _use_fulltext():
+    return current_app.config.get('GUEST_SEARCH_BACKEND', 'memory') == 'fulltext'
+
+
+def search_guests(query, limit=20):
+    """
+    Entry point used by the API; dispatches on GUEST_SEARCH_BACKEND.
+    """
+    if _use_fulltext():
+        return _fulltext_search(query, limit, after_id=False)
+    return guest_index.search(query, limit)
+
+
+def search_guests_page(query, limit=20, cursor=None):
+    """
+    Continuation-token paging for the guest picker (no LIMIT/OFFSET):
+    returns (results, next_cursor). Raises ValueError on a bad cursor.
+    """
+    if _use_fulltext():
+        return _fulltext_page(_fulltext_search(query, limit + 1, after_id=_fulltext_after(cursor)), limit)
+
+    after = decode_cursor(cursor, 4)
+    if after is not None and not (isinstance(after[0], int) and isinstance(after[1], int)
+                                  and isinstance(after[2], str) and isinstance(after[3], int)):
+        raise ValueError('Invalid cursor')
+    results, next_key = guest_index.search_page(query, limit, after)
+    return results, (encode_cursor(next_key) if next_key else None)
+
+
+async def asearch_guests(query, limit=20):
+    """
+    search_guests() for the async API view. The in-memory index may
+    (re)load from the DB, so it runs in a worker thread off the loop.
+    """
+    if _use_fulltext():
+        return await _afulltext_search(query, limit, after_id=False)
+    return await asyncio.to_thread(search_guests, query, limit)
+
+
+async def asearch_guests_page(query, limit=20, cursor=None):
+    if _use_fulltext():
+        return _fulltext_page(await _afulltext_search(query, limit + 1, after_id=_fulltext_after(cursor)), limit)
+    return await asyncio.to_thread(search_guests_page, query, limit, cursor)
+
+
+guest_index = GuestSearchIndex()
+
+
+@subscribe('guest_created')
+def _on_guest_created(guest_id, full_name, phone, **_):
+    guest_index.add_guest(guest_id, full_name, phone)
+
+
+@subscribe('guest_deleted')
+def _on_guest_deleted(guest_id, **_):
+    guest_index.remove_guest(guest_id)
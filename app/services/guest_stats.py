@@ -0,0 +1,224 @@
+# app/services/guest_stats.py
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import namedtuple
+from datetime import date
+from decimal import Decimal
+
+from flask import current_app
+from sqlalchemy import text
+from app import db
+from app.services.events import subscribe
+from app.services.archive import history_sql
+
+# Field names match the old VIP ranking query, so reports.html is unchanged
+VipGuest = namedtuple('VipGuest', 'guest_id full_name total_lifetime_spent booking_count last_stay vip_status')
+
+
+def _money(value):
+    return Decimal(str(value)) if value is not None else Decimal('0')
+
+
+def _to_date(value):
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+class _Stats:
+    __slots__ = ('full_name', 'spent', 'bookings', 'last_stay')
+
+    def __init__(self, full_name):
+        self.full_name = full_name
+        self.spent = Decimal('0')
+        self.bookings = 0
+        self.last_stay = None
+
+
+class GuestStats:
+    """
+    Per-guest lifetime spend, booking count and last stay (latest check_out
+    of a completed booking), plus the GetGuestLevel() tier, for the VIP
+    ranking and the guest list.
+
+    Bookings and service orders are summed by two separate GROUP BY
+    queries. Joining both tables fans out and counts a booking's amount
+    once per service order. After loading, the stats are moved by the write
+    events and reconciled every GUEST_STATS_RECONCILE_SECONDS. A list sorted
+    by (-spent, guest_id) makes top-N a slice. Tiers are memoized per spend
+    amount, so GetGuestLevel() only runs for amounts not seen before.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._guests = {}      # guest_id -> _Stats
+        self._ranking = []     # sorted (-spent, guest_id)
+        self._tiers = {}       # spend -> GetGuestLevel(spend)
+        self._loaded_at = None
+
+    def reconcile(self):
+        guests = db.session.execute(text("SELECT guest_id, full_name FROM Guests")).fetchall()
+        # Lifetime figures: archived bookings count too
+        bookings = db.session.execute(text(history_sql("""
+            SELECT b.guest_id, COUNT(*) AS bookings, IFNULL(SUM(b.total_amount), 0) AS spent,
+                   MAX(CASE WHEN b.booking_status = 'completed' THEN b.check_out END) AS last_stay
+            FROM {Bookings} b
+            GROUP BY b.guest_id
+        """))).fetchall()
+        services = db.session.execute(text(history_sql("""
+            SELECT b.guest_id, IFNULL(SUM(so.total_order_cost), 0) AS spent
+            FROM {ServiceOrders} so
+            JOIN {Bookings} b ON so.booking_id = b.booking_id
+            GROUP BY b.guest_id
+        """))).fetchall()
+
+        stats = {r.guest_id: _Stats(r.full_name) for r in guests}
+        for r in bookings:
+            s = stats.get(r.guest_id)
+            if s is not None:
+                s.bookings = r.bookings
+                s.spent += _money(r.spent)
+                s.last_stay = _to_date(r.last_stay)
+        for r in services:
+            s = stats.get(r.guest_id)
+            if s is not None:
+                s.spent += _money(r.spent)
+        ranking = sorted((-s.spent, guest_id) for guest_id, s in stats.items())
+
+        with self._lock:
+            self._guests, self._ranking = stats, ranking
+            # GetGuestLevel() may have been redefined; re-ask for every amount
+            self._tiers = {}
+            self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self):
+        max_age = current_app.config.get('GUEST_STATS_RECONCILE_SECONDS', 900)
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > max_age:
+            self.reconcile()
+
+    # -------------------------------------------------
+    # Reads
+    # -------------------------------------------------
+    def top(self, n=5):
+        """
+        The n highest lifetime spenders as VipGuest rows.
+        """
+        self.ensure_loaded()
+        with self._lock:
+            picked = [(guest_id, self._guests[guest_id]) for _, guest_id in self._ranking[:n]]
+            picked = [(guest_id, s.full_name, s.spent, s.bookings, s.last_stay) for guest_id, s in picked]
+        tiers = self._tiers_for(row[2] for row in picked)
+        return [VipGuest(*row, vip_status=tiers[row[2]]) for row in picked]
+
+    def get(self, guest_id):
+        self.ensure_loaded()
+        with self._lock:
+            s = self._guests.get(guest_id)
+            if s is None:
+                return None
+            row = (guest_id, s.full_name, s.spent, s.bookings, s.last_stay)
+        return VipGuest(*row, vip_status=self._tiers_for([row[2]])[row[2]])
+
+    def booking_counts(self, guest_ids):
+        self.ensure_loaded()
+        with self._lock:
+            return {guest_id: self._guests[guest_id].bookings if guest_id in self._guests else 0
+                    for guest_id in guest_ids}
+
+    def _tiers_for(self, amounts):
+        amounts = set(amounts)
+        with self._lock:
+            missing = [a for a in amounts if a not in self._tiers]
+        if missing:
+            # One round trip for every amount not seen yet
+            select = ', '.join(f'GetGuestLevel(:a{i})' for i in range(len(missing)))
+            row = db.session.execute(text(f"SELECT {select}"),
+                                     {f'a{i}': float(a) for i, a in enumerate(missing)}).first()
+            with self._lock:
+                self._tiers.update(zip(missing, row))
+        with self._lock:
+            return {a: self._tiers.get(a) for a in amounts}
+
+    # -------------------------------------------------
+    # Deltas
+    # -------------------------------------------------
+    @property
+    def loaded(self):
+        return self._loaded_at is not None
+
+    def add_guest(self, guest_id, full_name):
+        with self._lock:
+            if self._loaded_at is not None and guest_id not in self._guests:
+                self._guests[guest_id] = _Stats(full_name)
+                insort(self._ranking, (Decimal('0'), guest_id))
+
+    def remove_guest(self, guest_id):
+        with self._lock:
+            s = self._guests.pop(guest_id, None)
+            if s is not None:
+                self._unrank(s, guest_id)
+
+    def add_activity(self, guest_id, spent=None, bookings=0, last_stay=None):
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            s = self._guests.get(guest_id)
+            if s is None:
+                # Guest added by another worker; its name arrives with the next reconcile
+                s = self._guests[guest_id] = _Stats(None)
+                insort(self._ranking, (Decimal('0'), guest_id))
+            if spent:
+                self._unrank(s, guest_id)
+                s.spent += _money(spent)
+                insort(self._ranking, (-s.spent, guest_id))
+            s.bookings += bookings
+            last_stay = _to_date(last_stay)
+            if last_stay is not None and (s.last_stay is None or last_stay > s.last_stay):
+                s.last_stay = last_stay
+
+    def _unrank(self, s, guest_id):
+        key = (-s.spent, guest_id)
+        pos = bisect_left(self._ranking, key)
+        if pos < len(self._ranking) and self._ranking[pos] == key:
+            del self._ranking[pos]
+
+
+guest_stats = GuestStats()
+
+
+def _booking(booking_id):
+    # Service orders and checkouts only carry the booking id (PK lookup)
+    return db.session.execute(text("SELECT guest_id, check_out FROM Bookings WHERE booking_id = :bid"),
+                              {'bid': booking_id}).first()
+
+
+@subscribe('booking_created')
+def _on_booking_created(guest_id, total_amount=None, **_):
+    guest_stats.add_activity(int(guest_id), spent=total_amount, bookings=1)
+
+
+@subscribe('service_ordered')
+def _on_service_ordered(booking_id, total_order_cost=None, **_):
+    if guest_stats.loaded and total_order_cost:
+        booking = _booking(booking_id)
+        if booking is not None:
+            guest_stats.add_activity(booking.guest_id, spent=total_order_cost)
+
+
+@subscribe('booking_completed')
+def _on_booking_completed(booking_id, **_):
+    if guest_stats.loaded:
+        booking = _booking(booking_id)
+        if booking is not None:
+            guest_stats.add_activity(booking.guest_id, last_stay=booking.check_out)
+
+
+@subscribe('guest_created')
+def _on_guest_created(guest_id, full_name=None, **_):
+    guest_stats.add_guest(int(guest_id), full_name)
+
+
+@subscribe('guest_deleted')
+def _on_guest_deleted(guest_id, **_):
+    guest_stats.remove_guest(int(guest_id))
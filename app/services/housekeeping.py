@@ -0,0 +1,436 @@
+# app/services/housekeeping.py
+import atexit
+import heapq
+import re
+import threading
+import time
+from datetime import date, datetime
+
+from flask import current_app
+from sqlalchemy import bindparam, text
+from app import db
+from app.services.availability import availability_index
+from app.services.events import subscribe
+
+# Turnover tasks are told apart by their description, so Maintenance needs no new column
+TURNOVER_PREFIX = 'Turnover'
+
+INSERT_TASK = text("""
+    INSERT INTO Maintenance (room_id, emp_id, task_desc, status)
+    VALUES (:room_id, NULL, :task_desc, 'pending')
+""")
+ASSIGN_TASK = text("UPDATE Maintenance SET emp_id = :emp_id WHERE task_id = :task_id AND status = 'pending'")
+COMPLETE_TASK = text("""
+    UPDATE Maintenance SET status = 'completed', emp_id = COALESCE(:emp_id, emp_id)
+    WHERE task_id = :task_id AND status = 'pending'
+""")
+# Repairs only: occupied rooms keep 'booked', a free room is taken out of service.
+# Turnovers never touch Rooms.status, which availability checks for any dates
+HOLD_ROOM = text("UPDATE Rooms SET status = 'maintenance' WHERE room_id = :rid AND status = 'available'")
+RELEASE_ROOM = text(f"""
+    UPDATE Rooms SET status = 'available'
+    WHERE room_id = :rid AND status = 'maintenance'
+      AND NOT EXISTS (SELECT 1 FROM Maintenance WHERE room_id = :rid AND status = 'pending'
+                      AND task_desc NOT LIKE '{TURNOVER_PREFIX}%')
+""")
+LOAD_STAFF = text("""
+    SELECT emp_id, name, role, shift_time FROM Employees WHERE role IN :roles
+""").bindparams(bindparam('roles', expanding=True))
+
+# Heap key for a room with no upcoming arrival
+_NO_ARRIVAL = date.max.toordinal()
+_CLOCK = re.compile(r'^\s*(\d{1,2})(?::(\d{2}))?\s*-\s*(\d{1,2})(?::(\d{2}))?\s*$')
+
+
+def _window(value):
+    """
+    '06:00-14:00' or '22-6' -> (start, end) in minutes since midnight.
+    """
+    match = _CLOCK.match(value or '')
+    if not match:
+        return None
+    h1, m1, h2, m2 = match.groups()
+    return int(h1) * 60 + int(m1 or 0), int(h2) * 60 + int(m2 or 0)
+
+
+def parse_shifts(spec):
+    """
+    'Morning=06:00-14:00,Night=22:00-06:00' -> {'morning': (360, 840), 'night': (1320, 360)}
+    """
+    shifts = {}
+    for part in filter(None, (p.strip() for p in (spec or '').split(','))):
+        name, _, value = part.partition('=')
+        window = _window(value)
+        if window is None:
+            raise ValueError(f"Invalid shift window: {part!r}")
+        shifts[name.strip().lower()] = window
+    return shifts
+
+
+def _on_shift(window, minute):
+    start, end = window
+    if start == end:
+        return True
+    if start < end:
+        return start <= minute < end
+    # Overnight shift
+    return minute >= start or minute < end
+
+
+def _roles(value):
+    return tuple(r.strip() for r in (value or '').split(',') if r.strip())
+
+
+class _Task:
+    __slots__ = ('task_id', 'room_id', 'task_desc', 'emp_id', 'due')
+
+    def __init__(self, task_id, room_id, task_desc, emp_id=None, due=_NO_ARRIVAL):
+        self.task_id = task_id
+        self.room_id = room_id
+        self.task_desc = task_desc
+        self.emp_id = emp_id
+        self.due = due
+
+    @property
+    def kind(self):
+        return 'turnover' if (self.task_desc or '').startswith(TURNOVER_PREFIX) else 'repair'
+
+
+class _Staff:
+    __slots__ = ('emp_id', 'name', 'role', 'shift_time', 'window')
+
+    def __init__(self, emp_id, name, role, shift_time, window):
+        self.emp_id = emp_id
+        self.name = name
+        self.role = role
+        self.shift_time = shift_time
+        self.window = window
+
+
+class HousekeepingDispatcher:
+    """
+    Pending Maintenance tasks (room turnovers after checkout and repairs)
+    and who is working on them.
+
+    Unassigned tasks wait in a heap keyed by the next arrival in their room
+    (from the availability index), so the room needed soonest is handed out
+    first. Each on-shift employee (Employees.shift_time matched against
+    HOUSEKEEPING_SHIFTS, or a literal '08:00-16:00' window) of a matching
+    role holds at most HOUSEKEEPING_MAX_OPEN_TASKS; the least loaded one
+    gets the next task, and finishing one pulls the next from the heap.
+    Every HOUSEKEEPING_DISPATCH_SECONDS tasks held by staff whose shift has
+    ended go back to the heap for the next shift.
+
+    Assignment changes are coalesced per task and written by a worker
+    thread every HOUSEKEEPING_FLUSH_MS in one executemany (inline with
+    BACKGROUND_JOBS off). Creating and completing a task are committed
+    with the request. A repair holds a free room in 'maintenance' until
+    its last repair is done; a turnover leaves the room bookable (future
+    stays must not be refused over today's cleaning) and only orders the
+    work by the next arrival. The state is reloaded from MySQL every
+    HOUSEKEEPING_RECONCILE_SECONDS to pick up changes from other workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._tasks = {}       # task_id -> _Task (pending only)
+        self._by_room = {}     # room_id -> {task_id}
+        self._queue = []       # heap of (due, task_id) for unassigned tasks; stale entries skipped
+        self._staff = {}       # emp_id -> _Staff
+        self._open = {}        # emp_id -> tasks held
+        self._writes = {}      # task_id -> emp_id not yet written
+        self._worker = None
+        self._engine = None
+        self._logger = None
+        self._background = False
+        self._loaded_at = None
+        self.shifts = {}
+        self.turnover_roles = ()
+        self.repair_roles = ()
+        self.max_open = 5
+        self.flush_interval = 2.0
+        self.counters = {'created': 0, 'completed': 0, 'assigned': 0, 'released': 0,
+                         'written': 0, 'batches': 0, 'failed_batches': 0}
+
+    def init_app(self, app):
+        self._engine = db.engine
+        self._logger = app.logger
+        self.shifts = parse_shifts(app.config['HOUSEKEEPING_SHIFTS'])
+        self.turnover_roles = _roles(app.config['HOUSEKEEPING_TURNOVER_ROLES'])
+        self.repair_roles = _roles(app.config['HOUSEKEEPING_REPAIR_ROLES'])
+        self.max_open = app.config['HOUSEKEEPING_MAX_OPEN_TASKS']
+        self.flush_interval = app.config['HOUSEKEEPING_FLUSH_MS'] / 1000.0
+        self._background = app.config.get('BACKGROUND_JOBS', True)
+        if self._background and self._worker is None:
+            self._worker = threading.Thread(target=self._run, name='housekeeping', daemon=True)
+            self._worker.start()
+            atexit.register(self.flush)
+
+    # -------------------------------------------------
+    # Loading
+    # -------------------------------------------------
+    def reconcile(self):
+        roles = list(set(self.turnover_roles + self.repair_roles))
+        staff = db.session.execute(LOAD_STAFF, {'roles': roles}).fetchall() if roles else []
+        rows = db.session.execute(text("""
+            SELECT task_id, room_id, emp_id, task_desc FROM Maintenance WHERE status = 'pending'
+        """)).fetchall()
+        arrivals = availability_index.next_arrivals({r.room_id for r in rows})
+
+        with self._lock:
+            self._staff = {s.emp_id: _Staff(s.emp_id, s.name, s.role, s.shift_time, self._shift_window(s.shift_time))
+                           for s in staff}
+            self._tasks, self._by_room, self._queue, self._open = {}, {}, [], {}
+            for r in rows:
+                # Assignments still waiting to be written win over the table
+                emp_id = self._writes.get(r.task_id, r.emp_id)
+                self._track(_Task(r.task_id, r.room_id, r.task_desc, emp_id, _due(arrivals.get(r.room_id))))
+            self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self):
+        max_age = current_app.config.get('HOUSEKEEPING_RECONCILE_SECONDS', 300)
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > max_age:
+            self.reconcile()
+
+    def _shift_window(self, shift_time):
+        return _window(shift_time) or self.shifts.get((shift_time or '').strip().lower())
+
+    # -------------------------------------------------
+    # Writes (committed with the request)
+    # -------------------------------------------------
+    def turnover(self, booking_id, room_id):
+        """
+        Opens the cleaning task for a checked-out room. The room stays
+        available. Returns the task id (None with HOUSEKEEPING_TURNOVER off).
+        """
+        if not current_app.config.get('HOUSEKEEPING_TURNOVER', True):
+            return None
+        task_id, _ = self.add_task(room_id, f'{TURNOVER_PREFIX} after booking #{booking_id}', hold=False)
+        return task_id
+
+    def add_task(self, room_id, task_desc, hold=True):
+        """
+        Inserts a pending task and, with `hold`, takes the room out of
+        service if it is free. Returns (task_id, held).
+        """
+        self.ensure_loaded()
+        try:
+            result = db.session.execute(INSERT_TASK, {'room_id': room_id, 'task_desc': task_desc})
+            held = hold and db.session.execute(HOLD_ROOM, {'rid': room_id}).rowcount > 0
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        task_id = result.lastrowid
+        due = _due(availability_index.next_arrivals([room_id])[room_id])
+        with self._lock:
+            self.counters['created'] += 1
+            self._track(_Task(task_id, int(room_id), task_desc, None, due))
+            self._dispatch()
+        self._persist()
+        return task_id, held
+
+    def complete(self, task_id):
+        """
+        Marks a task done and, if it was the last repair of a held room,
+        makes the room available again. Returns (room_id, released).
+        Raises LookupError when there is no such pending task.
+        """
+        with self._lock:
+            task = self._tasks.get(task_id)
+            emp_id = task.emp_id if task is not None else None
+        try:
+            done = db.session.execute(COMPLETE_TASK, {'task_id': task_id, 'emp_id': emp_id}).rowcount
+            if not done:
+                raise LookupError(f'No pending task #{task_id}')
+            room_id = db.session.execute(text("SELECT room_id FROM Maintenance WHERE task_id = :tid"),
+                                         {'tid': task_id}).scalar()
+            released = db.session.execute(RELEASE_ROOM, {'rid': room_id}).rowcount > 0
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        with self._lock:
+            self.counters['completed'] += 1
+            self._writes.pop(task_id, None)
+            self._untrack(task_id)
+            # The employee has room for the next task in line
+            self._dispatch()
+        self._persist()
+        return room_id, released
+
+    # -------------------------------------------------
+    # Dispatching
+    # -------------------------------------------------
+    def tick(self, now=None):
+        """
+        Periodic job: reload if stale, hand tasks over at shift changes and
+        write outstanding assignments.
+        """
+        self.ensure_loaded()
+        with self._lock:
+            self._dispatch(now)
+        self.flush()
+
+    def reprioritize(self, room_id):
+        """
+        The room's next arrival changed (booking made or cancelled).
+        """
+        with self._lock:
+            task_ids = list(self._by_room.get(room_id, ()))
+        if not task_ids:
+            return
+        due = _due(availability_index.next_arrivals([room_id])[room_id])
+        with self._lock:
+            for task_id in task_ids:
+                task = self._tasks.get(task_id)
+                if task is not None and task.due != due:
+                    task.due = due
+                    if task.emp_id is None:
+                        heapq.heappush(self._queue, (due, task_id))
+
+    def _dispatch(self, now=None):
+        # Caller holds self._lock
+        if self._loaded_at is None:
+            return
+        now = now or datetime.now()
+        minute = now.hour * 60 + now.minute
+        on_shift = [s for s in self._staff.values() if s.window and _on_shift(s.window, minute)]
+        on_shift_ids = {s.emp_id for s in on_shift}
+
+        for task in self._tasks.values():
+            if task.emp_id is not None and task.emp_id not in on_shift_ids:
+                self._assign(task, None)
+
+        deferred = []
+        while self._queue and any(self._open.get(s.emp_id, 0) < self.max_open for s in on_shift):
+            due, task_id = heapq.heappop(self._queue)
+            task = self._tasks.get(task_id)
+            if task is None or task.emp_id is not None or task.due != due:
+                continue
+            roles = self.turnover_roles if task.kind == 'turnover' else self.repair_roles
+            free = [s for s in on_shift if s.role in roles and self._open.get(s.emp_id, 0) < self.max_open]
+            if not free:
+                # Nobody of this role can take it now; keep its place for later
+                deferred.append((due, task_id))
+                continue
+            self._assign(task, min(free, key=lambda s: (self._open.get(s.emp_id, 0), s.emp_id)).emp_id)
+        for entry in deferred:
+            heapq.heappush(self._queue, entry)
+
+    def _assign(self, task, emp_id):
+        if task.emp_id is not None:
+            self._open[task.emp_id] = self._open.get(task.emp_id, 1) - 1
+            self.counters['released'] += 1
+        task.emp_id = emp_id
+        if emp_id is None:
+            heapq.heappush(self._queue, (task.due, task.task_id))
+        else:
+            self._open[emp_id] = self._open.get(emp_id, 0) + 1
+            self.counters['assigned'] += 1
+        self._writes[task.task_id] = emp_id
+
+    def _track(self, task):
+        self._tasks[task.task_id] = task
+        self._by_room.setdefault(task.room_id, set()).add(task.task_id)
+        if task.emp_id is None:
+            heapq.heappush(self._queue, (task.due, task.task_id))
+        else:
+            self._open[task.emp_id] = self._open.get(task.emp_id, 0) + 1
+
+    def _untrack(self, task_id):
+        task = self._tasks.pop(task_id, None)
+        if task is None:
+            return
+        self._by_room.get(task.room_id, set()).discard(task_id)
+        if task.emp_id is not None:
+            self._open[task.emp_id] = self._open.get(task.emp_id, 1) - 1
+
+    # -------------------------------------------------
+    # Reads
+    # -------------------------------------------------
+    def board(self, now=None):
+        """
+        On-shift staff with their task lists in working order (next arrival
+        first), off-shift staff, and the tasks nobody could take yet.
+        """
+        self.ensure_loaded()
+        now = now or datetime.now()
+        minute = now.hour * 60 + now.minute
+        today = now.date().toordinal()
+        with self._lock:
+            self._dispatch(now)
+            tasks = sorted(self._tasks.values(), key=lambda t: (t.due, t.task_id))
+            queues = {emp_id: [] for emp_id in self._staff}
+            unassigned = []
+            for t in tasks:
+                row = {'task_id': t.task_id, 'room_id': t.room_id, 'task_desc': t.task_desc, 'kind': t.kind,
+                       'emp_id': t.emp_id, 'urgent': t.due <= today,
+                       'next_arrival': date.fromordinal(t.due).isoformat() if t.due != _NO_ARRIVAL else None}
+                queues.get(t.emp_id, unassigned).append(row)
+            staff = [{'emp_id': s.emp_id, 'name': s.name, 'role': s.role, 'shift_time': s.shift_time,
+                      'on_shift': bool(s.window) and _on_shift(s.window, minute), 'tasks': queues[s.emp_id]}
+                     for s in sorted(self._staff.values(), key=lambda s: (s.role or '', s.name or ''))]
+        self._persist()
+        return {'staff': staff, 'unassigned': unassigned, 'pending': len(tasks)}
+
+    @property
+    def loaded(self):
+        return self._loaded_at is not None
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, pending=len(self._tasks), unwritten=len(self._writes))
+
+    # -------------------------------------------------
+    # Batched assignment writes
+    # -------------------------------------------------
+    def _persist(self):
+        if not self._background:
+            self.flush()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                writes, self._writes = self._writes, {}
+            if not writes:
+                return 0
+            try:
+                with self._engine.begin() as conn:
+                    conn.execute(ASSIGN_TASK, [{'task_id': task_id, 'emp_id': emp_id}
+                                               for task_id, emp_id in writes.items()])
+            except Exception:
+                with self._lock:
+                    self.counters['failed_batches'] += 1
+                    # Keep them for the next flush unless superseded meanwhile
+                    for task_id, emp_id in writes.items():
+                        self._writes.setdefault(task_id, emp_id)
+                self._logger.exception('Housekeeping assignment flush of %d failed', len(writes))
+                return 0
+            with self._lock:
+                self.counters['written'] += len(writes)
+                self.counters['batches'] += 1
+            return len(writes)
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                self._logger.exception('Housekeeping flush failed')
+
+
+def _due(arrival):
+    return arrival.toordinal() if arrival is not None else _NO_ARRIVAL
+
+
+housekeeping = HousekeepingDispatcher()
+
+
+@subscribe('booking_created')
+@subscribe('booking_cancelled')
+def _on_arrivals_changed(room_id=None, **_):
+    if room_id is not None and housekeeping.loaded:
+        housekeeping.reprioritize(int(room_id))
@@ -0,0 +1,173 @@
+# app/services/invoice_export.py
+import csv
+import io
+import json
+import os
+import uuid
+from decimal import Decimal
+
+from flask import render_template
+from sqlalchemy import text
+from app import db
+from app.services.booking_loader import load_bookings
+from app.services.archive import history_sql
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'html': ('text/html', 'html'),
+}
+
+# Bookings per load_bookings() batch; bounds memory regardless of range size
+EXPORT_CHUNK = 500
+
+CSV_HEADER = ['invoice_no', 'booking_id', 'guest', 'phone', 'email', 'room', 'check_in', 'check_out',
+              'room_charges', 'service_total', 'grand_total', 'paid_total', 'services']
+
+HTML_HEAD = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="UTF-8"><title>HotelEase Invoices</title>
+<link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
+<link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">
+<style>.invoice-page { page-break-after: always; margin: 24px 0; }</style>
+</head><body><div class="container">
+"""
+HTML_FOOT = "</div></body></html>\n"
+
+
+def iter_booking_id_chunks(date_from, date_to, status='completed', chunk=EXPORT_CHUNK):
+    """
+    Streams matching booking_ids with a server-side (unbuffered) cursor on a
+    dedicated connection, so the id list is never materialized in full and
+    the session connection stays free for load_bookings().
+    """
+    with db.engine.connect() as conn:
+        # Month-end exports may reach back into archived bookings
+        result = conn.execution_options(stream_results=True).execute(text(history_sql("""
+            SELECT b.booking_id FROM {Bookings} b
+            ORDER BY b.booking_id
+        """, Bookings="check_out BETWEEN :d1 AND :d2 AND booking_status = :status")),
+            {'d1': date_from, 'd2': date_to, 'status': status})
+        for rows in result.partitions(chunk):
+            yield [r.booking_id for r in rows]
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def _csv_row(b):
+    services = '; '.join(f"{s.service_name} x{s.quantity}" for s in b.services)
+    return [f"INV-{b.booking_id}", b.booking_id, b.full_name, b.phone, b.email, b.room_number,
+            b.check_in, b.check_out, b.total_amount, b.service_total, b.final_total, b.paid_total, services]
+
+
+def _json_doc(b):
+    return {
+        'invoice_no': f"INV-{b.booking_id}",
+        'booking_id': b.booking_id,
+        'guest': {'name': b.full_name, 'phone': b.phone, 'email': b.email},
+        'room': b.room_number,
+        'check_in': b.check_in,
+        'check_out': b.check_out,
+        'room_charges': b.total_amount,
+        'services': [{'name': s.service_name, 'quantity': s.quantity, 'cost': s.total_order_cost}
+                     for s in b.services],
+        'service_total': b.service_total,
+        'grand_total': b.final_total,
+        'paid_total': b.paid_total,
+    }
+
+
+def export_invoices(date_from, date_to, fmt='csv', status='completed'):
+    """
+    Generator of text chunks (one per batch of invoices) for the given
+    check-out date range. Memory use is bounded by EXPORT_CHUNK.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    if fmt == 'csv':
+        buf = io.StringIO()
+        csv.writer(buf).writerow(CSV_HEADER)
+        yield buf.getvalue()
+    elif fmt == 'html':
+        yield HTML_HEAD
+
+    for ids in iter_booking_id_chunks(date_from, date_to, status):
+        bookings = load_bookings(ids)
+        buf = io.StringIO()
+        writer = csv.writer(buf) if fmt == 'csv' else None
+        for booking_id in ids:
+            b = bookings.get(booking_id)
+            if b is None:
+                continue
+            if fmt == 'csv':
+                writer.writerow(_csv_row(b))
+            elif fmt == 'jsonl':
+                buf.write(json.dumps(_json_doc(b), default=_json_default) + '\n')
+            else:
+                buf.write('<div class="invoice-page">')
+                buf.write(render_template('reception/_invoice_card.html', booking=b,
+                                          services=b.services, final_total=b.final_total))
+                buf.write('</div>\n')
+        # load_bookings() returns plain namespaces, not ORM objects, so the
+        # session holds nothing between batches; `bookings` goes with the loop
+        yield buf.getvalue()
+
+    if fmt == 'html':
+        yield HTML_FOOT
+
+
+def write_export(path, date_from, date_to, fmt='csv', status='completed'):
+    """
+    Writes an export to `path` incrementally via a .part file that is renamed
+    on success, so a half-written file is never served. Returns bytes written.
+    """
+    part = path + '.part'
+    written = 0
+    with open(part, 'w', encoding='utf-8', newline='') as fh:
+        for piece in export_invoices(date_from, date_to, fmt, status):
+            fh.write(piece)
+            written += len(piece)
+    os.replace(part, path)
+    return written
+
+
+# -------------------------------------------------
+# Background jobs for the web endpoint (file-based, so any worker can report status)
+# -------------------------------------------------
+def new_job_path(export_dir, fmt):
+    os.makedirs(export_dir, exist_ok=True)
+    job_id = uuid.uuid4().hex
+    return job_id, os.path.join(export_dir, f"invoices-{job_id}.{FORMATS[fmt][1]}")
+
+
+def run_export_job(path, date_from, date_to, fmt):
+    """
+    Job body; on failure leaves a .error file next to the target path.
+    """
+    try:
+        write_export(path, date_from, date_to, fmt)
+    except Exception as e:
+        with open(path + '.error', 'w', encoding='utf-8') as fh:
+            fh.write(str(e))
+        raise
+
+
+def find_job(export_dir, job_id):
+    """
+    Returns (status, path, fmt) where status is done/running/failed/unknown.
+    """
+    if not job_id.isalnum():
+        return 'unknown', None, None
+    for fmt, (_, ext) in FORMATS.items():
+        path = os.path.join(export_dir, f"invoices-{job_id}.{ext}")
+        if os.path.exists(path):
+            return 'done', path, fmt
+        if os.path.exists(path + '.error'):
+            return 'failed', path + '.error', fmt
+        if os.path.exists(path + '.part'):
+            return 'running', None, fmt
+    return 'unknown', None, None
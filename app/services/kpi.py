@@ -0,0 +1,128 @@
+# app/services/kpi.py
+import threading
+import time
+from decimal import Decimal
+
+from flask import current_app
+from sqlalchemy import text
+from app import db
+from app.services.events import subscribe
+from app.services.archive import history_sql
+
+
+def _money(value):
+    return Decimal(str(value)) if value is not None else Decimal('0')
+
+
+# Full recount, keyed for DashboardKPIs.apply(). Lifetime revenue includes archived bookings
+RECONCILE_QUERIES = {
+    'guest_count': "SELECT COUNT(*) FROM Guests",
+    'total_revenue': """
+        SELECT
+        (SELECT IFNULL(SUM(b.total_amount), 0) FROM {Bookings} b) +
+        (SELECT IFNULL(SUM(so.total_order_cost), 0) FROM {ServiceOrders} so)
+    """,
+    'rooms': "SELECT room_id, status FROM Rooms",
+}
+
+
+def reconcile_queries():
+    return {name: history_sql(sql) for name, sql in RECONCILE_QUERIES.items()}
+
+
+class DashboardKPIs:
+    """
+    Running aggregates for the admin dashboard header cards.
+
+    Seeded once from the DB, then moved by deltas from the write events, and
+    reconciled against the full queries every KPI_RECONCILE_SECONDS so drift
+    (other workers, manual SQL) never lasts long.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.guest_count = 0
+        self.total_revenue = Decimal('0')
+        self._room_status = {}   # room_id -> status
+        self._reconciled_at = None
+
+    def reconcile(self):
+        """
+        Recomputes every aggregate from scratch (the pre-cache dashboard queries).
+        """
+        self.apply({name: db.session.execute(text(sql)).fetchall()
+                    for name, sql in reconcile_queries().items()})
+
+    def apply(self, results):
+        """
+        Installs a recount: RECONCILE_QUERIES name -> rows (the async
+        dashboard runs them itself, alongside its own query).
+        """
+        rooms = results['rooms']
+        with self._lock:
+            self.guest_count = results['guest_count'][0][0] or 0
+            self.total_revenue = _money(results['total_revenue'][0][0])
+            self._room_status = {r.room_id: r.status for r in rooms}
+            self._reconciled_at = time.monotonic()
+
+    def due(self):
+        max_age = current_app.config.get('KPI_RECONCILE_SECONDS', 300)
+        return self._reconciled_at is None or time.monotonic() - self._reconciled_at > max_age
+
+    def snapshot(self):
+        """
+        O(1) read for the dashboard; reconciles first when due.
+        """
+        if self.due():
+            self.reconcile()
+        with self._lock:
+            return {
+                'guest_count': self.guest_count,
+                'total_revenue': self.total_revenue,
+                'room_count': sum(1 for s in self._room_status.values() if s == 'available'),
+                'room_total': len(self._room_status),
+            }
+
+    # -------------------------------------------------
+    # Deltas
+    # -------------------------------------------------
+    def add_revenue(self, amount):
+        with self._lock:
+            self.total_revenue += _money(amount)
+
+    def add_guests(self, delta):
+        with self._lock:
+            self.guest_count += delta
+
+    def set_room_status(self, room_id, status):
+        with self._lock:
+            if self._reconciled_at is not None:
+                self._room_status[int(room_id)] = status
+
+
+dashboard_kpis = DashboardKPIs()
+
+
+@subscribe('booking_created')
+def _on_booking_created(total_amount=None, **_):
+    dashboard_kpis.add_revenue(total_amount)
+
+
+@subscribe('service_ordered')
+def _on_service_ordered(total_order_cost=None, **_):
+    dashboard_kpis.add_revenue(total_order_cost)
+
+
+@subscribe('guest_created')
+def _on_guest_created(**_):
+    dashboard_kpis.add_guests(1)
+
+
+@subscribe('guest_deleted')
+def _on_guest_deleted(**_):
+    dashboard_kpis.add_guests(-1)
+
+
+@subscribe('room_status_changed')
+def _on_room_status_changed(room_id, status, **_):
+    dashboard_kpis.set_room_status(room_id, status)
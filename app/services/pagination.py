@@ -0,0 +1,106 @@
+# app/services/pagination.py
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import current_app
+from sqlalchemy import text
+from app import db
+
+
+def encode_cursor(values):
+    """
+    Packs the sort-key values of the last row into an opaque URL-safe token.
+    """
+    raw = json.dumps(list(values), default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, size):
+    """
+    Reverses encode_cursor(). Raises ValueError on a malformed token.
+    """
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def page_size(requested=None):
+    """
+    Clamps a client-supplied ?limit= to the configured bounds.
+    """
+    default = current_app.config.get('PAGE_SIZE', 50)
+    maximum = current_app.config.get('PAGE_SIZE_MAX', 200)
+    try:
+        size = int(requested) if requested else default
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, maximum))
+
+
+def keyset_page(select_sql, order_by, cursor=None, where=None, params=None, limit=None):
+    """
+    Runs one page of a descending keyset (seek) query.
+
+    select_sql -- "SELECT ... FROM ..." without WHERE/ORDER BY
+    order_by   -- [(sql_expression, result_column), ...], most significant
+                  first; the last one must be unique (usually the PK)
+    cursor     -- token returned as next_cursor by the previous page
+
+    Instead of OFFSET, the page starts strictly after the last row seen,
+    e.g. (ts < :k0) OR (ts = :k0 AND id < :k1), so every page costs the
+    same index range scan no matter how deep the client has scrolled.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    limit = limit or page_size()
+    clauses = list(where or [])
+    bind = dict(params or {})
+
+    values = decode_cursor(cursor, len(order_by))
+    if values is not None:
+        branches = []
+        for i, (expr, _) in enumerate(order_by):
+            equal = [f"{order_by[j][0]} = :_k{j}" for j in range(i)]
+            branches.append('(' + ' AND '.join(equal + [f"{expr} < :_k{i}"]) + ')')
+        clauses.append('(' + ' OR '.join(branches) + ')')
+        bind.update({f'_k{i}': v for i, v in enumerate(values)})
+
+    sql = select_sql
+    if clauses:
+        sql += ' WHERE ' + ' AND '.join(clauses)
+    sql += ' ORDER BY ' + ', '.join(f'{expr} DESC' for expr, _ in order_by)
+    sql += ' LIMIT :_limit'
+    bind['_limit'] = limit + 1  # one extra row tells us whether a next page exists
+
+    rows = db.session.execute(text(sql), bind).fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor(last[column] for _, column in order_by)
+    return rows, next_cursor
+
+
+def serialize_row(row):
+    """
+    Converts a result Row into a JSON-safe dict (dates, decimals -> str/float).
+    """
+    data = {}
+    # Result rows, or namedtuples built from them
+    mapping = row._mapping if hasattr(row, '_mapping') else row._asdict()
+    for key, value in mapping.items():
+        if isinstance(value, (datetime, date)):
+            value = value.isoformat(sep=' ') if isinstance(value, datetime) else value.isoformat()
+        elif isinstance(value, Decimal):
+            value = float(value)
+        data[key] = value
+    return data
@@ -0,0 +1,322 @@
+# app/services/pricing.py
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import text
+from app import db
+from app.services.archive import history_sql
+from app.services.events import subscribe
+
+# When each booking was made: Bookings has no creation date, but the audit
+# trail records every booking_created with its timestamp
+LEAD_TIMES_SQL = """
+    SELECT r.type_id, b.check_in, a.action_timestamp AS booked_at
+    FROM {AuditLog} a
+    JOIN Bookings b ON b.booking_id = JSON_EXTRACT(a.details, '$.booking_id')
+    JOIN Rooms r ON r.room_id = b.room_id
+    WHERE b.booking_status <> 'cancelled'
+"""
+LEAD_TIMES_WHERE = "table_name = 'Bookings' AND action_type = 'INSERT' AND action_timestamp >= :since"
+
+
+def _to_date(value):
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+class PricingEngine:
+    """
+    Occupancy forecast and dynamic nightly rates per room type.
+
+    Booking history is loaded into a rooms x nights boolean matrix covering
+    PRICING_HISTORY_DAYS back to PRICING_HORIZON_DAYS ahead. It is built
+    with a difference array and one cumsum. Room-type occupancy is a
+    (types x rooms) one-hot matrix times that matrix, and everything after
+    that is whole-array arithmetic:
+
+      - baseline: mean occupancy per type and weekday over the last
+        BASELINE_WEEKS, blended with the same weekday 52 weeks earlier;
+      - pickup curve: the share of a night's bookings already made L days
+        before arrival. Lead times (check-in minus the day the booking was
+        made) are loaded at each rebuild from the bookings' AuditLog INSERT
+        entries over PRICING_HISTORY_DAYS, so every worker starts from the
+        same curve, and new bookings add to it in between. Until
+        PRICING_MIN_PICKUP_SAMPLES bookings are known, the forecast is
+        max(on the books, baseline);
+      - forecast: on-the-books / pickup[L], blended with the baseline and
+        never below what is already sold; past nights use actual occupancy;
+      - rate: base_price * clip(1 + PRICING_ELASTICITY * (forecast -
+        PRICING_TARGET_OCCUPANCY), PRICING_MIN_FACTOR, PRICING_MAX_FACTOR).
+
+    Kept current from the booking events, and rebuilt every
+    PRICING_REFRESH_SECONDS and at each date change.
+    """
+
+    BASELINE_WEEKS = 8
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded_at = None
+        self._loaded_day = None
+        self._dirty = True
+        self._lead_counts = None   # types x (horizon + 1) histogram of booking lead times
+
+    # -------------------------------------------------
+    # Loading
+    # -------------------------------------------------
+    def load(self):
+        cfg = current_app.config
+        today = date.today()
+        base = today.toordinal() - cfg['PRICING_HISTORY_DAYS']
+        n_days = cfg['PRICING_HISTORY_DAYS'] + cfg['PRICING_HORIZON_DAYS']
+
+        types = db.session.execute(text("SELECT type_id, name, base_price FROM RoomTypes ORDER BY type_id")).fetchall()
+        rooms = db.session.execute(text("SELECT room_id, type_id FROM Rooms ORDER BY room_id")).fetchall()
+        bookings = db.session.execute(text("""
+            SELECT booking_id, room_id, check_in, check_out FROM Bookings
+            WHERE booking_status <> 'cancelled' AND check_out > :start AND check_in < :end
+        """), {'start': date.fromordinal(base), 'end': date.fromordinal(base + n_days)}).fetchall()
+
+        type_index = {t.type_id: i for i, t in enumerate(types)}
+        room_index = {r.room_id: i for i, r in enumerate(rooms)}
+        room_types = np.array([type_index.get(r.type_id, -1) for r in rooms], dtype=np.int64)
+        onehot = np.zeros((len(types), len(rooms)), dtype=np.int32)
+        known = room_types >= 0
+        onehot[room_types[known], np.nonzero(known)[0]] = 1
+
+        horizon = cfg['PRICING_HORIZON_DAYS']
+        lead_counts = np.zeros((len(types), horizon + 1), dtype=np.int64)
+        try:
+            made = db.session.execute(text(history_sql(LEAD_TIMES_SQL, AuditLog=LEAD_TIMES_WHERE)),
+                                      {'since': date.fromordinal(base)}).fetchall()
+        except Exception:
+            # Audit details that aren't JSON, or no JSON functions: learn from new bookings only
+            db.session.rollback()
+            current_app.logger.warning('Could not load booking lead times', exc_info=True)
+            made = []
+        made = [m for m in made if m.type_id in type_index]
+        if made:
+            leads = np.fromiter((_to_date(m.check_in).toordinal() - _to_date(m.booked_at).toordinal()
+                                 for m in made), dtype=np.int64, count=len(made))
+            positions = np.fromiter((type_index[m.type_id] for m in made), dtype=np.int64, count=len(made))
+            valid = (leads >= 0) & (leads <= horizon)
+            np.add.at(lead_counts, (positions[valid], leads[valid]), 1)
+
+        kept = [b for b in bookings if b.room_id in room_index]
+        rows = np.fromiter((room_index[b.room_id] for b in kept), dtype=np.int64, count=len(kept))
+        starts = np.fromiter((_to_date(b.check_in).toordinal() for b in kept), dtype=np.int64, count=len(kept))
+        ends = np.fromiter((_to_date(b.check_out).toordinal() for b in kept), dtype=np.int64, count=len(kept))
+        starts = np.clip(starts - base, 0, n_days)
+        ends = np.clip(ends - base, 0, n_days)
+
+        # +1 at check-in, -1 at check-out; the running sum marks occupied nights
+        diff = np.zeros((len(rooms), n_days + 1), dtype=np.int32)
+        np.add.at(diff, (rows, starts), 1)
+        np.add.at(diff, (rows, ends), -1)
+        occupied = np.cumsum(diff, axis=1)[:, :n_days] > 0
+
+        with self._lock:
+            self._base = base
+            self._n_days = n_days
+            self._today = today.toordinal() - base
+            self._types = [t.type_id for t in types]
+            self._type_names = [t.name for t in types]
+            self._type_index = type_index
+            self._base_prices = np.array([float(t.base_price or 0) for t in types])
+            self._room_index = room_index
+            self._room_types = room_types
+            self._onehot = onehot
+            self._capacity = onehot.sum(axis=1)
+            self._occupied = occupied
+            self._bookings = {b.booking_id: (room_index[b.room_id], s, e)
+                              for b, s, e in zip(kept, starts.tolist(), ends.tolist())}
+            self._lead_counts = lead_counts
+            self._dirty = True
+            self._loaded_at = time.monotonic()
+            self._loaded_day = today
+
+    def ensure_loaded(self):
+        max_age = current_app.config.get('PRICING_REFRESH_SECONDS', 900)
+        if (self._loaded_at is None or self._loaded_day != date.today()
+                or time.monotonic() - self._loaded_at > max_age):
+            self.load()
+
+    # -------------------------------------------------
+    # Derived arrays
+    # -------------------------------------------------
+    def _recompute(self):
+        """
+        Occupancy, baseline, forecast and rates for the whole matrix, once
+        per change (callers hold the lock).
+        """
+        cfg = current_app.config
+        capacity = np.maximum(self._capacity, 1)[:, None]
+        occupancy = (self._onehot @ self._occupied) / capacity            # types x days
+        ordinals = np.arange(self._base, self._base + self._n_days)
+        weekdays = (ordinals + 6) % 7                                      # date.weekday()
+
+        # Baseline per type and weekday from the recent past
+        lo = max(self._today - 7 * self.BASELINE_WEEKS, 0)
+        recent = occupancy[:, lo:self._today]
+        baseline = np.zeros((len(self._types), 7))
+        if recent.shape[1]:
+            for day in range(7):
+                cols = weekdays[lo:self._today] == day
+                if cols.any():
+                    baseline[:, day] = recent[:, cols].mean(axis=1)
+        expected = baseline[:, weekdays]
+        # Same weekday 52 weeks earlier, where the history reaches back that far
+        last_year = np.arange(self._n_days) - 364
+        has_last_year = last_year >= 0
+        expected[:, has_last_year] = 0.5 * expected[:, has_last_year] + \
+            0.5 * occupancy[:, last_year[has_last_year]]
+
+        forecast = occupancy.copy()
+        future = slice(self._today, self._n_days)
+        on_books = occupancy[:, future]
+        samples = self._lead_counts.sum(axis=1, keepdims=True)
+        if samples.sum() >= cfg['PRICING_MIN_PICKUP_SAMPLES']:
+            # pickup[t, L]: share of bookings made L or more days ahead
+            pickup = np.cumsum(self._lead_counts[:, ::-1], axis=1)[:, ::-1] / np.maximum(samples, 1)
+            leads = np.minimum(np.arange(on_books.shape[1]), pickup.shape[1] - 1)
+            projected = on_books / np.maximum(pickup[:, leads], 0.05)
+            blended = 0.5 * projected + 0.5 * expected[:, future]
+        else:
+            blended = expected[:, future]
+        forecast[:, future] = np.clip(np.maximum(blended, on_books), 0.0, 1.0)
+
+        factor = np.clip(1 + cfg['PRICING_ELASTICITY'] * (forecast - cfg['PRICING_TARGET_OCCUPANCY']),
+                         cfg['PRICING_MIN_FACTOR'], cfg['PRICING_MAX_FACTOR'])
+        self._occupancy = occupancy
+        self._baseline = baseline
+        self._forecast = forecast
+        self._rates = np.round(self._base_prices[:, None] * factor, 2)
+        self._base_factor_weekday = np.clip(
+            1 + cfg['PRICING_ELASTICITY'] * (baseline - cfg['PRICING_TARGET_OCCUPANCY']),
+            cfg['PRICING_MIN_FACTOR'], cfg['PRICING_MAX_FACTOR'])
+        self._dirty = False
+
+    def _window(self, start, end):
+        """
+        (occupancy, forecast, rates) for nights [start, end) as types x nights
+        arrays. Nights outside the matrix use the weekday baseline.
+        """
+        self.ensure_loaded()
+        with self._lock:
+            if self._dirty:
+                self._recompute()
+            ordinals = np.arange(start.toordinal(), end.toordinal())
+            idx = ordinals - self._base
+            inside = (idx >= 0) & (idx < self._n_days)
+            weekdays = (ordinals + 6) % 7
+            occupancy = np.zeros((len(self._types), len(ordinals)))
+            forecast = self._baseline[:, weekdays].copy()
+            rates = np.round(self._base_prices[:, None] * self._base_factor_weekday[:, weekdays], 2)
+            occupancy[:, inside] = self._occupancy[:, idx[inside]]
+            forecast[:, inside] = self._forecast[:, idx[inside]]
+            rates[:, inside] = self._rates[:, idx[inside]]
+            return occupancy, forecast, rates
+
+    # -------------------------------------------------
+    # Public API
+    # -------------------------------------------------
+    def quote_all(self, check_in, check_out):
+        """
+        Nightly rates and totals for every room type, for nights
+        [check_in, check_out).
+        """
+        check_in, check_out = _to_date(check_in), _to_date(check_out)
+        if check_out <= check_in:
+            raise ValueError('check_out must be after check_in')
+        _, _, rates = self._window(check_in, check_out)
+        totals = rates.sum(axis=1)
+        return [{'type_id': type_id, 'name': name, 'check_in': check_in.isoformat(),
+                 'check_out': check_out.isoformat(), 'nights': rates.shape[1],
+                 'nightly_rates': rates[i].tolist(), 'total': Decimal(f'{totals[i]:.2f}')}
+                for i, (type_id, name) in enumerate(zip(self._types, self._type_names))]
+
+    def quote(self, type_id, check_in, check_out):
+        self.ensure_loaded()
+        if type_id not in self._type_index:
+            raise LookupError(f'Unknown room type {type_id}')
+        return self.quote_all(check_in, check_out)[self._type_index[type_id]]
+
+    def quote_room(self, room_id, check_in, check_out):
+        """
+        Quote for a specific room (its room type's rates); raises LookupError
+        for an unknown room, ValueError for bad dates.
+        """
+        self.ensure_loaded()
+        if room_id not in self._room_index:
+            # Possibly added since the last load
+            self.load()
+            if room_id not in self._room_index:
+                raise LookupError(f'Unknown room {room_id}')
+        type_pos = int(self._room_types[self._room_index[room_id]])
+        if type_pos < 0:
+            raise LookupError(f'Room {room_id} has no room type')
+        return dict(self.quote(self._types[type_pos], check_in, check_out), room_id=room_id)
+
+    def forecast(self, start, end):
+        """
+        Per room type and night: on-the-books occupancy, forecast and rate.
+        """
+        start, end = _to_date(start), _to_date(end)
+        if end <= start:
+            raise ValueError('end must be after start')
+        occupancy, forecast, rates = self._window(start, end)
+        return {
+            'dates': [date.fromordinal(o).isoformat() for o in range(start.toordinal(), end.toordinal())],
+            'types': [{'type_id': type_id, 'name': name,
+                       'occupancy': np.round(occupancy[i], 3).tolist(),
+                       'forecast': np.round(forecast[i], 3).tolist(),
+                       'rates': rates[i].tolist()}
+                      for i, (type_id, name) in enumerate(zip(self._types, self._type_names))],
+        }
+
+    # -------------------------------------------------
+    # Incremental updates
+    # -------------------------------------------------
+    def add_booking(self, booking_id, room_id, check_in, check_out):
+        with self._lock:
+            if self._loaded_at is None or room_id not in self._room_index:
+                return
+            row = self._room_index[room_id]
+            start = min(max(_to_date(check_in).toordinal() - self._base, 0), self._n_days)
+            end = min(max(_to_date(check_out).toordinal() - self._base, 0), self._n_days)
+            self._occupied[row, start:end] = True
+            self._bookings[booking_id] = (row, start, end)
+            # Lead time of a booking made today, for the pickup curve
+            type_pos = self._room_types[row]
+            lead = _to_date(check_in).toordinal() - self._base - self._today
+            if type_pos >= 0 and 0 <= lead < self._lead_counts.shape[1]:
+                self._lead_counts[type_pos, lead] += 1
+            self._dirty = True
+
+    def release_booking(self, booking_id):
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            entry = self._bookings.pop(booking_id, None)
+            if entry is not None:
+                row, start, end = entry
+                self._occupied[row, start:end] = False
+                self._dirty = True
+
+
+pricing_engine = PricingEngine()
+
+
+@subscribe('booking_created')
+def _on_booking_created(booking_id, room_id, check_in, check_out, **_):
+    pricing_engine.add_booking(booking_id, int(room_id), check_in, check_out)
+
+
+@subscribe('booking_cancelled')
+def _on_booking_cancelled(booking_id, **_):
+    pricing_engine.release_booking(booking_id)
@@ -0,0 +1,236 @@
+# app/services/profiling.py
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+# Literal / placeholder normalization for SQL fingerprints
+_IN_LIST = re.compile(r"\bIN\s*\(\s*(?:%s|\?|:\w+)(?:\s*,\s*(?:%s|\?|:\w+))*\s*\)", re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement):
+    """
+    Normalizes a statement so every execution of the same query shape maps to
+    one key: whitespace collapsed, literals replaced by ?, IN lists of any
+    length (expanding bindparams) collapsed to IN (...).
+    """
+    sql = _IN_LIST.sub('IN (...)', statement)
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    return _SPACE.sub(' ', sql).strip()
+
+
+def _percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    rank = max(int(round(pct / 100.0 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+class _Series:
+    """
+    Rolling window of durations (ms) for one key, plus lifetime totals.
+    """
+
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total_ms = 0.0
+        self.rows = 0
+        self.queries = 0
+
+    def add(self, ms, rows=0, queries=0):
+        self.samples.append(ms)
+        self.count += 1
+        self.total_ms += ms
+        self.rows += max(rows, 0)
+        self.queries += queries
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_ms / self.count, 2) if self.count else 0.0,
+            'p50_ms': round(_percentile(ordered, 50), 2),
+            'p95_ms': round(_percentile(ordered, 95), 2),
+            'p99_ms': round(_percentile(ordered, 99), 2),
+            'max_ms': round(ordered[-1], 2) if ordered else 0.0,
+            'avg_rows': round(self.rows / self.count, 1) if self.count else 0.0,
+            'avg_queries': round(self.queries / self.count, 1) if self.count else 0.0,
+        }
+
+
+class Profiler:
+    """
+    Request / SQL / stored-procedure timings for /admin/perf.
+
+    Per request (Flask hooks): wall time, statement count and time in SQL.
+    Per statement (engine cursor events): duration and rowcount, grouped by
+    fingerprint. Stored procedures go through a raw DBAPI cursor that the
+    engine events never see, so call_procedure() times itself via
+    profiler.procedure(). A fingerprint repeated N_PLUS_ONE_THRESHOLD times
+    within one request is reported as a likely N+1.
+
+    Everything is kept in bounded rolling windows; nothing is written to
+    the database. Off unless PROFILING_ENABLED.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.enabled = False
+        self.window = 1000
+        self.n_plus_one_threshold = 10
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+            self._statements = {}
+            self._procedures = {}
+            self._n_plus_one = deque(maxlen=100)
+            self._since = time.time()
+
+    def _series(self, table, key):
+        series = table.get(key)
+        if series is None:
+            series = table[key] = _Series(self.window)
+        return series
+
+    # -------------------------------------------------
+    # Wiring
+    # -------------------------------------------------
+    def init_app(self, app, engines):
+        self.enabled = app.config.get('PROFILING_ENABLED', False)
+        self.window = app.config.get('PROFILING_WINDOW', 1000)
+        self.n_plus_one_threshold = app.config.get('PROFILING_N_PLUS_ONE_THRESHOLD', 10)
+        if not self.enabled:
+            return
+        for engine in engines.values():
+            self.watch_engine(engine)
+        app.before_request(_before_request)
+        app.after_request(_after_request)
+        app.teardown_request(_teardown_request)
+
+    def watch_engine(self, engine):
+        """
+        Times every statement on `engine` (also used for engines created
+        after startup, e.g. the async pools' sync_engine).
+        """
+        if self.enabled and not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    # -------------------------------------------------
+    # Recording
+    # -------------------------------------------------
+    def record_statement(self, statement, ms, rows):
+        key = fingerprint(statement)
+        with self._lock:
+            self._series(self._statements, key).add(ms, rows)
+        if has_request_context() and 'perf' in g:
+            g.perf['queries'] += 1
+            g.perf['sql_ms'] += ms
+            g.perf['fingerprints'][key] += 1
+
+    @contextmanager
+    def procedure(self, name):
+        """
+        Times a stored procedure call (the block) under 'CALL name'.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self._series(self._procedures, name).add(ms)
+            if has_request_context() and 'perf' in g:
+                g.perf['queries'] += 1
+                g.perf['sql_ms'] += ms
+                g.perf['fingerprints'][f"CALL {name}"] += 1
+
+    def record_request(self, endpoint, ms, perf):
+        with self._lock:
+            self._series(self._endpoints, endpoint).add(ms, queries=perf['queries'])
+            for key, times in perf['fingerprints'].items():
+                if times >= self.n_plus_one_threshold:
+                    self._n_plus_one.append({
+                        'at': time.time(), 'endpoint': endpoint,
+                        'fingerprint': key, 'executions': times,
+                    })
+
+    def report(self):
+        """
+        Snapshot for /admin/perf: per-endpoint, per-fingerprint and
+        per-procedure percentiles, slowest p95 first.
+        """
+        def table(source, name):
+            rows = [dict(s.summary(), **{name: key}) for key, s in source.items()]
+            return sorted(rows, key=lambda r: r['p95_ms'], reverse=True)
+
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'since': self._since,
+                'window': self.window,
+                'n_plus_one_threshold': self.n_plus_one_threshold,
+                'endpoints': table(self._endpoints, 'endpoint'),
+                'statements': table(self._statements, 'fingerprint'),
+                'procedures': table(self._procedures, 'procedure'),
+                'n_plus_one': list(reversed(self._n_plus_one)),
+            }
+
+
+profiler = Profiler()
+
+
+# -------------------------------------------------
+# Engine events (statement timing)
+# -------------------------------------------------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('perf_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('perf_start')
+    if not starts:
+        return
+    ms = (time.perf_counter() - starts.pop()) * 1000
+    # Buffered cursors report the fetched row count; streamed ones report -1
+    profiler.record_statement(statement, ms, getattr(cursor, 'rowcount', 0) or 0)
+
+
+# -------------------------------------------------
+# Request hooks
+# -------------------------------------------------
+def _before_request():
+    g.perf = {'start': time.perf_counter(), 'queries': 0, 'sql_ms': 0.0, 'fingerprints': Counter()}
+
+
+def _after_request(response):
+    perf = g.get('perf')
+    if perf is not None:
+        total = (time.perf_counter() - perf['start']) * 1000
+        response.headers['Server-Timing'] = (
+            f"app;dur={total:.1f}, db;dur={perf['sql_ms']:.1f};desc=\"{perf['queries']} queries\""
+        )
+    return response
+
+
+def _teardown_request(exc=None):
+    perf = g.pop('perf', None)
+    if perf is None or request.endpoint in (None, 'static'):
+        return
+    ms = (time.perf_counter() - perf['start']) * 1000
+    profiler.record_request(request.endpoint, ms, perf)
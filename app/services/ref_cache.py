@@ -0,0 +1,176 @@
+# app/services/ref_cache.py
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from sqlalchemy import text
+from app import db
+from app.services.events import subscribe
+
+# Which cached datasets are built from which table
+TABLE_KEYS = {
+    'RoomTypes': ('rooms',),
+    'Rooms': ('rooms',),
+    'Services': ('services',),
+}
+
+_loaders = {}
+
+
+def reference(key):
+    """
+    Decorator: registers the loader for a cached reference dataset.
+    """
+    def register(loader):
+        _loaders[key] = loader
+        return loader
+    return register
+
+
+@reference('services')
+def _load_services():
+    return db.session.execute(text("SELECT * FROM Services ORDER BY service_id")).fetchall()
+
+
+@reference('rooms')
+def _load_rooms():
+    # No status column on purpose: status churns with every booking and is
+    # served live by the availability index / room grid
+    return db.session.execute(text("""
+        SELECT r.room_id, r.room_number, r.type_id, rt.name, rt.base_price
+        FROM Rooms r
+        JOIN RoomTypes rt ON r.type_id = rt.type_id
+        ORDER BY r.room_number
+    """)).fetchall()
+
+
+class _RedisVersions:
+    """
+    Shared backend: one version counter per dataset in Redis. Bumping it
+    makes every worker's local copy stale at once; the data itself stays
+    in each process. Needs the `redis` package.
+    """
+
+    def __init__(self, url, prefix='hotelease:ref:'):
+        import redis
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5)
+        self._prefix = prefix
+
+    def version(self, key):
+        return int(self._client.get(f'{self._prefix}{key}') or 0)
+
+    def versions(self, keys):
+        # One round trip for several counters
+        return [int(v or 0) for v in self._client.mget([f'{self._prefix}{key}' for key in keys])]
+
+    def bump(self, key):
+        self._client.incr(f'{self._prefix}{key}')
+
+
+class ReferenceCache:
+    """
+    Read-through cache for the small, rarely written lookup tables
+    (RoomTypes, Services, Rooms) that the forms render on every request.
+
+    In-process LRU of REF_CACHE_MAX_ENTRIES datasets, each valid for
+    REF_CACHE_TTL_SECONDS. Writes through the app invalidate explicitly:
+    room status changes drop 'rooms', and 'reference_changed' (published
+    by `flask reference-changed` after RoomTypes / Rooms / Services are
+    edited in MySQL) drops what the table feeds. With
+    REF_CACHE_BACKEND=redis the invalidation bumps a shared version and
+    reaches every worker; otherwise the TTL bounds how long other workers
+    serve the old rows.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()    # key -> (expires_at, version, rows)
+        self._hits = {}
+        self._misses = {}
+        self._shared = None
+        self._shared_url = None
+
+    def _backend(self):
+        url = current_app.config.get('REF_CACHE_REDIS_URL')
+        if current_app.config.get('REF_CACHE_BACKEND') != 'redis' or not url:
+            return None
+        if self._shared is None or self._shared_url != url:
+            self._shared, self._shared_url = _RedisVersions(url), url
+        return self._shared
+
+    def _shared_version(self, key):
+        backend = self._backend()
+        if backend is None:
+            return 0
+        try:
+            return backend.version(key)
+        except Exception:
+            # Shared backend down: treat as a miss rather than serve possibly stale rows
+            current_app.logger.warning('Reference cache backend unavailable', exc_info=True)
+            return None
+
+    def get(self, key):
+        """
+        Returns the cached rows for `key`, loading them on a miss.
+        """
+        now = time.monotonic()
+        version = self._shared_version(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now and version is not None and entry[1] == version:
+                self._entries.move_to_end(key)
+                self._hits[key] = self._hits.get(key, 0) + 1
+                return entry[2]
+            self._misses[key] = self._misses.get(key, 0) + 1
+
+        rows = _loaders[key]()
+        if version is None:
+            return rows
+        ttl = current_app.config.get('REF_CACHE_TTL_SECONDS', 600)
+        max_entries = current_app.config.get('REF_CACHE_MAX_ENTRIES', 64)
+        with self._lock:
+            self._entries[key] = (now + ttl, version, rows)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+        return rows
+
+    def invalidate(self, *keys):
+        """
+        Drops the given datasets (all of them if none are given) here and,
+        through the shared version, on every other worker.
+        """
+        keys = keys or tuple(_loaders)
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+        backend = self._backend()
+        if backend is not None:
+            for key in keys:
+                try:
+                    backend.bump(key)
+                except Exception:
+                    current_app.logger.warning('Could not publish invalidation of %s', key, exc_info=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                key: {'hits': self._hits.get(key, 0), 'misses': self._misses.get(key, 0),
+                      'cached': key in self._entries}
+                for key in sorted(_loaders)
+            }
+
+
+ref_cache = ReferenceCache()
+
+
+@subscribe('room_status_changed')
+def _on_room_status_changed(**_):
+    ref_cache.invalidate('rooms')
+
+
+@subscribe('reference_changed')
+def _on_reference_changed(table=None, **_):
+    # An unknown (or no) table drops everything
+    ref_cache.invalidate(*TABLE_KEYS.get(table, ()))
@@ -0,0 +1,173 @@
+# app/services/report_cache.py
+import asyncio
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import text
+from app import db
+from app.services.scheduler import run_once_in_background
+from app.services.db_routing import use_replica
+from app.services.async_db import async_db
+from app.services.response_cache import response_cache
+from app.services.archive import history_sql
+
+# The analytics queries, keyed by the template variable they feed.
+# {Bookings} / {ServiceOrders} read hot and archived rows (see services/archive.py)
+REPORT_QUERIES = {
+    # 1. RoomOccupancy over the full history (the view only sees the hot bookings)
+    'occupancy': """
+        SELECT r.room_number, COUNT(b.booking_id) AS total_bookings
+        FROM Rooms r
+        LEFT JOIN {Bookings} b ON r.room_id = b.room_id
+        GROUP BY r.room_number
+    """,
+
+    # 2. VIEW Usage: ShiftOverlap
+    'shift_buddies': "SELECT * FROM ShiftOverlap",
+
+    # 3. VIEW Usage: PackagePossibilities (top 5 just to show the Cross Join works)
+    'packages': "SELECT * FROM PackagePossibilities LIMIT 5",
+
+    # The VIP Guest Ranking (GetGuestLevel) is kept by services/guest_stats.py
+
+    # 4. Complex Query: High Value Services
+    'top_services': """
+        SELECT s.service_name, SUM(so.total_order_cost) AS total_revenue
+        FROM Services s
+        JOIN {ServiceOrders} so ON s.service_id = so.service_id
+        GROUP BY s.service_name
+        HAVING total_revenue > 1000
+    """,
+
+    # 5. Unused Room Types (Subquery)
+    'unused_rooms': """
+        SELECT name, base_price FROM RoomTypes
+        WHERE type_id NOT IN (
+            SELECT DISTINCT r.type_id FROM Rooms r
+            JOIN {Bookings} b ON r.room_id = b.room_id
+        )
+    """,
+
+    # 6. Group Concat (String Aggregation)
+    'service_summary': """
+        SELECT b.booking_id, g.full_name,
+        GROUP_CONCAT(s.service_name SEPARATOR ', ') AS services_ordered
+        FROM {Bookings} b
+        JOIN Guests g ON b.guest_id = g.guest_id
+        JOIN {ServiceOrders} so ON b.booking_id = so.booking_id
+        JOIN Services s ON so.service_id = s.service_id
+        GROUP BY b.booking_id
+    """,
+}
+
+
+def report_queries():
+    return {name: history_sql(sql) for name, sql in REPORT_QUERIES.items()}
+
+
+class ReportSnapshot:
+    """
+    Materialized result sets for /admin/reports.
+
+    The heavy queries run on a background thread (every REPORTS_REFRESH_SECONDS)
+    and the page is served from the last completed snapshot. A request only
+    waits for the queries when no snapshot exists yet; if the snapshot is
+    older than REPORTS_MAX_STALENESS it is served anyway and a refresh is
+    kicked off in the background.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self.results = None
+        self.refreshed_at = None        # wall clock, shown on the page
+        self.refresh_seconds = None     # how long the last refresh took
+        self._refreshed_mono = None
+
+    def refresh(self):
+        """
+        Runs every report query and swaps the new snapshot in atomically.
+        Concurrent calls collapse into one refresh.
+        """
+        if async_db.enabled:
+            # Same refresh, with the queries issued in parallel
+            return async_db.run(self.arefresh())
+        if not self._refreshing.acquire(blocking=False):
+            return False
+        try:
+            started = time.monotonic()
+            with use_replica():
+                results = {name: db.session.execute(text(sql)).fetchall()
+                           for name, sql in report_queries().items()}
+            self._store(results, started)
+            return True
+        finally:
+            self._refreshing.release()
+
+    async def arefresh(self):
+        """
+        refresh() for the async views: all six queries at once on the
+        async pool (replica when configured).
+        """
+        if not self._refreshing.acquire(blocking=False):
+            return False
+        try:
+            started = time.monotonic()
+            # history_sql() may inspect the schema (archive tables), so off the event loop
+            queries = await asyncio.to_thread(report_queries)
+            self._store(await async_db.gather(queries), started)
+            return True
+        finally:
+            self._refreshing.release()
+
+    def _store(self, results, started):
+        with self._lock:
+            self.results = results
+            self.refreshed_at = datetime.now()
+            self.refresh_seconds = time.monotonic() - started
+            self._refreshed_mono = time.monotonic()
+        response_cache.bump('reports')
+
+    def age(self):
+        if self._refreshed_mono is None:
+            return None
+        return time.monotonic() - self._refreshed_mono
+
+    def get(self):
+        """
+        Returns the current result sets, refreshing first only if there are none.
+        """
+        if self.results is None:
+            self.refresh()
+            if self.results is None:
+                # Another thread was mid-refresh; wait for it, then retry if it failed
+                with self._refreshing:
+                    pass
+                if self.results is None:
+                    self.refresh()
+        elif self.age() > current_app.config.get('REPORTS_MAX_STALENESS', 900):
+            self.refresh_async()
+        return self.results
+
+    async def aget(self):
+        """
+        get() for the async views; never blocks the event loop.
+        """
+        if self.results is None:
+            await self.arefresh()
+            while self.results is None and self._refreshing.locked():
+                await asyncio.sleep(0.05)
+            if self.results is None:
+                await self.arefresh()
+        elif self.age() > current_app.config.get('REPORTS_MAX_STALENESS', 900):
+            self.refresh_async()
+        return self.results
+
+    def refresh_async(self):
+        if not self._refreshing.locked():
+            run_once_in_background(current_app._get_current_object(), self.refresh)
+
+
+report_snapshot = ReportSnapshot()
@@ -0,0 +1,248 @@
+# app/services/reservations.py
+import queue
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+
+from flask import current_app, has_request_context, session
+from sqlalchemy import text, bindparam
+from app import db
+from app.services.availability import availability_index
+from app.services.events import publish
+from app.services.pricing import pricing_engine
+from app.services.scheduler import run_in_app_context
+
+INSERT_BOOKING = text("""
+    INSERT INTO Bookings (guest_id, room_id, check_in, check_out, total_amount)
+    VALUES (:g, :r, :cin, :cout, :amt)
+""")
+MARK_BOOKED = text("UPDATE Rooms SET status = 'booked' WHERE room_id IN :ids").bindparams(
+    bindparam('ids', expanding=True))
+
+# Message raised by the PreventDoubleBooking trigger (SIGNAL SQLSTATE '45000')
+TRIGGER_CONFLICT = 'Room is already booked'
+
+
+class _Pending:
+    """
+    One booking request travelling through the queue; `done` is set once
+    `result` holds its outcome.
+    """
+
+    def __init__(self, index, fields=None, errors=None):
+        self.index = index
+        self.fields = fields
+        self.result = {'index': index, 'status': 'invalid', 'errors': errors} if errors else None
+        self.user_id = None   # who asked, for the audit trail (the writer thread has no session)
+        self.done = threading.Event()
+        if errors:
+            self.done.set()
+
+    def finish(self, status, **extra):
+        self.result = {'index': self.index, 'status': status, **extra}
+        self.done.set()
+
+
+def parse_request(index, data):
+    """
+    Validates one booking request (form fields or a JSON object) and prices
+    it from the nightly rates. A total_amount / total_price sent by the
+    client is ignored.
+    """
+    errors = []
+    fields = {}
+    for key in ('guest_id', 'room_id'):
+        try:
+            fields[key] = int(data.get(key))
+        except (TypeError, ValueError):
+            errors.append(f"{key} must be an integer")
+    for key in ('check_in', 'check_out'):
+        try:
+            fields[key] = date.fromisoformat(str(data.get(key) or ''))
+        except ValueError:
+            errors.append(f"{key} must be a YYYY-MM-DD date")
+    if not errors and fields['check_out'] <= fields['check_in']:
+        errors.append("check_out must be after check_in")
+    if not errors and fields['check_in'] < date.today():
+        errors.append("check_in can't be in the past")
+    if not errors:
+        try:
+            quote = pricing_engine.quote_room(fields['room_id'], fields['check_in'], fields['check_out'])
+            fields['total_amount'] = Decimal(str(quote['total']))
+        except LookupError as e:
+            errors.append(str(e.args[0]))
+    if errors:
+        return _Pending(index, errors=errors)
+    return _Pending(index, fields)
+
+
+class ReservationEngine:
+    """
+    Booking write path shared by the booking form and the bulk JSON API.
+
+    Requests go through one in-process queue drained by a single writer
+    thread, so requests for the same room are applied strictly in arrival
+    order instead of racing on row locks. Each batch (up to
+    RESERVATION_BATCH_SIZE requests, gathered for at most
+    RESERVATION_BATCH_WAIT_MS) is:
+
+      1. pre-checked against the in-memory availability index and against
+         the requests already accepted earlier in the same batch;
+      2. inserted row by row under a SAVEPOINT, so a late PreventDoubleBooking
+         hit (a booking written by another worker) only rejects that row;
+      3. committed once, with a single UPDATE Rooms for the batch.
+
+    Every request gets a structured result: created (booking_id), conflict
+    (conflicting_booking_ids / reason) or invalid (errors). The trigger
+    stays the final guard across workers.
+
+    With BACKGROUND_JOBS off (CLI, scripts) batches run inline in the caller.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+
+    # -------------------------------------------------
+    # Public API
+    # -------------------------------------------------
+    def submit(self, data):
+        return self.submit_many([data])[0]
+
+    def submit_many(self, items):
+        """
+        Queues a list of booking requests and waits for their results,
+        returned in the same order.
+        """
+        app = current_app._get_current_object()
+        pending = [parse_request(i, data) for i, data in enumerate(items)]
+        if has_request_context():
+            for p in pending:
+                p.user_id = session.get('user_id')
+        valid = [p for p in pending if p.result is None]
+
+        if app.config.get('BACKGROUND_JOBS', True):
+            self._ensure_worker(app)
+            for p in valid:
+                self._queue.put(p)
+        else:
+            size = app.config['RESERVATION_BATCH_SIZE']
+            for i in range(0, len(valid), size):
+                self._process(valid[i:i + size])
+
+        timeout = app.config['RESERVATION_TIMEOUT_SECONDS']
+        deadline = time.monotonic() + timeout
+        for p in valid:
+            if not p.done.wait(max(deadline - time.monotonic(), 0)):
+                # Still queued: it may yet be written, so don't report it as failed
+                return [q.result or {'index': q.index, 'status': 'pending',
+                                     'reason': f'Not processed within {timeout}s'} for q in pending]
+        return [p.result for p in pending]
+
+    # -------------------------------------------------
+    # Writer thread
+    # -------------------------------------------------
+    def _ensure_worker(self, app):
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, args=(app,),
+                                                name='reservations', daemon=True)
+                self._worker.start()
+
+    def _run(self, app):
+        size = app.config['RESERVATION_BATCH_SIZE']
+        wait = app.config['RESERVATION_BATCH_WAIT_MS'] / 1000.0
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + wait
+            while len(batch) < size:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            run_in_app_context(app, self._process, batch)
+
+    # -------------------------------------------------
+    # One batch
+    # -------------------------------------------------
+    def _process(self, batch):
+        try:
+            created = self._write(batch)
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.exception('Reservation batch of %d failed', len(batch))
+            for p in batch:
+                if not p.done.is_set():
+                    p.finish('error', reason=str(e))
+            return
+
+        # 4. Let the in-memory services catch up (same events as the single-booking form)
+        for p in created:
+            f = p.fields
+            publish('booking_created', booking_id=p.result['booking_id'], guest_id=f['guest_id'],
+                    room_id=f['room_id'], check_in=f['check_in'].isoformat(),
+                    check_out=f['check_out'].isoformat(), total_amount=f['total_amount'], user_id=p.user_id)
+        for room_id in dict.fromkeys(p.fields['room_id'] for p in created):
+            publish('room_status_changed', room_id=room_id, status='booked')
+        # Release the callers only now, so their next read sees the new stays
+        for p in created:
+            p.done.set()
+
+    def _write(self, batch):
+        # 1. Pre-check against the index plus this batch's own accepted stays
+        held = {}   # room_id -> [(check_in, check_out)]
+        accepted = []
+        for p in batch:
+            f = p.fields
+            status, overlapping = availability_index.conflicts(f['room_id'], f['check_in'], f['check_out'])
+            if status is None:
+                p.finish('invalid', errors=[f"Room {f['room_id']} does not exist"])
+                continue
+            if status == 'maintenance':
+                p.finish('conflict', reason='Room is under maintenance', conflicting_booking_ids=[])
+                continue
+            if overlapping:
+                p.finish('conflict', reason='Room is already booked for those dates',
+                         conflicting_booking_ids=overlapping)
+                continue
+            if any(cin < f['check_out'] and f['check_in'] < cout for cin, cout in held.get(f['room_id'], ())):
+                p.finish('conflict', reason='Overlaps an earlier request for the same room',
+                         conflicting_booking_ids=[])
+                continue
+            held.setdefault(f['room_id'], []).append((f['check_in'], f['check_out']))
+            accepted.append(p)
+
+        # 2. Insert row by row; a trigger rejection only rolls back its savepoint
+        created = []
+        for p in accepted:
+            f = p.fields
+            try:
+                with db.session.begin_nested():
+                    result = db.session.execute(INSERT_BOOKING, {
+                        'g': f['guest_id'], 'r': f['room_id'], 'cin': f['check_in'],
+                        'cout': f['check_out'], 'amt': str(f['total_amount']),
+                    })
+                p.result = {'index': p.index, 'status': 'created', 'booking_id': result.lastrowid,
+                            'room_id': f['room_id'], 'check_in': f['check_in'].isoformat(),
+                            'check_out': f['check_out'].isoformat()}
+                created.append(p)
+            except Exception as e:
+                if TRIGGER_CONFLICT in str(e):
+                    # Written by another worker after our index was loaded
+                    availability_index.invalidate()
+                    p.finish('conflict', reason='Room is already booked for those dates',
+                             conflicting_booking_ids=[])
+                else:
+                    p.finish('invalid', errors=[str(getattr(e, 'orig', e))])
+
+        # 3. One room-status update and one COMMIT for the whole batch
+        if created:
+            db.session.execute(MARK_BOOKED, {'ids': sorted({p.fields['room_id'] for p in created})})
+        db.session.commit()
+        return created
+
+
+reservation_engine = ReservationEngine()
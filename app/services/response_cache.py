@@ -0,0 +1,255 @@
+# app/services/response_cache.py
+import hashlib
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, make_response, request, session
+from app.services.events import subscribe
+from app.services.ref_cache import _RedisVersions
+
+# Which cached responses each write event makes stale. 'employees' has no
+# write path in the app; it (and anything changed behind the app's back)
+# only expires with RESPONSE_CACHE_TTL_SECONDS
+EVENT_RESOURCES = {
+    'booking_created': ('rooms', 'reports'),
+    'booking_completed': ('rooms', 'reports'),
+    'booking_cancelled': ('rooms', 'reports'),
+    'room_status_changed': ('rooms',),
+    'service_ordered': ('reports',),
+    'payment_recorded': ('reports',),
+    'guest_created': ('guests', 'reports'),
+    # The LogGuestDeletion trigger writes an AuditLog row as well
+    'guest_deleted': ('guests', 'reports', 'audit'),
+    'reference_changed': ('rooms', 'reports'),
+}
+
+# Response headers that must not be replayed to another client
+_PRIVATE_HEADERS = {'set-cookie', 'content-length'}
+
+
+class ResponseCache:
+    """
+    Conditional GET and rendered-response caching for read-only views.
+
+    Each resource ('rooms', 'reports', 'guests', 'audit', 'employees') has
+    a version counter, bumped by the write events (EVENT_RESOURCES) and by
+    the audit / report writers. A response's ETag is a hash of the
+    endpoint, full URL, the user's role, the versions of the resources it
+    reads and the current RESPONSE_CACHE_TTL_SECONDS window. A matching
+    If-None-Match (or If-Modified-Since) gets a 304 and a known ETag gets
+    the stored body, so neither runs SQL or Jinja: a hit costs the
+    counter lookup.
+
+    Counters are per process (an ETag from another worker just misses);
+    with REF_CACHE_BACKEND=redis they are shared, read with one MGET, so a
+    write on any worker invalidates every worker's copies.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # etag -> (expires_at, headers, body)
+        self._versions = {}             # resource -> version (per-process counters)
+        self._modified = {}             # resource -> (version, first seen at) for Last-Modified
+        self._epoch = os.urandom(4).hex()
+        self._started = time.time()
+        self._shared = None
+        self._logger = None
+        self.enabled = False
+        self.ttl = 300
+        self.max_entries = 256
+        self.counters = {'hits': 0, 'not_modified': 0, 'misses': 0, 'bypassed': 0, 'bumps': 0}
+
+    def init_app(self, app):
+        self._logger = app.logger
+        self.enabled = app.config.get('RESPONSE_CACHE_ENABLED', True)
+        self.ttl = app.config['RESPONSE_CACHE_TTL_SECONDS']
+        self.max_entries = app.config['RESPONSE_CACHE_MAX_ENTRIES']
+        url = app.config.get('REF_CACHE_REDIS_URL')
+        if app.config.get('REF_CACHE_BACKEND') == 'redis' and url:
+            self._shared = _RedisVersions(url, prefix='hotelease:resp:')
+            # Versions are the same on every worker, so are the ETags
+            self._epoch = 'shared'
+
+    # -------------------------------------------------
+    # Versions
+    # -------------------------------------------------
+    def bump(self, *resources):
+        """
+        Marks every cached response built from `resources` as stale.
+        Safe from any thread; needs no app context.
+        """
+        now = time.time()
+        with self._lock:
+            self.counters['bumps'] += 1
+            for resource in resources:
+                version = self._versions.get(resource, 0) + 1
+                self._versions[resource] = version
+                if self._shared is None:
+                    self._modified[resource] = (version, now)
+        if self._shared is not None:
+            for resource in resources:
+                try:
+                    self._shared.bump(resource)
+                except Exception:
+                    self._logger.warning('Could not publish version bump of %s', resource, exc_info=True)
+
+    def _current(self, resources):
+        """
+        (versions, last modified) for the resources, or None when the
+        shared counters can't be read (the view then runs uncached).
+        """
+        if self._shared is None:
+            with self._lock:
+                versions = [self._versions.get(r, 0) for r in resources]
+                modified = [self._modified.get(r, (0, self._started))[1] for r in resources]
+            return versions, max(modified, default=self._started)
+        try:
+            versions = self._shared.versions(resources)
+        except Exception:
+            self._logger.warning('Response cache backend unavailable', exc_info=True)
+            return None
+        now = time.time()
+        with self._lock:
+            modified = []
+            for resource, version in zip(resources, versions):
+                seen = self._modified.get(resource)
+                if seen is None or seen[0] != version:
+                    # Another worker bumped it; first seen here is the best we know
+                    seen = self._modified[resource] = (version, now)
+                modified.append(seen[1])
+        return versions, max(modified, default=self._started)
+
+    # -------------------------------------------------
+    # Request side
+    # -------------------------------------------------
+    def lookup(self, resources, vary=None):
+        """
+        Returns (response, key): a 304 or cached response to send as is,
+        or None and the key to store the freshly rendered one under (None:
+        don't cache this request). `vary` is a callable whose value goes
+        into the ETag, for pages that embed state the versions don't cover.
+        """
+        # Pending flash messages belong to this user's next page only
+        if not self.enabled or request.method not in ('GET', 'HEAD') or '_flashes' in session:
+            self._count('bypassed')
+            return None, None
+        current = self._current(resources)
+        if current is None:
+            self._count('bypassed')
+            return None, None
+        versions, modified = current
+
+        now = time.time()
+        window = int(now // self.ttl) if self.ttl else 0
+        raw = '|'.join([self._epoch, request.endpoint or '', request.full_path, str(session.get('role')),
+                        str(window), vary() if vary else ''] + [f'{r}={v}' for r, v in zip(resources, versions)])
+        etag = hashlib.sha1(raw.encode()).hexdigest()[:24]
+        modified = max(modified, window * self.ttl)
+        # HTTP dates have whole seconds: a version from this very second
+        # could change again within it, so no Last-Modified until it's over
+        last_modified = modified if now - modified >= 1 else None
+        key = (etag, last_modified)
+
+        if request.if_none_match:
+            if request.if_none_match.contains_weak(etag):
+                return self._not_modified(key), key
+        elif last_modified is not None and request.if_modified_since is not None:
+            if int(last_modified) <= request.if_modified_since.timestamp():
+                return self._not_modified(key), key
+
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(etag)
+                self.counters['hits'] += 1
+            else:
+                entry = None
+                self.counters['misses'] += 1
+        if entry is None:
+            return None, key
+        return self._decorate(Response(entry[2], headers=entry[1]), key), key
+
+    def store(self, key, response):
+        """
+        Adds the validators to a freshly rendered response and keeps its
+        body for the next request with the same key.
+        """
+        if key is None or response.status_code != 200 or response.is_streamed or session.modified:
+            # Errors, streams and responses that touched the session aren't shared
+            return response
+        self._decorate(response, key)
+        headers = [(k, v) for k, v in response.headers.items() if k.lower() not in _PRIVATE_HEADERS]
+        entry = (time.time() + (self.ttl or 0), headers, response.get_data())
+        with self._lock:
+            self._entries[key[0]] = entry
+            self._entries.move_to_end(key[0])
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return response
+
+    def _not_modified(self, key):
+        self._count('not_modified')
+        return self._decorate(Response(status=304), key)
+
+    def _decorate(self, response, key):
+        etag, last_modified = key
+        response.set_etag(etag)
+        if last_modified is not None:
+            response.last_modified = last_modified
+        # Browsers may keep the copy but must revalidate it (cheap 304) every time
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
+
+    def _count(self, counter):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, cached=len(self._entries), versions=dict(self._versions))
+
+
+response_cache = ResponseCache()
+
+
+def cached_response(*resources, vary=None):
+    """
+    View decorator (sync or async): serves 304s / cached bodies while the
+    given resources are unchanged (and `vary()`, if given, returns the same
+    value). Goes right under @route, so a hit skips @read_only and the view
+    entirely.
+    """
+    def decorator(view):
+        if inspect.iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(*args, **kwargs):
+                cached, key = response_cache.lookup(resources, vary)
+                if cached is not None:
+                    return cached
+                return response_cache.store(key, make_response(await view(*args, **kwargs)))
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cached, key = response_cache.lookup(resources, vary)
+            if cached is not None:
+                return cached
+            return response_cache.store(key, make_response(view(*args, **kwargs)))
+        return wrapper
+    return decorator
+
+
+def _bumper(event, resources):
+    def bump(**_):
+        response_cache.bump(*resources)
+    bump.__qualname__ = f'bump_on_{event}'
+    return bump
+
+
+for _event, _resources in EVENT_RESOURCES.items():
+    subscribe(_event)(_bumper(_event, _resources))
@@ -0,0 +1,171 @@
+# app/services/revenue.py
+import threading
+import time
+from array import array
+from datetime import date, timedelta
+
+from flask import current_app
+from sqlalchemy import text
+from app import db
+from app.services.events import subscribe
+from app.services.archive import history_sql
+
+SOURCES = ('bookings', 'services', 'payments')
+GRANULARITIES = ('day', 'week', 'month')
+
+
+def _to_date(value):
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _bucket_start(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())   # ISO week, Monday
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(key, granularity):
+    if granularity == 'month':
+        return (key.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return key + timedelta(days=7 if granularity == 'week' else 1)
+
+
+class RevenueSeries:
+    """
+    Daily revenue buckets, one contiguous array('d') per source indexed by
+    day offset from the first day with data.
+
+    Room revenue is dated by check_in, service orders by their booking's
+    check_in (ServiceOrders has no date of its own) and payments by
+    payment_date. Built with three GROUP BY queries, then kept current from
+    the write events and rebuilt every REVENUE_RECONCILE_SECONDS. Week and
+    month totals are slice sums over the arrays.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._base = None                      # ordinal of index 0
+        self._data = {source: array('d') for source in SOURCES}
+        self._loaded_at = None
+
+    def load(self):
+        queries = {
+            'bookings': "SELECT b.check_in AS day, SUM(b.total_amount) AS amount FROM {Bookings} b GROUP BY b.check_in",
+            'services': """
+                SELECT b.check_in AS day, SUM(so.total_order_cost) AS amount
+                FROM {ServiceOrders} so
+                JOIN {Bookings} b ON so.booking_id = b.booking_id
+                GROUP BY b.check_in
+            """,
+            'payments': """
+                SELECT DATE(p.payment_date) AS day, SUM(p.amount_paid) AS amount
+                FROM {Payments} p
+                GROUP BY DATE(p.payment_date)
+            """,
+        }
+        # Revenue history includes archived bookings (services/archive.py)
+        rows = {source: [(_to_date(r.day).toordinal(), float(r.amount or 0))
+                         for r in db.session.execute(text(history_sql(queries[source]))) if r.day is not None]
+                for source in SOURCES}
+        ordinals = [o for source_rows in rows.values() for o, _ in source_rows]
+        base = min(ordinals, default=date.today().toordinal())
+        size = max(ordinals, default=base) - base + 1
+
+        data = {}
+        for source in SOURCES:
+            values = array('d', bytes(8 * size))
+            for ordinal, amount in rows[source]:
+                values[ordinal - base] += amount
+            data[source] = values
+
+        with self._lock:
+            self._base, self._data = base, data
+            self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self):
+        max_age = current_app.config.get('REVENUE_RECONCILE_SECONDS', 3600)
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > max_age:
+            self.load()
+
+    def add(self, source, day, amount):
+        if day is None or amount is None:
+            return
+        ordinal = _to_date(day).toordinal()
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            if ordinal < self._base:
+                # Back-dated row before the first known day: grow to the left
+                pad = self._base - ordinal
+                for name in SOURCES:
+                    self._data[name] = array('d', bytes(8 * pad)) + self._data[name]
+                self._base = ordinal
+            offset = ordinal - self._base
+            values = self._data[source]
+            if offset >= len(values):
+                grow = bytes(8 * (offset - len(values) + 1))
+                for name in SOURCES:
+                    self._data[name].frombytes(grow)
+            values[offset] += float(amount)
+
+    def series(self, start, end, granularity='day'):
+        """
+        Downsamples the daily buckets in [start, end] (inclusive) to
+        day/week/month totals. Returns (labels, {source: [values]}).
+        Every bucket in range is present, including empty ones.
+        """
+        self.ensure_loaded()
+        bounds = []
+        key = _bucket_start(start, granularity)
+        while key <= end:
+            nxt = _next_bucket(key, granularity)
+            # Clip the first/last bucket to the requested range
+            bounds.append((key, max(key, start), min(nxt - timedelta(days=1), end)))
+            key = nxt
+
+        values = {}
+        with self._lock:
+            if granularity == 'day':
+                # One bucket per day: copy the slice, zero-padded outside the data
+                lo, hi = start.toordinal() - self._base, end.toordinal() - self._base + 1
+                for source in SOURCES:
+                    data = self._data[source]
+                    inside = data[max(lo, 0):max(min(hi, len(data)), 0)]
+                    left = min(max(-lo, 0), hi - lo)
+                    values[source] = [0.0] * left + [round(v, 2) for v in inside]
+                    values[source] += [0.0] * (hi - lo - len(values[source]))
+            else:
+                for source in SOURCES:
+                    data = self._data[source]
+                    values[source] = [
+                        round(sum(data[max(lo.toordinal() - self._base, 0):max(hi.toordinal() - self._base + 1, 0)], 0.0), 2)
+                        for _, lo, hi in bounds
+                    ]
+
+        if granularity == 'month':
+            labels = [k.strftime('%Y-%m') for k, _, _ in bounds]
+        else:
+            labels = [k.isoformat() for k, _, _ in bounds]
+        return labels, values
+
+
+revenue_series = RevenueSeries()
+
+
+@subscribe('booking_created')
+def _on_booking_created(check_in, total_amount=None, **_):
+    revenue_series.add('bookings', check_in, total_amount)
+
+
+@subscribe('service_ordered')
+def _on_service_ordered(check_in=None, total_order_cost=None, **_):
+    revenue_series.add('services', check_in, total_order_cost)
+
+
+@subscribe('payment_recorded')
+def _on_payment_recorded(payment_date=None, amount_paid=None, **_):
+    revenue_series.add('payments', payment_date or date.today(), amount_paid)
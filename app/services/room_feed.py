@@ -0,0 +1,244 @@
+# app/services/room_feed.py
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+from app.services.events import subscribe
+
+# Deltas kept for clients that reconnect with Last-Event-ID
+HISTORY_SIZE = 500
+# Per-client backlog; a client this far behind is told to reload instead
+CLIENT_BUFFER = 256
+
+# Shared feed (REF_CACHE_BACKEND=redis): one sequence and one channel for all workers
+SEQ_KEY = 'hotelease:feed:seq'
+CHANNEL = 'hotelease:feed'
+# Numbering and sending in one step, so deltas go out in sequence order
+_PUBLISH_SCRIPT = """
+local seq = redis.call('INCR', KEYS[1])
+redis.call('PUBLISH', KEYS[2], seq .. ' ' .. ARGV[1])
+return seq
+"""
+
+
+class _Client:
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=CLIENT_BUFFER)
+        self.overflowed = False
+
+
+class _RedisFeed:
+    """
+    Shared backend: deltas are numbered by a Redis counter and fanned out
+    over pub/sub, so every worker sees every delta under the same sequence.
+    Needs the optional `redis` package.
+    """
+
+    def __init__(self, url):
+        import redis
+        # No socket timeout: the subscriber blocks until the next delta
+        self._client = redis.Redis.from_url(url, health_check_interval=30)
+        self._publish = self._client.register_script(_PUBLISH_SCRIPT)
+
+    def current(self):
+        return int(self._client.get(SEQ_KEY) or 0)
+
+    def publish(self, room_id, status):
+        return int(self._publish(keys=[SEQ_KEY, CHANNEL],
+                                 args=[json.dumps({'room_id': room_id, 'status': status})]))
+
+    def listen(self):
+        """
+        Yields (seq, room_id, status) until the connection drops.
+        """
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(CHANNEL)
+        try:
+            for message in pubsub.listen():
+                seq, _, payload = message['data'].decode().partition(' ')
+                delta = json.loads(payload)
+                yield int(seq), delta['room_id'], delta['status']
+        finally:
+            pubsub.close()
+
+
+class RoomFeed:
+    """
+    Fan-out of room status deltas to every open room-grid stream (SSE).
+
+    Fed by the 'room_status_changed' event, so every write path that already
+    publishes it (bookings, checkout, cancellation, maintenance) shows up on
+    the grid without a reload. Each delta gets a sequence number; the grid
+    page is rendered with the current sequence and the stream replays
+    anything newer from a short history, so no delta falls between the
+    snapshot and the subscription.
+
+    Every open stream holds a server thread, so at most
+    ROOM_FEED_MAX_CLIENTS streams are served per process; beyond that the
+    page falls back to its periodic snapshot reload.
+
+    Deltas are in-process unless REF_CACHE_BACKEND=redis: then they are
+    numbered and delivered through Redis, and every worker streams every
+    write under the same sequence. Without it, run a single worker process
+    (threads are fine), or each worker's streams only see the writes that
+    worker handled.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._started = time.time()
+        self._history = deque(maxlen=HISTORY_SIZE)
+        self._clients = set()
+        self._shared = None
+        self._listener = None
+        self._logger = None
+        self.max_clients = 16
+
+    def init_app(self, app):
+        self._logger = app.logger
+        self.max_clients = app.config['ROOM_FEED_MAX_CLIENTS']
+        url = app.config.get('REF_CACHE_REDIS_URL')
+        if (app.config.get('REF_CACHE_BACKEND') == 'redis' and url
+                and app.config.get('BACKGROUND_JOBS', True) and self._listener is None):
+            self._shared = _RedisFeed(url)
+            try:
+                self._seq = self._shared.current()
+            except Exception:
+                self._logger.warning('Room feed backend unavailable', exc_info=True)
+            self._listener = threading.Thread(target=self._listen, name='room-feed', daemon=True)
+            self._listener.start()
+
+    @property
+    def seq(self):
+        return self._seq
+
+    @property
+    def epoch(self):
+        """
+        Which feed `seq` belongs to: a sequence number is only valid on the
+        process (and run) that issued it.
+        """
+        if self._shared is not None:
+            return 'shared'
+        return f'{os.getpid()}:{self._started}'
+
+    def publish(self, room_id, status):
+        if self._shared is None:
+            with self._lock:
+                return self._deliver(self._seq + 1, room_id, status)
+        try:
+            # Comes back to every worker, this one included, through _listen()
+            self._shared.publish(room_id, status)
+        except Exception:
+            # The grid's periodic snapshot reload picks the change up
+            self._logger.warning('Could not publish room %s status', room_id, exc_info=True)
+        return None
+
+    def _deliver(self, seq, room_id, status):
+        # Caller holds self._lock
+        self._seq = max(self._seq, seq)
+        delta = {'seq': seq, 'room_id': room_id, 'status': status}
+        self._history.append(delta)
+        for client in self._clients:
+            try:
+                client.queue.put_nowait(delta)
+            except queue.Full:
+                client.overflowed = True
+        return delta
+
+    def _listen(self):
+        while True:
+            try:
+                for seq, room_id, status in self._shared.listen():
+                    with self._lock:
+                        self._deliver(seq, room_id, status)
+            except Exception:
+                self._logger.warning('Room feed subscription lost, reconnecting', exc_info=True)
+            # Deltas sent while disconnected are gone: every open grid reloads
+            with self._lock:
+                self._history.clear()
+                for client in self._clients:
+                    client.overflowed = True
+                    try:
+                        client.queue.put_nowait(None)
+                    except queue.Full:
+                        pass
+            time.sleep(1)
+            try:
+                with self._lock:
+                    self._seq = max(self._seq, self._shared.current())
+            except Exception:
+                pass
+
+    def subscribe(self, since=None):
+        """
+        Registers a client. Returns (client, backlog) where backlog holds the
+        deltas after `since`, or None when `since` is too old to replay
+        (the client must reload the snapshot).
+        """
+        client = _Client()
+        with self._lock:
+            self._clients.add(client)
+            if since is None or since == self._seq:
+                return client, []
+            if since > self._seq:
+                # Sequence from before a restart: nothing we can replay
+                return client, None
+            if not self._history or since < self._history[0]['seq'] - 1:
+                return client, None
+            return client, [d for d in self._history if d['seq'] > since]
+
+    def unsubscribe(self, client):
+        with self._lock:
+            self._clients.discard(client)
+
+    @property
+    def client_count(self):
+        return len(self._clients)
+
+    @property
+    def full(self):
+        return len(self._clients) >= self.max_clients
+
+    def stream(self, since=None, heartbeat=15):
+        """
+        Generator of Server-Sent Event frames for one client.
+        A comment line every `heartbeat` seconds keeps proxies from closing
+        an idle connection.
+        """
+        client, backlog = self.subscribe(since)
+        try:
+            yield "retry: 3000\n\n"
+            if backlog is None:
+                yield _frame('reset', {'seq': self._seq})
+                return
+            for delta in backlog:
+                yield _frame('room', delta)
+            while True:
+                try:
+                    delta = client.queue.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if client.overflowed:
+                    yield _frame('reset', {'seq': self._seq})
+                    return
+                yield _frame('room', delta)
+        finally:
+            self.unsubscribe(client)
+
+
+def _frame(event, data):
+    return f"id: {data['seq']}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+room_feed = RoomFeed()
+
+
+@subscribe('room_status_changed')
+def _on_room_status_changed(room_id, status, **_):
+    room_feed.publish(room_id, status)
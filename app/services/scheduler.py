@@ -0,0 +1,50 @@
+# app/services/scheduler.py
+import threading
+
+from app import db
+
+_jobs = {}
+
+
+def run_in_app_context(app, func, *args):
+    """
+    Runs func inside an app context and always releases the scoped session,
+    so a background thread never holds a pooled connection between runs.
+    """
+    with app.app_context():
+        try:
+            return func(*args)
+        except Exception:
+            app.logger.exception('Background job %s failed', getattr(func, '__qualname__', func))
+        finally:
+            db.session.remove()
+
+
+def start_periodic(app, name, interval, func):
+    """
+    Starts a daemon thread calling func() every `interval` seconds.
+    The first run happens after one interval, so short-lived processes
+    (flask CLI commands) exit before doing any work.
+    Does nothing when BACKGROUND_JOBS is off or the job is already running.
+    """
+    if not app.config.get('BACKGROUND_JOBS', True) or name in _jobs:
+        return None
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(interval):
+            run_in_app_context(app, func)
+
+    thread = threading.Thread(target=loop, name=f'job:{name}', daemon=True)
+    _jobs[name] = stop
+    thread.start()
+    return stop
+
+
+def run_once_in_background(app, func, *args):
+    """
+    Fire-and-forget: runs func(*args) on a daemon thread with an app context.
+    """
+    thread = threading.Thread(target=run_in_app_context, args=(app, func) + args, daemon=True)
+    thread.start()
+    return thread
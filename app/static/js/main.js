@@ -36,18 +36,17 @@ document.addEventListener("DOMContentLoaded", function() {
     const chartCanvas = document.getElementById('revenueChart');
     
     if (chartCanvas) {
-        // 1. Read the data from the HTML tag
-        const rawRevenue = chartCanvas.getAttribute('data-revenue');
-        const realRevenue = parseFloat(rawRevenue) || 0;
+        // Series comes from /api/revenue (pre-aggregated daily buckets)
+        const rangeSelect = document.getElementById('revenueRange');
 
         const ctx = chartCanvas.getContext('2d');
-        new Chart(ctx, {
+        const revenueChart = new Chart(ctx, {
             type: 'line',
             data: {
-                labels: ['Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'],
+                labels: [],
                 datasets: [{
                     label: 'Revenue ($)',
-                    data: [12000, 19000, 15000, 25000, 22000, realRevenue], 
+                    data: [],
                     borderColor: '#3b82f6',
                     backgroundColor: 'rgba(59, 130, 246, 0.1)',
                     borderWidth: 2,
@@ -76,5 +75,178 @@ document.addEventListener("DOMContentLoaded", function() {
                 }
             }
         });
+
+        function isoDate(d) {
+            return d.getFullYear() + '-' + String(d.getMonth() + 1).padStart(2, '0') + '-' + String(d.getDate()).padStart(2, '0');
+        }
+
+        function loadRevenue() {
+            const today = new Date();
+            let from, to;
+            if (rangeSelect && rangeSelect.value === 'this_year') {
+                from = new Date(today.getFullYear(), 0, 1);
+                to = new Date(today.getFullYear(), 11, 31);
+            } else if (rangeSelect && rangeSelect.value === 'last_year') {
+                from = new Date(today.getFullYear() - 1, 0, 1);
+                to = new Date(today.getFullYear() - 1, 11, 31);
+            } else {
+                from = new Date(today.getFullYear(), today.getMonth() - 5, 1);
+                to = today;
+            }
+
+            const params = new URLSearchParams({ from: isoDate(from), to: isoDate(to), granularity: 'month' });
+            fetch(chartCanvas.dataset.url + '?' + params)
+                .then(response => response.json())
+                .then(series => {
+                    revenueChart.data.labels = series.labels;
+                    revenueChart.data.datasets[0].data = series.revenue;
+                    revenueChart.update();
+                });
+        }
+
+        if (rangeSelect) {
+            rangeSelect.addEventListener('change', loadRevenue);
+        }
+        loadRevenue();
     }
+
+    // 5. "Load more" buttons on paginated tables (keyset JSON endpoints)
+    // The link keeps a plain ?cursor= href as a no-JS fallback.
+    document.querySelectorAll('[data-load-more]').forEach(button => {
+        button.addEventListener('click', function(event) {
+            event.preventDefault();
+            const tbody = document.querySelector(button.dataset.target);
+            const template = document.querySelector(button.dataset.template);
+            button.classList.add('disabled');
+
+            fetch(button.dataset.nextUrl)
+                .then(response => response.json())
+                .then(page => {
+                    page.items.forEach(item => {
+                        const row = template.content.cloneNode(true);
+                        row.querySelectorAll('[data-field]').forEach(el => {
+                            const value = item[el.dataset.field];
+                            el.textContent = value === null || value === undefined ? '' : value;
+                        });
+                        row.querySelectorAll('[data-bind-action]').forEach(el => {
+                            el.action = item[el.dataset.bindAction];
+                        });
+                        tbody.appendChild(row);
+                    });
+
+                    if (page.next_url) {
+                        button.dataset.nextUrl = page.next_url;
+                        button.classList.remove('disabled');
+                    } else {
+                        button.remove();
+                    }
+                })
+                .catch(() => button.classList.remove('disabled'));
+        });
+    });
+
+    // 6. Live Room Grid (Server-Sent Events)
+    // The page is the snapshot; the stream only carries status deltas after it.
+    const roomGrid = document.getElementById('roomGrid');
+    if (roomGrid && window.EventSource) {
+        const statusStyles = {
+            available: ['border-success', '<span class="badge bg-success">Available</span>'],
+            booked: ['border-danger', '<span class="badge bg-danger">Occupied</span>'],
+            maintenance: ['border-warning', '<span class="badge bg-warning text-dark">Maintenance</span>']
+        };
+        const feed = new EventSource(roomGrid.dataset.roomFeed);
+
+        feed.addEventListener('room', event => {
+            const delta = JSON.parse(event.data);
+            const card = roomGrid.querySelector(`[data-room-id="${delta.room_id}"]`);
+            if (!card) {
+                return;   // room added since the snapshot
+            }
+            const [border, badge] = statusStyles[delta.status] || statusStyles.maintenance;
+            card.classList.remove('border-success', 'border-danger', 'border-warning');
+            card.classList.add(border);
+            card.querySelector('[data-room-badge]').innerHTML = badge;
+        });
+
+        // Too far behind to replay (server restart, slow client): take a new snapshot
+        feed.addEventListener('reset', () => {
+            feed.close();
+            window.location.reload();
+        });
+
+        const resync = parseInt(roomGrid.dataset.resyncSeconds, 10);
+        if (resync > 0) {
+            setTimeout(() => window.location.reload(), resync * 1000);
+        }
+    }
+
+    // 7. Lazy guest picker (booking form)
+    // Pages through /api/guests/search with continuation tokens (X-Next-Cursor)
+    // instead of rendering every guest into a <select>.
+    document.querySelectorAll('[data-guest-picker]').forEach(picker => {
+        const input = picker.querySelector('[data-picker-input]');
+        const hidden = picker.querySelector('[data-picker-value]');
+        const list = picker.querySelector('[data-picker-results]');
+        let timer = null;
+        let request = 0;
+
+        function addItem(guest) {
+            const item = document.createElement('button');
+            item.type = 'button';
+            item.className = 'list-group-item list-group-item-action small';
+            item.textContent = guest.text;
+            item.addEventListener('click', () => {
+                hidden.value = guest.id;
+                input.value = guest.text;
+                input.setCustomValidity('');
+                list.classList.add('d-none');
+            });
+            list.appendChild(item);
+        }
+
+        function load(query, cursor) {
+            const current = ++request;
+            const params = new URLSearchParams({q: query, limit: 20, cursor: cursor || ''});
+            fetch(`${picker.dataset.url}?${params}`)
+                .then(response => response.json().then(guests => [guests, response.headers.get('X-Next-Cursor')]))
+                .then(([guests, nextCursor]) => {
+                    if (current !== request) return;   // a newer keystroke won
+                    if (!cursor) list.innerHTML = '';
+                    const more = list.querySelector('[data-picker-more]');
+                    if (more) more.remove();
+                    guests.forEach(addItem);
+                    if (!list.children.length) {
+                        list.innerHTML = '<div class="list-group-item small text-muted">No matching guests</div>';
+                    }
+                    if (nextCursor) {
+                        const button = document.createElement('button');
+                        button.type = 'button';
+                        button.className = 'list-group-item list-group-item-action small text-primary text-center';
+                        button.dataset.pickerMore = '';
+                        button.textContent = 'Load more...';
+                        button.addEventListener('click', () => load(query, nextCursor));
+                        list.appendChild(button);
+                    }
+                    list.classList.remove('d-none');
+                });
+        }
+
+        input.addEventListener('input', () => {
+            hidden.value = '';   // typed text is not a selection
+            clearTimeout(timer);
+            const query = input.value.trim();
+            // Hidden inputs are never validated: block submit on the visible one
+            // until a guest is picked (`required` covers the empty field)
+            input.setCustomValidity(query ? 'Pick a guest from the list' : '');
+            if (query.length < 2) {
+                list.classList.add('d-none');
+                return;
+            }
+            timer = setTimeout(() => load(query, null), 200);
+        });
+
+        document.addEventListener('click', event => {
+            if (!picker.contains(event.target)) list.classList.add('d-none');
+        });
+    });
 });
\ No newline at end of file
@@ -0,0 +1,15 @@
+# asgi.py
+# Production entry point:  uvicorn asgi:app --host 0.0.0.0 --port 8000 --workers 4
+import os
+
+# Must be set before config.py is imported
+os.environ.setdefault('ASYNC_VIEWS', '1')
+
+from a2wsgi import WSGIMiddleware
+from app import create_app
+
+flask_app = create_app()
+
+# Sync views run on a thread pool; the async views (dashboard, reports,
+# room grid, guest search) hand their queries to the shared async loop
+app = WSGIMiddleware(flask_app, workers=flask_app.config['ASGI_THREADS'])
@@ -0,0 +1,10 @@
+"""
+HotelEase benchmarks: synthetic data generator, micro-benchmarks over the
+Flask test client and a concurrent booking load driver.
+
+    python -m benchmarks generate --db sqlite:///bench.db --scale small
+    python -m benchmarks micro    --db sqlite:///bench.db -o results.json
+    python -m benchmarks load     --db sqlite:///bench.db --threads 8 -o load.json
+
+Every run writes machine-readable JSON so results can be diffed over time.
+"""
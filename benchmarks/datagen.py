@@ -0,0 +1,278 @@
+# benchmarks/datagen.py
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import text
+
+# name -> (rooms, guests, years of history, audit entries per booking)
+SCALES = {
+    'tiny': (20, 500, 1, 0.2),
+    'small': (60, 5000, 1, 0.5),
+    'medium': (200, 50000, 3, 0.5),
+    'large': (500, 500000, 5, 0.5),
+}
+
+ROOM_TYPES = [
+    (1, 'Single', 80, 1), (2, 'Double', 120, 2), (3, 'Deluxe', 180, 2),
+    (4, 'Family Suite', 260, 4), (5, 'Presidential', 650, 4),
+]
+# Share of the rooms per type
+TYPE_WEIGHTS = [0.3, 0.35, 0.2, 0.12, 0.03]
+
+SERVICES = [
+    (1, 'Breakfast Buffet', 15), (2, 'Room Service Dinner', 35), (3, 'Laundry', 12),
+    (4, 'Spa Massage', 60), (5, 'Airport Pickup', 40), (6, 'Minibar', 20),
+    (7, 'City Tour', 55), (8, 'Late Checkout', 30), (9, 'Gym Day Pass', 10),
+    (10, 'Conference Room (hour)', 45), (11, 'Extra Bed', 25), (12, 'Champagne', 90),
+]
+
+FIRST_NAMES = ['Ali', 'Sara', 'Ahmed', 'Fatima', 'John', 'Maria', 'Omar', 'Aisha', 'David', 'Zara', 'Hassan',
+               'Emma', 'Bilal', 'Noor', 'James', 'Hina', 'Usman', 'Laura', 'Kamran', 'Sofia', 'Imran', 'Mina',
+               'Daniel', 'Ayesha', 'Farhan', 'Olivia', 'Tariq', 'Sana', 'Michael', 'Amna']
+LAST_NAMES = ['Khan', 'Smith', 'Ahmed', 'Malik', 'Johnson', 'Hussain', 'Brown', 'Qureshi', 'Garcia', 'Sheikh',
+              'Miller', 'Raza', 'Davis', 'Chaudhry', 'Wilson', 'Butt', 'Taylor', 'Iqbal', 'Anderson', 'Siddiqui']
+NATIONALITIES = ['Pakistani', 'British', 'American', 'Emirati', 'Chinese', 'German', 'Turkish', 'Saudi']
+ROLES = [('Receptionist', 45000), ('Housekeeping', 30000), ('Maintenance', 35000),
+         ('Chef', 55000), ('Manager', 90000), ('Security', 32000)]
+SHIFTS = ['Morning', 'Evening', 'Night']
+
+BATCH = 5000
+
+
+class Generator:
+    """
+    Deterministic synthetic hotel: the same seed and scale always produce
+    the same rows (explicit primary keys), so runs are comparable.
+
+    Bookings are laid out per room as back-to-back stays with random gaps,
+    so they never overlap (PreventDoubleBooking stays quiet on MySQL).
+    History ends `future_days` after `today`, giving some active bookings.
+    """
+
+    def __init__(self, scale='small', seed=42, today=None, future_days=60):
+        self.rooms, self.guests, self.years, self.audit_ratio = SCALES[scale]
+        self.seed = seed
+        self.today = today or date.today()
+        self.future_days = future_days
+        self.rng = random.Random(seed)
+
+    # -------------------------------------------------
+    # Row producers
+    # -------------------------------------------------
+    def room_types(self):
+        return [{'type_id': t, 'name': n, 'base_price': p, 'max_persons': m} for t, n, p, m in ROOM_TYPES]
+
+    def services(self):
+        return [{'service_id': s, 'service_name': n, 'price': p} for s, n, p in SERVICES]
+
+    def room_rows(self):
+        rows = []
+        per_floor = 20
+        for i in range(self.rooms):
+            type_id = self.rng.choices([t[0] for t in ROOM_TYPES], TYPE_WEIGHTS)[0]
+            rows.append({'room_id': i + 1, 'room_number': str((i // per_floor + 1) * 100 + i % per_floor + 1),
+                         'type_id': type_id, 'status': 'available'})
+        return rows
+
+    def employee_rows(self):
+        rows = []
+        for i in range(max(self.rooms // 4, 6)):
+            role, salary = ROLES[i % len(ROLES)]
+            rows.append({
+                'emp_id': i + 1,
+                'name': f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}",
+                'role': role,
+                'shift_time': SHIFTS[i % len(SHIFTS)],
+                'salary': salary + self.rng.randint(0, 10) * 1000,
+                'hire_date': self.today - timedelta(days=self.rng.randint(30, 365 * 8)),
+            })
+        return rows
+
+    def guest_rows(self):
+        for i in range(self.guests):
+            first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            yield {
+                'guest_id': i + 1,
+                'full_name': f"{first} {last}",
+                # 7919 is coprime with 10**9, so the numbers are unique
+                'phone': f"03{(i * 7919 + self.seed) % 10 ** 9:09d}",
+                'email': f"{first.lower()}.{last.lower()}{i}@example.com",
+                'address': f"{self.rng.randint(1, 999)} Street {self.rng.randint(1, 60)}",
+                'nationality': self.rng.choice(NATIONALITIES),
+            }
+
+    def booking_rows(self, rooms):
+        """
+        Yields (booking, [service orders], [payments], feedback-or-None).
+        """
+        prices = {t[0]: t[2] for t in ROOM_TYPES}
+        service_prices = {s[0]: s[2] for s in SERVICES}
+        start = self.today - timedelta(days=365 * self.years)
+        end = self.today + timedelta(days=self.future_days)
+        booking_id = order_id = payment_id = feedback_id = 0
+
+        for room in rooms:
+            day = start + timedelta(days=self.rng.randint(0, 5))
+            while day < end:
+                nights = self.rng.choices([1, 2, 3, 4, 5, 7, 10], [25, 25, 18, 12, 10, 7, 3])[0]
+                check_in, check_out = day, day + timedelta(days=nights)
+                day = check_out + timedelta(days=self.rng.choices([0, 1, 2, 3, 5, 8], [30, 25, 18, 12, 10, 5])[0])
+                booking_id += 1
+
+                if check_out <= self.today:
+                    status = 'cancelled' if self.rng.random() < 0.05 else 'completed'
+                else:
+                    status = 'active'
+                total = prices[room['type_id']] * nights
+                booking = {'booking_id': booking_id, 'guest_id': self.rng.randint(1, self.guests),
+                           'room_id': room['room_id'], 'check_in': check_in, 'check_out': check_out,
+                           'total_amount': total, 'booking_status': status}
+
+                orders = []
+                if status != 'cancelled':
+                    for _ in range(self.rng.choices([0, 1, 2, 3], [35, 35, 20, 10])[0]):
+                        order_id += 1
+                        service_id = self.rng.randint(1, len(SERVICES))
+                        quantity = self.rng.randint(1, 3)
+                        orders.append({'order_id': order_id, 'booking_id': booking_id, 'service_id': service_id,
+                                       'quantity': quantity,
+                                       'total_order_cost': service_prices[service_id] * quantity})
+
+                payments = []
+                if status == 'completed':
+                    due = total + sum(o['total_order_cost'] for o in orders)
+                    parts = [due] if self.rng.random() < 0.7 else [round(due * 0.3, 2), round(due - round(due * 0.3, 2), 2)]
+                    for amount in parts:
+                        payment_id += 1
+                        payments.append({'payment_id': payment_id, 'booking_id': booking_id,
+                                         'payment_method': self.rng.choice(['cash', 'card', 'online']),
+                                         'amount_paid': amount,
+                                         'payment_date': datetime.combine(check_out, datetime.min.time())
+                                         + timedelta(hours=self.rng.randint(8, 12))})
+
+                feedback = None
+                if status == 'completed' and self.rng.random() < 0.3:
+                    feedback_id += 1
+                    feedback = {'feedback_id': feedback_id, 'guest_id': booking['guest_id'],
+                                'booking_id': booking_id, 'rating': self.rng.choices([1, 2, 3, 4, 5], [3, 5, 15, 40, 37])[0],
+                                'comment': self.rng.choice(['Great stay', 'Clean rooms', 'Noisy at night',
+                                                            'Friendly staff', 'Would return', 'Average'])}
+                yield booking, orders, payments, feedback
+
+    def audit_rows(self, count):
+        start = datetime.combine(self.today - timedelta(days=365 * self.years), datetime.min.time())
+        span = 365 * self.years * 86400
+        offsets = sorted(self.rng.randint(0, span) for _ in range(count))
+        for i, offset in enumerate(offsets):
+            table = self.rng.choices(['Bookings', 'Guests', 'Payments', 'ServiceOrders'], [50, 10, 25, 15])[0]
+            action = self.rng.choices(['INSERT', 'UPDATE', 'DELETE'], [70, 25, 5])[0]
+            yield {'log_id': i + 1, 'table_name': table, 'action_type': action,
+                   'details': f"{action} on {table} id {self.rng.randint(1, 10 ** 6)}",
+                   'action_timestamp': start + timedelta(seconds=offset)}
+
+
+# -------------------------------------------------
+# Loading
+# -------------------------------------------------
+INSERTS = {
+    'RoomTypes': "INSERT INTO RoomTypes (type_id, name, base_price, max_persons) VALUES (:type_id, :name, :base_price, :max_persons)",
+    'Rooms': "INSERT INTO Rooms (room_id, room_number, type_id, status) VALUES (:room_id, :room_number, :type_id, :status)",
+    'Services': "INSERT INTO Services (service_id, service_name, price) VALUES (:service_id, :service_name, :price)",
+    'Employees': "INSERT INTO Employees (emp_id, name, role, shift_time, salary, hire_date) VALUES (:emp_id, :name, :role, :shift_time, :salary, :hire_date)",
+    'Guests': "INSERT INTO Guests (guest_id, full_name, phone, email, address, nationality) VALUES (:guest_id, :full_name, :phone, :email, :address, :nationality)",
+    'Bookings': "INSERT INTO Bookings (booking_id, guest_id, room_id, check_in, check_out, total_amount, booking_status) VALUES (:booking_id, :guest_id, :room_id, :check_in, :check_out, :total_amount, :booking_status)",
+    'ServiceOrders': "INSERT INTO ServiceOrders (order_id, booking_id, service_id, quantity, total_order_cost) VALUES (:order_id, :booking_id, :service_id, :quantity, :total_order_cost)",
+    'Payments': "INSERT INTO Payments (payment_id, booking_id, payment_method, amount_paid, payment_date) VALUES (:payment_id, :booking_id, :payment_method, :amount_paid, :payment_date)",
+    'Feedback': "INSERT INTO Feedback (feedback_id, guest_id, booking_id, rating, comment) VALUES (:feedback_id, :guest_id, :booking_id, :rating, :comment)",
+    'AuditLog': "INSERT INTO AuditLog (log_id, table_name, action_type, details, action_timestamp) VALUES (:log_id, :table_name, :action_type, :details, :action_timestamp)",
+}
+
+# Children first, for --reset
+DELETE_ORDER = ['AuditLog', 'Feedback', 'Payments', 'ServiceOrders', 'Maintenance', 'Bookings',
+                'GuestPhones', 'Guests', 'Employees', 'Rooms', 'Services', 'RoomTypes']
+
+
+class _Writer:
+    """
+    Buffers rows per table and flushes them with executemany() in BATCH-row
+    transactions.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.buffers = {table: [] for table in INSERTS}
+        self.counts = {table: 0 for table in INSERTS}
+
+    def add(self, table, row):
+        buf = self.buffers[table]
+        buf.append(row)
+        if len(buf) >= BATCH:
+            self.flush(table)
+
+    def flush(self, table=None):
+        for name in ([table] if table else INSERTS):
+            buf = self.buffers[name]
+            if buf:
+                self.conn.execute(text(INSERTS[name]), buf)
+                self.conn.commit()
+                self.counts[name] += len(buf)
+                self.buffers[name] = []
+
+
+def generate(engine, scale='small', seed=42, reset=False, log=print):
+    """
+    Writes a full synthetic dataset; returns {table: rows written}.
+    Tables must be empty unless reset=True (which deletes existing rows).
+    """
+    gen = Generator(scale, seed)
+    started = time.monotonic()
+    with engine.connect() as conn:
+        if reset:
+            for table in DELETE_ORDER:
+                conn.execute(text(f"DELETE FROM {table}"))
+            conn.commit()
+
+        writer = _Writer(conn)
+        for row in gen.room_types():
+            writer.add('RoomTypes', row)
+        for row in gen.services():
+            writer.add('Services', row)
+        rooms = gen.room_rows()
+        for row in rooms:
+            writer.add('Rooms', row)
+        for row in gen.employee_rows():
+            writer.add('Employees', row)
+        # Parents must exist before the children's FK checks run
+        writer.flush()
+
+        for row in gen.guest_rows():
+            writer.add('Guests', row)
+        writer.flush('Guests')
+        log(f"guests: {writer.counts['Guests']:,}")
+
+        for booking, orders, payments, feedback in gen.booking_rows(rooms):
+            writer.add('Bookings', booking)
+            if len(writer.buffers['Bookings']) == 0:
+                # Bookings were just flushed: children may follow
+                writer.flush('ServiceOrders')
+                writer.flush('Payments')
+                writer.flush('Feedback')
+            for row in orders:
+                writer.buffers['ServiceOrders'].append(row)
+            for row in payments:
+                writer.buffers['Payments'].append(row)
+            if feedback:
+                writer.buffers['Feedback'].append(feedback)
+        writer.flush('Bookings')
+        for table in ('ServiceOrders', 'Payments', 'Feedback'):
+            writer.flush(table)
+        log(f"bookings: {writer.counts['Bookings']:,} (service orders {writer.counts['ServiceOrders']:,}, "
+            f"payments {writer.counts['Payments']:,})")
+
+        for row in gen.audit_rows(int(writer.counts['Bookings'] * gen.audit_ratio)):
+            writer.add('AuditLog', row)
+        writer.flush()
+
+    log(f"done in {time.monotonic() - started:.1f}s")
+    return writer.counts
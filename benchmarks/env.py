@@ -0,0 +1,136 @@
+# benchmarks/env.py
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime
+
+from sqlalchemy import event, text
+
+# SQLite stand-ins for the MySQL views (same column names as the real ones)
+SQLITE_VIEWS = [
+    """CREATE VIEW IF NOT EXISTS RoomOccupancy AS
+       SELECT r.room_number, COUNT(b.booking_id) AS total_bookings
+       FROM Rooms r LEFT JOIN Bookings b ON r.room_id = b.room_id
+       GROUP BY r.room_number""",
+    """CREATE VIEW IF NOT EXISTS ShiftOverlap AS
+       SELECT e1.name AS Employee1, e2.name AS Employee2, e1.shift_time
+       FROM Employees e1 JOIN Employees e2
+         ON e1.shift_time = e2.shift_time AND e1.emp_id < e2.emp_id""",
+    """CREATE VIEW IF NOT EXISTS PackagePossibilities AS
+       SELECT rt.name AS room_type, s.service_name, rt.base_price + s.price AS package_price
+       FROM RoomTypes rt CROSS JOIN Services s""",
+]
+
+
+def _guest_level(spent):
+    # Stand-in for the GetGuestLevel() stored function
+    spent = spent or 0
+    if spent >= 5000:
+        return 'Platinum'
+    if spent >= 2000:
+        return 'Gold'
+    return 'Silver'
+
+
+def make_app(database_url, background_jobs=False):
+    """
+    Builds the real app against `database_url` (MySQL with the HotelEase
+    schema, or SQLite). Config is patched before create_app() because the
+    engines are created there.
+    """
+    from config import Config
+    Config.SQLALCHEMY_DATABASE_URI = database_url
+    Config.SQLALCHEMY_BINDS = {}
+    Config.BACKGROUND_JOBS = background_jobs
+    if database_url.startswith('sqlite'):
+        # The MySQL pool profile / connect_timeout don't apply to SQLite
+        Config.SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 30, 'check_same_thread': False}}
+
+    from app import create_app, db
+    app = create_app()
+    app.config['TESTING'] = True
+    if is_sqlite(app):
+        with app.app_context():
+            event.listen(db.engine, 'connect',
+                         lambda conn, _: conn.create_function('GetGuestLevel', 1, _guest_level))
+    return app
+
+
+def is_sqlite(app):
+    return app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite')
+
+
+def ensure_schema(app):
+    """
+    SQLite only: creates the tables from the models plus the view stand-ins.
+    On MySQL the schema (tables, views, triggers, procedures) must already
+    be installed from the project's SQL script.
+    """
+    if not is_sqlite(app):
+        return
+    from app import db
+    from app.models import hotel, operation, staff, user  # noqa: F401
+    with app.app_context():
+        db.create_all()
+        with db.engine.begin() as conn:
+            for ddl in SQLITE_VIEWS:
+                conn.execute(text(ddl))
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_metadata(app, **extra):
+    """
+    Context stored with every result file so runs can be compared.
+    """
+    from app import db
+    with app.app_context():
+        counts = {}
+        for table in ('Rooms', 'Guests', 'Bookings', 'ServiceOrders', 'Payments', 'AuditLog'):
+            try:
+                counts[table] = db.session.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+            except Exception:
+                db.session.rollback()
+                counts[table] = None
+        dialect = db.engine.dialect.name
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'dialect': dialect,
+        'row_counts': counts,
+        **extra,
+    }
+
+
+def percentiles(samples_ms):
+    ordered = sorted(samples_ms)
+    if not ordered:
+        return {'count': 0}
+
+    def pct(p):
+        return ordered[min(int(p / 100.0 * len(ordered)), len(ordered) - 1)]
+
+    return {
+        'count': len(ordered),
+        'mean_ms': round(sum(ordered) / len(ordered), 3),
+        'min_ms': round(ordered[0], 3),
+        'p50_ms': round(pct(50), 3),
+        'p95_ms': round(pct(95), 3),
+        'p99_ms': round(pct(99), 3),
+        'max_ms': round(ordered[-1], 3),
+    }
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return (time.perf_counter() - start) * 1000, result
@@ -0,0 +1,82 @@
+# benchmarks/load.py
+import random
+import threading
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+from benchmarks.env import percentiles
+
+
+def run_load(app, threads=8, requests_per_thread=50, batch=1, horizon_days=120, seed=11, log=print):
+    """
+    Concurrent booking creation through POST /api/bookings.
+
+    Each thread sends `requests_per_thread` requests of `batch` bookings for
+    random rooms and dates in a window after all generated history, so the
+    workload mixes clean inserts with genuine same-room conflicts. Reports
+    latency percentiles per request, bookings/s and the outcome counts.
+    """
+    from app import db
+    with app.app_context():
+        rooms = [r[0] for r in db.session.execute(text("SELECT room_id FROM Rooms")).fetchall()]
+        guests = db.session.execute(text("SELECT MIN(guest_id), MAX(guest_id) FROM Guests")).first()
+        last_checkout = db.session.execute(text("SELECT MAX(check_out) FROM Bookings")).scalar()
+    if not rooms or guests[0] is None:
+        raise RuntimeError('Generate data first (python -m benchmarks generate).')
+    window_start = (date.fromisoformat(str(last_checkout)[:10]) if last_checkout else date.today()) + timedelta(days=1)
+
+    latencies = []
+    outcomes = {}
+    lock = threading.Lock()
+
+    def worker(worker_id):
+        rng = random.Random(seed * 1000 + worker_id)
+        client = app.test_client()
+        local_latencies, local_outcomes = [], {}
+        for _ in range(requests_per_thread):
+            items = []
+            for _ in range(batch):
+                check_in = window_start + timedelta(days=rng.randint(0, horizon_days))
+                nights = rng.randint(1, 5)
+                items.append({'guest_id': rng.randint(guests[0], guests[1]), 'room_id': rng.choice(rooms),
+                              'check_in': check_in.isoformat(),
+                              'check_out': (check_in + timedelta(days=nights)).isoformat()})
+            start = time.perf_counter()
+            response = client.post('/api/bookings', json={'bookings': items})
+            local_latencies.append((time.perf_counter() - start) * 1000)
+            body = response.get_json(silent=True) or {}
+            for result in body.get('results', []):
+                local_outcomes[result['status']] = local_outcomes.get(result['status'], 0) + 1
+            if response.status_code >= 400:
+                local_outcomes['http_error'] = local_outcomes.get('http_error', 0) + 1
+        with lock:
+            latencies.extend(local_latencies)
+            for key, value in local_outcomes.items():
+                outcomes[key] = outcomes.get(key, 0) + value
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    total_bookings = threads * requests_per_thread * batch
+    result = {
+        'threads': threads,
+        'requests': threads * requests_per_thread,
+        'bookings_attempted': total_bookings,
+        'batch': batch,
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(threads * requests_per_thread / elapsed, 1),
+        'bookings_per_second': round(total_bookings / elapsed, 1),
+        'outcomes': outcomes,
+        'latency': percentiles(latencies),
+    }
+    log(f"{result['requests']} requests / {total_bookings} bookings in {elapsed:.2f}s "
+        f"({result['bookings_per_second']} bookings/s), outcomes {outcomes}, "
+        f"p95 {result['latency'].get('p95_ms')} ms")
+    return result
@@ -0,0 +1,93 @@
+# benchmarks/micro.py
+import random
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+from benchmarks.env import is_sqlite, percentiles, timed
+
+
+def _sample_ids(app, sql, count, rng):
+    from app import db
+    with app.app_context():
+        ids = [r[0] for r in db.session.execute(text(sql)).fetchall()]
+    return [rng.choice(ids) for _ in range(count)] if ids else []
+
+
+def build_cases(app, iterations, rng):
+    """
+    name -> (callable(i), needs_mysql). HTTP cases go through the Flask test
+    client, so they include routing, SQL and template rendering.
+    """
+    client = app.test_client()
+    from app.services.guest_search import guest_index  # noqa: F401  (warm import)
+
+    prefixes = ['al', 'sa', 'ahm', 'kh', 'mar', 'jo', 'fat', 'om', '0300', 'ali k', 'sara m']
+    invoice_ids = _sample_ids(app, "SELECT booking_id FROM Bookings ORDER BY booking_id DESC LIMIT 5000",
+                              iterations, rng)
+    type_ids = _sample_ids(app, "SELECT type_id FROM RoomTypes", iterations, rng)
+
+    def get(url):
+        response = client.get(url)
+        # A redirect (e.g. to the login page or a trailing slash) would time the wrong thing
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {url} -> {response.status_code}")
+        return response
+
+    def call_procedure(i):
+        from app.services.db_utils import check_availability_proc
+        check_in = date.today() + timedelta(days=i % 60)
+        with app.app_context():
+            check_availability_proc(check_in, check_in + timedelta(days=3), type_ids[i % len(type_ids)])
+
+    def analytics_refresh(i):
+        # The seven report queries themselves (the page serves a snapshot)
+        from app.services.report_cache import report_snapshot
+        with app.app_context():
+            report_snapshot.refresh()
+
+    return {
+        'call_procedure': (call_procedure, True),
+        'search_guest': (lambda i: get(f"/api/guests/search?q={prefixes[i % len(prefixes)]}"), False),
+        'dashboard': (lambda i: get('/admin/dashboard'), False),
+        'analytics_dashboard': (lambda i: get('/admin/reports/'), False),
+        'analytics_refresh': (analytics_refresh, False),
+        'invoice': (lambda i: get(f"/reception/invoice/{invoice_ids[i % len(invoice_ids)]}"), False),
+        'room_grid': (lambda i: get('/reception/room-grid'), False),
+    }
+
+
+def run_micro(app, iterations=200, warmup=10, only=None, seed=7, log=print):
+    """
+    Runs every case `warmup` times untimed, then `iterations` times timed.
+    Returns {case: percentiles + errors}; MySQL-only cases are skipped on
+    SQLite, and a case whose SQL the database can't run reports its error.
+    """
+    rng = random.Random(seed)
+    cases = build_cases(app, iterations, rng)
+    results = {}
+    for name, (func, needs_mysql) in cases.items():
+        if only and name not in only:
+            continue
+        if needs_mysql and is_sqlite(app):
+            results[name] = {'skipped': 'needs MySQL (stored procedure)'}
+            continue
+        samples, errors, last_error = [], 0, None
+        for i in range(warmup + iterations):
+            try:
+                ms, _ = timed(func, i)
+            except Exception as e:
+                errors += 1
+                last_error = str(e).splitlines()[0][:200]
+                if errors > 5 and not samples:
+                    break
+                continue
+            if i >= warmup:
+                samples.append(ms)
+        results[name] = dict(percentiles(samples), errors=errors)
+        if last_error:
+            results[name]['last_error'] = last_error
+        summary = results[name]
+        log(f"{name:20s} p50 {summary.get('p50_ms', '-'):>8} ms  p95 {summary.get('p95_ms', '-'):>8} ms  "
+            f"p99 {summary.get('p99_ms', '-'):>8} ms  errors {errors}")
+    return results
@@ -16,4 +16,157 @@ class Config:
     )
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SQLALCHEMY_ECHO = False # Set to True if you want to see raw SQL in terminal
\ No newline at end of file
+    SQLALCHEMY_ECHO = False # Set to True if you want to see raw SQL in terminal
+
+    # Production database profile (connection pool + timeouts), applied to every engine
+    # pool_recycle must stay below MySQL's wait_timeout, and pre_ping replaces dead
+    # connections before use - together they stop "MySQL server has gone away"
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 15000))  # @read_only views; 0 = off
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 280)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', '1') == '1',
+        'connect_args': {
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5)),
+        },
+    }
+
+    # Optional read replica: read-only routes (@read_only) use it when DB_REPLICA_HOST is set
+    SQLALCHEMY_BINDS = {}
+    if os.environ.get('DB_REPLICA_HOST'):
+        SQLALCHEMY_BINDS['replica'] = (
+            f"mysql+pymysql://{os.environ.get('DB_REPLICA_USER') or os.environ.get('DB_USER')}"
+            f":{os.environ.get('DB_REPLICA_PASS') or os.environ.get('DB_PASS')}"
+            f"@{os.environ.get('DB_REPLICA_HOST')}/{os.environ.get('DB_NAME')}"
+        )
+
+    # In-memory availability index: full reload from MySQL after this many seconds
+    # (picks up bookings written by other workers or directly in the DB)
+    AVAILABILITY_REFRESH_SECONDS = int(os.environ.get('AVAILABILITY_REFRESH_SECONDS', 300))
+
+    # Guest typeahead (/api/guests/search): 'memory' (in-process prefix index)
+    # or 'fulltext' (MySQL FULLTEXT index on Guests.full_name)
+    GUEST_SEARCH_BACKEND = os.environ.get('GUEST_SEARCH_BACKEND', 'memory')
+    GUEST_SEARCH_SYNC_SECONDS = 30       # pick up guests added by other workers
+    GUEST_SEARCH_REFRESH_SECONDS = 900   # full rebuild (also drops deleted guests)
+
+    # Dashboard KPIs are kept as running totals; full recount after this many seconds
+    KPI_RECONCILE_SECONDS = int(os.environ.get('KPI_RECONCILE_SECONDS', 300))
+
+    # Background jobs (report refresh, ...). Turn off for one-off scripts/tests.
+    BACKGROUND_JOBS = os.environ.get('BACKGROUND_JOBS', '1') == '1'
+
+    # /admin/reports is served from a snapshot rebuilt every REPORTS_REFRESH_SECONDS;
+    # a request seeing a snapshot older than REPORTS_MAX_STALENESS triggers a rebuild
+    REPORTS_REFRESH_SECONDS = int(os.environ.get('REPORTS_REFRESH_SECONDS', 300))
+    REPORTS_MAX_STALENESS = int(os.environ.get('REPORTS_MAX_STALENESS', 900))
+
+    # Daily revenue buckets behind /api/revenue: full rebuild after this many seconds
+    REVENUE_RECONCILE_SECONDS = int(os.environ.get('REVENUE_RECONCILE_SECONDS', 3600))
+
+    # Where background invoice exports are written (default: <instance>/exports)
+    EXPORT_DIR = os.environ.get('EXPORT_DIR')
+
+    # Request / SQL / stored-procedure profiling, reported at /admin/perf.
+    # PROFILING_WINDOW samples are kept per endpoint and per SQL fingerprint;
+    # a fingerprint run this many times in one request is flagged as N+1
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '0') == '1'
+    PROFILING_WINDOW = int(os.environ.get('PROFILING_WINDOW', 1000))
+    PROFILING_N_PLUS_ONE_THRESHOLD = int(os.environ.get('PROFILING_N_PLUS_ONE_THRESHOLD', 10))
+
+    # Room grid live updates (Server-Sent Events): idle keep-alive interval, and
+    # a full snapshot reload interval as a backstop for writes made elsewhere
+    ROOM_FEED_HEARTBEAT_SECONDS = int(os.environ.get('ROOM_FEED_HEARTBEAT_SECONDS', 15))
+    ROOM_GRID_RESYNC_SECONDS = int(os.environ.get('ROOM_GRID_RESYNC_SECONDS', 600))
+    # Each open stream holds a server thread: keep this well below ASGI_THREADS.
+    # With REF_CACHE_BACKEND=redis the deltas go through Redis pub/sub, so every
+    # worker streams every write; otherwise run a single worker process
+    ROOM_FEED_MAX_CLIENTS = int(os.environ.get('ROOM_FEED_MAX_CLIENTS', 16))
+
+    # Booking writes (form + /api/bookings) are queued and committed in batches
+    # of up to RESERVATION_BATCH_SIZE, gathered for at most RESERVATION_BATCH_WAIT_MS
+    RESERVATION_BATCH_SIZE = int(os.environ.get('RESERVATION_BATCH_SIZE', 100))
+    RESERVATION_BATCH_WAIT_MS = int(os.environ.get('RESERVATION_BATCH_WAIT_MS', 5))
+    RESERVATION_TIMEOUT_SECONDS = int(os.environ.get('RESERVATION_TIMEOUT_SECONDS', 30))
+    BOOKING_API_MAX_ITEMS = int(os.environ.get('BOOKING_API_MAX_ITEMS', 500))
+
+    # Reference data (RoomTypes, Rooms, Services) read-through cache, invalidated
+    # by room status changes and `flask reference-changed`. 'memory' is per
+    # process (other workers catch up within REF_CACHE_TTL_SECONDS); 'redis'
+    # shares invalidations across workers (set REF_CACHE_REDIS_URL)
+    REF_CACHE_BACKEND = os.environ.get('REF_CACHE_BACKEND', 'memory')
+    REF_CACHE_REDIS_URL = os.environ.get('REF_CACHE_REDIS_URL')
+    REF_CACHE_TTL_SECONDS = int(os.environ.get('REF_CACHE_TTL_SECONDS', 600))
+    REF_CACHE_MAX_ENTRIES = int(os.environ.get('REF_CACHE_MAX_ENTRIES', 64))
+
+    # Async serving mode (asgi.py turns it on): dashboard, reports, room grid and
+    # guest search run as async views on aiomysql pools, issuing their independent
+    # queries concurrently. ASGI_THREADS bounds the threads running the sync views
+    ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', '0') == '1'
+    ASYNC_DB_POOL_SIZE = int(os.environ.get('ASYNC_DB_POOL_SIZE', 20))
+    ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 32))
+
+    # Application audit trail: entries are buffered in memory and inserted into
+    # AuditLog in batches by a background worker. Past AUDIT_BUFFER_SIZE queued
+    # entries they spill to a JSONL file (default: <instance>/audit-spill.jsonl),
+    # replayed once the database accepts writes again
+    AUDIT_BATCH_SIZE = int(os.environ.get('AUDIT_BATCH_SIZE', 200))
+    AUDIT_FLUSH_MS = int(os.environ.get('AUDIT_FLUSH_MS', 500))
+    AUDIT_BUFFER_SIZE = int(os.environ.get('AUDIT_BUFFER_SIZE', 10000))
+    AUDIT_SPILL_PATH = os.environ.get('AUDIT_SPILL_PATH')
+    # Set once the LogGuestDeletion trigger is dropped: the app then records guest deletions
+    AUDIT_GUEST_DELETIONS = os.environ.get('AUDIT_GUEST_DELETIONS', '0') == '1'
+
+    # Guest lifetime spend / booking count / VIP tier store: full recount after this many seconds
+    GUEST_STATS_RECONCILE_SECONDS = int(os.environ.get('GUEST_STATS_RECONCILE_SECONDS', 900))
+
+    # Dynamic pricing: occupancy matrices span PRICING_HISTORY_DAYS back and
+    # PRICING_HORIZON_DAYS ahead (rebuilt every PRICING_REFRESH_SECONDS). The
+    # nightly rate is base_price * (1 + ELASTICITY * (forecast - TARGET)),
+    # clamped to [MIN_FACTOR, MAX_FACTOR]
+    PRICING_HISTORY_DAYS = int(os.environ.get('PRICING_HISTORY_DAYS', 400))
+    PRICING_HORIZON_DAYS = int(os.environ.get('PRICING_HORIZON_DAYS', 400))
+    PRICING_REFRESH_SECONDS = int(os.environ.get('PRICING_REFRESH_SECONDS', 900))
+    PRICING_TARGET_OCCUPANCY = float(os.environ.get('PRICING_TARGET_OCCUPANCY', 0.7))
+    PRICING_ELASTICITY = float(os.environ.get('PRICING_ELASTICITY', 0.5))
+    PRICING_MIN_FACTOR = float(os.environ.get('PRICING_MIN_FACTOR', 0.8))
+    PRICING_MAX_FACTOR = float(os.environ.get('PRICING_MAX_FACTOR', 1.5))
+    PRICING_MIN_PICKUP_SAMPLES = int(os.environ.get('PRICING_MIN_PICKUP_SAMPLES', 30))
+
+    # Housekeeping dispatcher: a checkout opens a turnover task (the room stays
+    # bookable); a repair holds a free room in 'maintenance' until it is done.
+    # Pending tasks go, next arrival first, to on-shift staff of the matching
+    # roles (comma-separated), at most HOUSEKEEPING_MAX_OPEN_TASKS each.
+    # HOUSEKEEPING_SHIFTS maps the names used in Employees.shift_time to clock
+    # windows; assignments are written in batches
+    HOUSEKEEPING_TURNOVER = os.environ.get('HOUSEKEEPING_TURNOVER', '1') == '1'
+    HOUSEKEEPING_SHIFTS = os.environ.get('HOUSEKEEPING_SHIFTS',
+                                         'Morning=06:00-14:00,Evening=14:00-22:00,Night=22:00-06:00')
+    HOUSEKEEPING_TURNOVER_ROLES = os.environ.get('HOUSEKEEPING_TURNOVER_ROLES', 'Housekeeping')
+    HOUSEKEEPING_REPAIR_ROLES = os.environ.get('HOUSEKEEPING_REPAIR_ROLES', 'Maintenance')
+    HOUSEKEEPING_MAX_OPEN_TASKS = int(os.environ.get('HOUSEKEEPING_MAX_OPEN_TASKS', 5))
+    HOUSEKEEPING_DISPATCH_SECONDS = int(os.environ.get('HOUSEKEEPING_DISPATCH_SECONDS', 60))
+    HOUSEKEEPING_FLUSH_MS = int(os.environ.get('HOUSEKEEPING_FLUSH_MS', 2000))
+    HOUSEKEEPING_RECONCILE_SECONDS = int(os.environ.get('HOUSEKEEPING_RECONCILE_SECONDS', 300))
+
+    # Conditional GET / rendered-response cache for the room grid, employees,
+    # audit log, analytics and guest search. Versions are bumped by the write
+    # events; RESPONSE_CACHE_TTL_SECONDS bounds staleness for writes made outside
+    # the app. With REF_CACHE_BACKEND=redis the versions are shared by all workers
+    RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', '1') == '1'
+    RESPONSE_CACHE_TTL_SECONDS = int(os.environ.get('RESPONSE_CACHE_TTL_SECONDS', 300))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 256))
+
+    # Hot/cold split: bookings closed more than ARCHIVE_BOOKINGS_AFTER_DAYS ago (with
+    # their service orders, payments and feedback) and older audit entries move to
+    # the *Archive tables in batches; reports read both. Keep the booking cut-off
+    # above PRICING_HISTORY_DAYS, which reads the hot Bookings only.
+    # `flask archive-history` runs it by hand
+    ARCHIVE_ENABLED = os.environ.get('ARCHIVE_ENABLED', '0') == '1'
+    ARCHIVE_BOOKINGS_AFTER_DAYS = int(os.environ.get('ARCHIVE_BOOKINGS_AFTER_DAYS', 730))
+    ARCHIVE_AUDIT_AFTER_DAYS = int(os.environ.get('ARCHIVE_AUDIT_AFTER_DAYS', 365))
+    ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', 1000))
+    ARCHIVE_PAUSE_MS = int(os.environ.get('ARCHIVE_PAUSE_MS', 100))
+    ARCHIVE_INTERVAL_SECONDS = int(os.environ.get('ARCHIVE_INTERVAL_SECONDS', 86400))
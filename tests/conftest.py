@@ -0,0 +1,59 @@
+# tests/conftest.py
+import pytest
+from sqlalchemy import text
+
+from benchmarks.env import ensure_schema, make_app
+
+SEED = [
+    "INSERT INTO RoomTypes (type_id, name, base_price, max_persons) VALUES (1, 'Single', 100, 1), (2, 'Double', 150, 2)",
+    """INSERT INTO Rooms (room_id, room_number, type_id, status) VALUES
+       (1, '101', 1, 'available'), (2, '102', 1, 'available'), (3, '103', 1, 'available'),
+       (4, '201', 2, 'available'), (5, '202', 2, 'available'), (6, '203', 2, 'maintenance')""",
+    """INSERT INTO Guests (guest_id, full_name, phone, email) VALUES
+       (1, 'Alice Smith', '0300111', 'alice@example.com'),
+       (2, 'Bob Jones', '0300222', 'bob@example.com'),
+       (3, 'Ali Khan', '0311333', 'ali@example.com')""",
+    "INSERT INTO Services (service_id, service_name, price) VALUES (1, 'Spa', 50), (2, 'Dinner', 30)",
+]
+
+
+def _reset_services():
+    """
+    The in-memory services are module singletons: drop what an earlier
+    test's database left in them.
+    """
+    from app.services.availability import availability_index
+    from app.services.guest_search import guest_index
+    from app.services.pricing import pricing_engine
+    from app.services.ref_cache import ref_cache
+    from app.services.response_cache import response_cache
+
+    availability_index.invalidate()
+    guest_index._loaded_at = None
+    pricing_engine._loaded_at = None
+    ref_cache.invalidate()
+    response_cache._entries.clear()
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(f"sqlite:///{tmp_path / 'hotel.db'}")
+    app.config['AUDIT_SPILL_PATH'] = str(tmp_path / 'audit-spill.jsonl')
+    ensure_schema(app)
+    from app import db
+    with app.app_context():
+        for sql in SEED:
+            db.session.execute(text(sql))
+        db.session.commit()
+        _reset_services()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = 1
+        session['role'] = 'admin'
+    return client
@@ -0,0 +1,114 @@
+# tests/test_audit.py
+import os
+
+import pytest
+from sqlalchemy import exc, text
+
+from app import db
+from app.services.audit import AuditTrail
+
+
+class _Database:
+    """
+    Wraps AuditTrail._insert: can be taken down, and refuses 'poison' rows
+    the way MySQL refuses a value that doesn't fit.
+    """
+
+    def __init__(self, insert):
+        self.insert = insert
+        self.down = False
+
+    def __call__(self, batch):
+        if self.down:
+            raise exc.OperationalError('INSERT INTO AuditLog', {}, Exception('server has gone away'))
+        if any(entry['table_name'] == 'poison' for entry in batch):
+            raise exc.DataError('INSERT INTO AuditLog', {}, Exception('Data too long'))
+        self.insert(batch)
+
+
+@pytest.fixture
+def trail(app):
+    trail = AuditTrail()
+    trail.init_app(app)
+    trail.batch_size = 3
+    trail._insert = _Database(trail._insert)
+    return trail
+
+
+def _logged():
+    return db.session.execute(text("SELECT action_type FROM AuditLog ORDER BY log_id")).scalars().all()
+
+
+def test_writes_inline_without_background_jobs(trail):
+    trail.record('Bookings', 'INSERT', booking_id=1)
+    assert _logged() == ['INSERT']
+    assert trail.counters['written'] == 1
+
+
+def test_failed_writes_spill_and_replay_in_order(trail):
+    trail._insert.down = True
+    for i in range(5):
+        trail.record('Bookings', f'A{i}')
+    assert _logged() == []
+    assert trail.counters['spilled'] == 5
+    assert trail.stats()['spill_backlog_bytes'] > 0
+
+    trail._insert.down = False
+    trail.flush()
+    assert _logged() == [f'A{i}' for i in range(5)]
+    assert trail.counters['replayed'] == 5
+    assert not os.path.exists(trail.spill_path)
+    assert not os.path.exists(f'{trail.spill_path}.replay')
+
+
+def test_interrupted_replay_resumes_without_duplicates(trail):
+    trail._insert.down = True
+    for i in range(7):
+        trail.record('Bookings', f'A{i}')
+
+    # The database goes away again after the first chunk of the replay
+    insert = trail._insert.insert
+    calls = []
+
+    def flaky(batch):
+        calls.append(len(batch))
+        if len(calls) > 1:
+            raise exc.OperationalError('INSERT INTO AuditLog', {}, Exception('server has gone away'))
+        insert(batch)
+
+    trail._insert.down = False
+    trail._insert.insert = flaky
+    trail.flush()
+    assert _logged() == ['A0', 'A1', 'A2']
+
+    trail._insert.insert = insert
+    trail.flush()
+    assert _logged() == [f'A{i}' for i in range(7)]
+
+
+def test_poison_row_is_set_aside(trail):
+    trail._insert.down = True
+    trail.record('Bookings', 'A0')
+    trail.record('poison', 'BAD')
+    trail.record('Bookings', 'A1')
+    trail.record('Bookings', 'A2')
+
+    trail._insert.down = False
+    trail.flush()
+    assert _logged() == ['A0', 'A1', 'A2']
+    assert trail.counters['rejected'] == 1
+    with open(f'{trail.spill_path}.rejected', encoding='utf-8') as fh:
+        assert '"BAD"' in fh.read()
+    assert not os.path.exists(f'{trail.spill_path}.replay')
+
+
+def test_torn_spill_line_is_dropped(trail):
+    trail._insert.down = True
+    trail.record('Bookings', 'A0')
+    with open(trail.spill_path, 'a', encoding='utf-8') as fh:
+        fh.write('{"table_name": "Book')
+
+    trail._insert.down = False
+    trail.flush()
+    assert _logged() == ['A0']
+    assert trail.counters['dropped'] == 1
@@ -0,0 +1,55 @@
+# tests/test_guest_search.py
+from sqlalchemy import text
+
+from app import db
+from app.services.guest_search import guest_index, search_guests_page
+from app.services.pagination import encode_cursor
+
+
+def _add_guests(count):
+    for i in range(count):
+        db.session.execute(text("INSERT INTO Guests (full_name, phone) VALUES (:name, :phone)"),
+                           {'name': f'Sam Guest{i:02d}', 'phone': f'0400{i:03d}'})
+    db.session.commit()
+
+
+def test_pages_cover_every_match_once(app):
+    _add_guests(12)
+    seen, cursor = [], None
+    while True:
+        results, cursor = search_guests_page('sam', limit=5, cursor=cursor)
+        seen += [guest_id for guest_id, _, _ in results]
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == 12
+
+
+def test_ranking_puts_name_prefix_first(app):
+    results, cursor = search_guests_page('ali', limit=5)
+    assert [guest_id for guest_id, _, _ in results] == [3, 1]
+    assert cursor is None
+
+
+def test_bad_cursor_is_rejected(client):
+    response = client.get('/api/guests/search?q=sam&cursor=' + encode_cursor(['x', 1, 'a', 1]))
+    assert response.status_code == 400
+
+
+def test_api_pages_through_headers(client, app):
+    _add_guests(4)
+    response = client.get('/api/guests/search?q=sam&limit=3&cursor=')
+    assert len(response.get_json()) == 3
+    cursor = response.headers['X-Next-Cursor']
+    response = client.get(f'/api/guests/search?q=sam&limit=3&cursor={cursor}')
+    assert len(response.get_json()) == 1
+    assert 'X-Next-Cursor' not in response.headers
+
+
+def test_sync_picks_up_new_guests_and_phones(app):
+    guest_index.load()
+    _add_guests(1)
+    db.session.execute(text("INSERT INTO GuestPhones (guest_id, phone_number) VALUES (1, '0555123456')"))
+    db.session.commit()
+    guest_index.sync_new()
+    assert [r[1] for r in guest_index.search('sam')] == ['Sam Guest00']
+    assert [r[0] for r in guest_index.search('0555123')] == [1]
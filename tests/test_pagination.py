@@ -0,0 +1,73 @@
+# tests/test_pagination.py
+import pytest
+from sqlalchemy import text
+
+from app import db
+from app.services.pagination import decode_cursor, encode_cursor, keyset_page
+
+
+def test_cursor_round_trip():
+    token = encode_cursor(['2026-01-02 10:00:00', 42])
+    assert '=' not in token
+    assert decode_cursor(token, 2) == ['2026-01-02 10:00:00', 42]
+    assert decode_cursor('', 2) is None
+
+
+@pytest.mark.parametrize('token', ['not base64!', encode_cursor([1]), encode_cursor({'a': 1}.items())])
+def test_bad_cursor_raises_value_error(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token, 2)
+
+
+def _add_audit_rows():
+    # Repeated timestamps: the log_id tie-breaker must keep pages exact
+    for i in range(1, 8):
+        db.session.execute(text("""
+            INSERT INTO AuditLog (log_id, table_name, action_type, action_timestamp)
+            VALUES (:id, 'Bookings', 'INSERT', :ts)
+        """), {'id': i, 'ts': f'2026-01-0{(i + 1) // 2} 09:00:00'})
+    db.session.commit()
+
+
+def test_keyset_pages_cover_every_row_once(app):
+    _add_audit_rows()
+    order = [('action_timestamp', 'action_timestamp'), ('log_id', 'log_id')]
+    seen, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = keyset_page("SELECT log_id, action_timestamp FROM AuditLog", order,
+                                   cursor=cursor, limit=3)
+        seen += [r.log_id for r in rows]
+        pages += 1
+        if cursor is None:
+            break
+    assert seen == [7, 6, 5, 4, 3, 2, 1]
+    assert pages == 3
+
+
+def test_keyset_last_full_page_has_no_cursor(app):
+    _add_audit_rows()
+    rows, cursor = keyset_page("SELECT log_id FROM AuditLog", [('log_id', 'log_id')], limit=7)
+    assert len(rows) == 7 and cursor is None
+
+
+def test_keyset_filters_apply_to_every_page(app):
+    _add_audit_rows()
+    rows, cursor = keyset_page("SELECT log_id FROM AuditLog", [('log_id', 'log_id')],
+                               where=['log_id <= :top'], params={'top': 4}, limit=2)
+    assert [r.log_id for r in rows] == [4, 3]
+    rows, cursor = keyset_page("SELECT log_id FROM AuditLog", [('log_id', 'log_id')], cursor=cursor,
+                               where=['log_id <= :top'], params={'top': 4}, limit=2)
+    assert [r.log_id for r in rows] == [2, 1] and cursor is None
+
+
+def test_guests_api_follows_next_url(client):
+    first = client.get('/admin/api/guests?limit=2').get_json()
+    assert [g['guest_id'] for g in first['items']] == [3, 2]
+    second = client.get(first['next_url']).get_json()
+    assert [g['guest_id'] for g in second['items']] == [1]
+    assert second['next_cursor'] is None
+
+
+def test_guests_api_rejects_a_bad_cursor(client):
+    response = client.get('/admin/api/guests?cursor=garbage')
+    assert response.status_code == 400
@@ -0,0 +1,64 @@
+# tests/test_reservations.py
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+from app import db
+from app.services.reservations import reservation_engine
+
+
+def _request(room_id, start, nights, guest_id=1):
+    check_in = date.today() + timedelta(days=start)
+    return {'guest_id': guest_id, 'room_id': room_id, 'check_in': check_in.isoformat(),
+            'check_out': (check_in + timedelta(days=nights)).isoformat()}
+
+
+def test_creates_booking_and_marks_room(app):
+    result = reservation_engine.submit(_request(1, 10, 2))
+    assert result['status'] == 'created'
+    row = db.session.execute(text("SELECT room_id, total_amount FROM Bookings WHERE booking_id = :id"),
+                             {'id': result['booking_id']}).one()
+    assert row.room_id == 1 and row.total_amount > 0
+    assert db.session.execute(text("SELECT status FROM Rooms WHERE room_id = 1")).scalar() == 'booked'
+
+
+def test_client_total_is_ignored(app):
+    result = reservation_engine.submit(dict(_request(1, 10, 2), total_amount='0.01'))
+    amount = db.session.execute(text("SELECT total_amount FROM Bookings WHERE booking_id = :id"),
+                                {'id': result['booking_id']}).scalar()
+    assert float(amount) >= 100
+
+
+def test_overlap_with_existing_booking_is_a_conflict(app):
+    first = reservation_engine.submit(_request(2, 10, 3))
+    second = reservation_engine.submit(_request(2, 11, 1, guest_id=2))
+    assert second['status'] == 'conflict'
+    assert second['conflicting_booking_ids'] == [first['booking_id']]
+
+
+def test_back_to_back_stays_do_not_conflict(app):
+    assert reservation_engine.submit(_request(3, 10, 2))['status'] == 'created'
+    assert reservation_engine.submit(_request(3, 12, 2))['status'] == 'created'
+
+
+def test_overlap_within_one_batch_keeps_the_first(app):
+    results = reservation_engine.submit_many([_request(4, 20, 3), _request(4, 21, 3), _request(5, 21, 3)])
+    assert [r['status'] for r in results] == ['created', 'conflict', 'created']
+    assert results[1]['reason'] == 'Overlaps an earlier request for the same room'
+    assert [r['index'] for r in results] == [0, 1, 2]
+
+
+def test_maintenance_room_is_a_conflict(app):
+    result = reservation_engine.submit(_request(6, 10, 1))
+    assert result['status'] == 'conflict'
+    assert result['reason'] == 'Room is under maintenance'
+
+
+def test_invalid_requests_are_reported_not_written(app):
+    results = reservation_engine.submit_many([
+        _request(99, 10, 1),
+        _request(1, -1, 2),
+        dict(_request(1, 10, 1), check_out='someday'),
+    ])
+    assert [r['status'] for r in results] == ['invalid'] * 3
+    assert db.session.execute(text("SELECT COUNT(*) FROM Bookings")).scalar() == 0
@@ -0,0 +1,101 @@
+# tests/test_response_cache.py
+import pytest
+from flask import flash
+
+from app.services.events import publish
+from app.services.response_cache import cached_response, response_cache
+
+
+@pytest.fixture
+def counted(app):
+    """
+    A cached view that counts how often it actually runs.
+    """
+    calls = []
+    state = {'vary': 'a'}
+
+    @cached_response('rooms', vary=lambda: state['vary'])
+    def view():
+        calls.append(1)
+        return f'rendered {len(calls)}'
+
+    app.add_url_rule('/_test/cached', 'cached_test', view)
+
+    def flash_then_view():
+        flash('Saved')
+        return view()
+
+    app.add_url_rule('/_test/flash', 'flash_test', flash_then_view)
+    return calls, state
+
+
+def test_if_none_match_gets_304(client, counted):
+    calls, _ = counted
+    first = client.get('/_test/cached')
+    assert first.status_code == 200 and first.headers['ETag']
+    again = client.get('/_test/cached', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+    assert again.data == b''
+    assert len(calls) == 1
+
+
+def test_known_etag_serves_stored_body(client, counted):
+    calls, _ = counted
+    first = client.get('/_test/cached')
+    second = client.get('/_test/cached')
+    assert second.data == first.data == b'rendered 1'
+    assert second.headers['ETag'] == first.headers['ETag']
+    assert len(calls) == 1
+    assert 'no-cache' in second.headers['Cache-Control']
+
+
+def test_write_event_changes_the_etag(client, counted):
+    calls, _ = counted
+    first = client.get('/_test/cached')
+    publish('room_status_changed', room_id=1, status='maintenance')
+    stale = client.get('/_test/cached', headers={'If-None-Match': first.headers['ETag']})
+    assert stale.status_code == 200
+    assert stale.headers['ETag'] != first.headers['ETag']
+    assert len(calls) == 2
+
+
+def test_unrelated_resource_keeps_the_etag(client, counted):
+    first = client.get('/_test/cached')
+    response_cache.bump('employees')
+    again = client.get('/_test/cached', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+
+
+def test_vary_changes_the_etag(client, counted):
+    calls, state = counted
+    first = client.get('/_test/cached')
+    state['vary'] = 'b'
+    second = client.get('/_test/cached', headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    assert second.headers['ETag'] != first.headers['ETag']
+    assert len(calls) == 2
+
+
+def test_role_is_part_of_the_etag(client, counted):
+    first = client.get('/_test/cached')
+    with client.session_transaction() as session:
+        session['role'] = 'receptionist'
+    other = client.get('/_test/cached', headers={'If-None-Match': first.headers['ETag']})
+    assert other.status_code == 200
+
+
+def test_responses_with_flashes_are_not_cached(client, counted):
+    calls, _ = counted
+    flashed = client.get('/_test/flash')
+    assert flashed.status_code == 200
+    assert 'ETag' not in flashed.headers
+    # The flash is still pending: the next page bypasses the cache as well
+    client.get('/_test/cached')
+    assert len(calls) == 2
+
+
+def test_room_grid_revalidates(client):
+    first = client.get('/reception/room-grid')
+    assert first.status_code == 200
+    again = client.get('/reception/room-grid', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304